@@ -66,8 +66,7 @@ def download_ai_packs_and_imagery():
     parcel_data = get_parcel_geoms_and_attributes(parcel_geojson)
 
     # query available ai packs
-    my_packs = nearmap.aiPacksV4()
-    available_packs = [i['code'] for i in my_packs["packs"]]
+    available_packs = nearmap.ai_metadata.pack_codes
     print(f"AI Packs I have access: {available_packs}")
 
     print(f"Downloading data for {len(parcel_data)} parcels")
@@ -83,11 +82,9 @@ def download_ai_packs_and_imagery():
         # Download AI Packs
         if packs:
             if packs == "All_Individual":
-                for pack in available_packs:
-                    my_ai_features = nearmap.aiFeaturesV4(geom, since, until, pack, out_format="json",
-                                                          lat_lon_direction="yx")
-                    with open(f'{folder}\\{pack}.json', 'w', encoding='utf-8') as f:
-                        dump(my_ai_features, f, ensure_ascii=False, indent=4)
+                # Single request for all packs, partitioned locally into one {pack}.json per AI Pack
+                nearmap.aiFeaturesByPackV4(geom, since, until, available_packs, out_format="json", output=folder,
+                                           lat_lon_direction="yx")
             else:
                 my_ai_features = nearmap.aiFeaturesV4(geom, since, until, packs, out_format="json",
                                                       lat_lon_direction="yx")
@@ -100,11 +97,11 @@ def download_ai_packs_and_imagery():
         # Download Imagery
         image_folder = f"{folder}\\Images"
         Path(image_folder).mkdir(parents=True, exist_ok=True)
-        for tile_direction in tile_directions:
-            wgs84_x, wgs84_y = get_extent_centroid(get_geometry_extent(geom))
-            slippy_y, slippy_x = latlon_to_xy(lat=wgs84_y, lon=wgs84_x, z=z_level)
-            out_image = f"{image_folder}\\{tile_direction}.{image_format}"
-            image_tile_file = nearmap.tileV3(tile_direction, z_level, slippy_y, slippy_x, image_format, out_image)
+        wgs84_x, wgs84_y = get_extent_centroid(get_geometry_extent(geom))
+        slippy_y, slippy_x = latlon_to_xy(lat=wgs84_y, lon=wgs84_x, z=z_level)
+        # All views of the parcel in one concurrent request, written as {view}.{image_format}
+        image_tile_files = nearmap.tileMultiViewV3(z_level, slippy_y, slippy_x, image_format, image_folder,
+                                                   views=tile_directions, name_pattern="{view}.{format}")
     count += 1
 
 
@@ -1,15 +1,21 @@
 from pathlib import Path
 import geopandas as gpd
-from os.path import split, splitext, basename
+from os import getpid
 from shutil import rmtree
-import concurrent.futures
 from os import cpu_count
 from tqdm import tqdm
-from shapely.geometry import mapping, Polygon
+import shapely.wkt
+from shapely.geometry import mapping, Polygon, box
+from json import dumps
 import fiona
 from osgeo import gdal
 from osgeo.gdalconst import GA_ReadOnly
 import time
+from nearmap.geospatial.manifest import read_manifest, manifest_to_gdf
+from nearmap.geospatial.vrt import build_shard_vrts, tile_file
+from nearmap.geospatial.warp import resolve_warp_profile, configure_gdal, gdal_config, warp_kwargs
+from nearmap.geospatial.result_manifest import StreamingManifest
+from nearmap._executor import BoundedExecutor
 import warnings
 warnings.simplefilter(action='ignore', category=UserWarning)
 
@@ -47,23 +53,6 @@ def get_raster_geom(in_raster, method=None, as_str=False):
     return ret_val
 
 
-def shapely_polygon_to_shp(in_shapely_geom, crs, out_shapefile):
-
-    # Define a polygon feature geometry with one attribute
-    schema = {
-        'geometry': 'Polygon',
-        'properties': {'id': 'int'},
-    }
-
-    # Write a new Shapefile
-    with fiona.open(out_shapefile, 'w', crs=crs, driver='ESRI Shapefile', schema=schema) as c:
-        c.write({
-            'geometry': mapping(in_shapely_geom),
-            'properties': {'id': 1},
-        })
-    return out_shapefile
-
-
 def get_file_crs(in_file):
     with fiona.open(in_file, mode="r") as source:
         crs = source.crs.get('init').upper()
@@ -110,47 +99,45 @@ def read_file_as_gdf(in_file, mask=None, to_crs='EPSG:4326'):
         print(f"Unable to detect file format for {in_file} or file format not supported")
 
 
-def write_gdf_to_file(gdf=None, output_file=None):
-    output_file = Path(output_file).resolve().as_posix()
-    print(output_file)
-    supported_formats = [".shp", ".geojson"]
-    supported_gdbs = [".gpkg", ".gdb"]
-    if splitext(output_file)[1] in supported_formats:
-        if output_file.endswith(".geojson"):
-            return gdf.to_file(output_file, driver='GeoJSON')
-        elif output_file.endswith(".shp"):
-            return gdf.to_file(output_file)
-    elif splitext(output_file)[1] in supported_gdbs:
-        if output_file.endswith(".gpkg"):
-            return gdf.to_file(output_file, layer="feature")
-        elif output_file.endswith(".gdb"):
-            print("Error: Esri GeoDatabase Format Not Supported")
-            exit()
-    elif splitext(split(output_file)[0])[1] in supported_gdbs:
-        db, layer = split(output_file)
-        db_format = splitext(db)[1]
-        if db_format == ".gpkx":
-            return gdf.to_file(Path(output_file), layer=layer)
-        elif db_format == ".gdb":
-            print("Error: Esri GeoDatabase Format Not Supported")
-            exit()
-    else:
-        print(f"Error: Could not detect file format for {output_file} or format not supported")
-        exit()
+# Per process state set once by the pool initializer: the source VRT stays open for every tile the worker warps
+_worker = dict()
+
 
+def _init_worker(input_vrt, mask_wkt=None, profile=None):
+    configure_gdal(profile)
+    _worker['profile'] = profile
+    _worker['vrt'] = gdal.Open(input_vrt, GA_ReadOnly)
+    _worker['mask'] = shapely.wkt.loads(mask_wkt) if mask_wkt else None
 
-def delete_shapefile(in_shapefile):
-    in_shp = Path(in_shapefile)
-    shp_fmts = ['.shp', '.shx', '.dbf', '.sbn', '.sbx', '.fbn', '.fbx', '.ain', '.aih', '.atx', '.ixs', '.mxs', '.prj',
-                '.xml', '.cpg']
-    [in_shp.with_suffix(_).unlink() for _ in shp_fmts if in_shp.with_suffix(_).is_file()]
 
+def _as_geometry(geometry):
+    # GeoDataFrame, GeoSeries or shapely geometry -> a single shapely geometry
+    if type(geometry).__name__ in ["GeoDataFrame", "GeoSeries"]:
+        return geometry.unary_union
+    return geometry
 
-def reproject_image(input_vrt, scratch_dir, output_image, output_image_format, output_crs, mask_geometry,
-                    bounds_geometry=None, resample_alg='bilinear', fid=None):
-    scratch_dir = Path(scratch_dir)
+
+def _cutline_dataset(geometry, crs, name):
+    # Cutlines are handed to GDAL as an in memory GeoJSON dataset instead of a shapefile on disk
+    path = f"/vsimem/cutline_{name}.geojson"
+    feature_collection = {"type": "FeatureCollection",
+                          "crs": {"type": "name", "properties": {"name": crs}},
+                          "features": [{"type": "Feature", "properties": {"id": 1}, "geometry": mapping(geometry)}]}
+    gdal.FileFromMemBuffer(path, dumps(feature_collection))
+    return path
+
+
+def reproject_image(input_vrt, output_image, output_image_format, output_crs, mask_geometry=None,
+                    bounds_geometry=None, resample_alg='bilinear', fid=None, warp_profile=None):
+    # input_vrt: path or open dataset. None uses the VRT, mask geometry and warp profile set up by _init_worker
+    # warp_profile: profile dict from nearmap.geospatial.warp, None for GDAL defaults
     output_image = Path(output_image).as_posix()
-    input_vrt = Path(input_vrt).as_posix()
+    if input_vrt is None:
+        input_vrt = _worker['vrt']
+        mask_geometry = _worker['mask']
+        warp_profile = _worker['profile']
+    elif not isinstance(input_vrt, gdal.Dataset):
+        input_vrt = Path(input_vrt).as_posix()
 
     formats = {'tif': {'gdal_name': 'GTiff', 'opacity_supported': True, 'compression_supported': True},
                'tiff': {'gdal_name': 'GTiff', 'opacity_supported': True, 'compression_supported': True},
@@ -158,65 +145,72 @@ def reproject_image(input_vrt, scratch_dir, output_image, output_image_format, o
                'png': {'gdal_name': 'PNG', 'opacity_supported': True, 'compression_supported': False}
                }
     opacity_supported = formats.get(output_image_format).get('opacity_supported')
-    #try:
     output_bounds = None
     output_bounds_srs = None
-    mask_shapefile = None
+    cutline = None
     crop_to_cutline = False
+    bounds_geometry = _as_geometry(bounds_geometry)
     if bounds_geometry is not None:
         output_bounds_srs = output_crs
-        if type(bounds_geometry).__name__ == "GeoDataFrame":
-            output_bounds = bounds_geometry.total_bounds
-        elif type(bounds_geometry).__name__ == "Polygon":
+        if type(bounds_geometry).__name__ in ["Polygon", "MultiPolygon"]:
             output_bounds = bounds_geometry.bounds
         else:
-            print(f"Error: Geometry type for 'mask_geometry' {type(mask_geometry)} is not supported")
-    # TODO: If Bounds Geometry clip mask geometry to bounds before saving as .shp
+            print(f"Error: Geometry type for 'bounds_geometry' {type(bounds_geometry)} is not supported")
+    mask_geometry = _as_geometry(mask_geometry)
     if mask_geometry is not None:
-        mask_shapefile = (scratch_dir / f"{splitext(basename(output_image))[0]}.shp")
-        crop_to_cutline = True
-        if type(mask_geometry).__name__ == "GeoDataFrame":
-            write_gdf_to_file(gdf=mask_geometry, output_file=mask_shapefile)
-        elif type(mask_geometry).__name__ == "Polygon":
-            shapely_polygon_to_shp(mask_geometry, output_crs, mask_shapefile)
-        else:
+        if type(mask_geometry).__name__ not in ["Polygon", "MultiPolygon"]:
             print(f"Error: Geometry type for 'mask_geometry' {type(mask_geometry)} not supported")
+        else:
+            if output_bounds is not None:
+                # Only the part of the mask inside the output tile is handed to the warper
+                mask_geometry = mask_geometry.intersection(box(*output_bounds))
+            if mask_geometry.is_empty:
+                return None  # the tile lies outside the mask
+            cutline = _cutline_dataset(mask_geometry, output_crs, f"{getpid()}_{fid}")
+            crop_to_cutline = True
 
     warp_options = gdal.WarpOptions(format=formats.get(output_image_format).get('gdal_name'),
                                     resampleAlg=resample_alg,
                                     dstSRS=output_crs,
                                     outputBounds=output_bounds,
                                     outputBoundsSRS=output_bounds_srs,
-                                    cutlineDSName=mask_shapefile,
+                                    cutlineDSName=cutline,
                                     cropToCutline=crop_to_cutline,
-                                    dstAlpha=opacity_supported)
-
-    gdal.Warp(output_image, input_vrt, options=warp_options)
-    if type(mask_geometry).__name__ == "GeoDataFrame":
-        del mask_geometry
-    if mask_shapefile is not None:
-        if Path(mask_shapefile).is_file():
-            delete_shapefile(in_shapefile=mask_shapefile)
-    '''
-    except Exception as e:
-        print(f'VRT to image file conversion failed for {output_image} | {e}')
-    '''
-    # TODO Return Geometry of output Tile, Tile ID, and Tile Name to merge in the results manifest geojson
+                                    dstAlpha=opacity_supported,
+                                    **warp_kwargs(warp_profile, formats.get(output_image_format).get('gdal_name')))
+    try:
+        gdal.Warp(output_image, input_vrt, options=warp_options)
+    finally:
+        if cutline is not None:
+            gdal.Unlink(cutline)
+    # The footprint comes from the warp bounds (the cutline extent when cropping), the output is not reopened
     temp = dict()
     temp['id'] = fid
     temp['tile'] = Path(output_image).name
-    temp['geometry'] = get_raster_geom(output_image, method="polygon", as_str=False)
+    if crop_to_cutline:
+        temp['geometry'] = box(*mask_geometry.bounds)
+    elif output_bounds is not None:
+        temp['geometry'] = box(*output_bounds)
+    else:
+        temp['geometry'] = get_raster_geom(output_image, method="polygon", as_str=False)
     return temp
 
 
 def reprojection(input_dir, output_dir, tile_manifest=None, mask_geometry=None, output_crs:str=None,
-                 max_cores:int=None):
+                 max_cores:int=None, warp_profile="tuned", manifest_format=".gpkg"):
     """
     The following function is used to take the output from the production code, "get_tiles_production_mapping.py". Once
     the imagery download is pulled for a specific size tiling structure, this script is used to run on the subsequent
     imagery tiles, convert to a virtual raster tileset, reproject, and then convert back to a geotiff for use in the
     converted coordinate system.
 
+    warp_profile: "tuned" sizes GDAL_CACHEMAX and warp memory per worker so cores x cache fits in RAM and enables
+    multithreaded warping (see nearmap.geospatial.warp). Note "tuned" changes the output: GeoTIFFs are written tiled
+    (512 x 512 blocks) and DEFLATE compressed instead of GDAL's striped, uncompressed default. None uses GDAL
+    defaults, a dict from nearmap.geospatial.warp.warp_profile() sets custom values. GDAL options set for a single
+    output are restored when it is written, worker processes keep theirs until the pool exits.
+    manifest_format: ".gpkg", ".parquet" or ".geojsonl" manifest of the output tiles, appended as tiles complete.
+
     Note: This is a working codebase, Python Bindings need to be added.
     """
 
@@ -232,13 +226,14 @@ def reprojection(input_dir, output_dir, tile_manifest=None, mask_geometry=None,
     assert input_dir.is_dir, f"Error: 'input_dir' must be a directory... {input_dir} is not supported"
     assert not output_dir.is_file(), f"Error: 'output_dir' {output_dir} cannot be a file... must be a folder/directory"
     supported_vector_formats = [".shp", ".geojson"]
+    supported_manifest_formats = [".npy", ".parquet"]  # Compact tile manifests from slippy_tile_gen.py
     # TODO: Add assertion support for geopackage layer as input
     for _ in [["tile_manifest", tile_manifest], ["mask_geometry", mask_geometry]]:
         if _[1] is not None:
             _[1] = Path(_[1])
+            formats = supported_vector_formats + (supported_manifest_formats if _[0] == "tile_manifest" else [])
             assert _[1].is_file(), f"Error: '{_[0]}' {_[1]} must be a file."
-            assert _[1].suffix in supported_vector_formats, f"Error: '{_[0]}' {_[1]} not a member of " \
-                                                            f"{supported_vector_formats}"
+            assert _[1].suffix in formats, f"Error: '{_[0]}' {_[1]} not a member of {formats}"
 
     print('User Input Values:')
     print('=' * 30)
@@ -248,7 +243,7 @@ def reprojection(input_dir, output_dir, tile_manifest=None, mask_geometry=None,
     print('_' * 30)
     start_time = time.perf_counter()
 
-    supported_raster_formats = [".jpg", ".tif"]
+    supported_raster_formats = [".jpg", ".png", ".tif"]
     source_image_list = [_.as_posix() for _ in list(Path(input_dir).iterdir()) if _.suffix in supported_raster_formats]
     print(f'Detected {len(source_image_list)} Images for processing')
     assert len(source_image_list) > 0, f"Error: No supported images detected in {input_dir} that are members of " \
@@ -256,7 +251,12 @@ def reprojection(input_dir, output_dir, tile_manifest=None, mask_geometry=None,
 
     _create_folder(output_dir)
     tile_manifest_gdf = None
-    if tile_manifest:
+    manifest = None
+    if tile_manifest and Path(tile_manifest).suffix in supported_manifest_formats:
+        # Tile boxes are derived from z/x/y and projected straight to output_crs
+        manifest = read_manifest(tile_manifest)
+        tile_manifest_gdf = manifest_to_gdf(manifest, to_crs=output_crs)
+    elif tile_manifest:
         crs = get_file_crs(tile_manifest)
         if crs == output_crs:
             to_crs = None
@@ -278,41 +278,47 @@ def reprojection(input_dir, output_dir, tile_manifest=None, mask_geometry=None,
     print(f'creating a vrt for the images in the processing folder...')
     sample_image = source_image_list[0]
     input_image_format = Path(sample_image).suffix.strip(".")
-    vrt_options = None
-    rds = gdal.Open(sample_image)  # Sample first image to detect if alpha band (band-4) already exists
-    if rds.RasterCount > 3:
-        if input_image_format == "jpg":
-            vrt_options = gdal.BuildVRTOptions(addAlpha=False) #resampleAlg=None
-        elif input_image_format == "tif":
-            vrt_options = gdal.BuildVRTOptions(addAlpha=False)
-    else:
-        if input_image_format == "jpg":
-            vrt_options = gdal.BuildVRTOptions(addAlpha=False)  # resampleAlg=None
-        elif input_image_format == "tif":
-            vrt_options = gdal.BuildVRTOptions(addAlpha=True)
-    rds = None  # Destroys the Open GDAL Operation
     vrt_file = (output_dir / "original_virtual_file.vrt").as_posix()
-    my_vrt = gdal.BuildVRT(vrt_file, source_image_list, options=vrt_options)
-    my_vrt = None  # Destroys the VRT Opertion to remove the shapefile lock. Necessary for concurrent processing
-
-    scratch_dir = output_dir / "scratch"
-    _create_folder(scratch_dir)
+    if manifest is not None and len(manifest) and \
+            tile_file(input_dir, manifest['x'][0], manifest['y'][0], manifest['z'][0]) is not None:
+        # Raw {x}_{y}_{z} tiles: the VRT places them on their z/x/y grid in place, nothing is re-encoded
+        input_image_format = "tif"
+        vrt_file = build_shard_vrts(manifest, input_dir, output_dir / "vrt").as_posix()
+    else:
+        vrt_options = None
+        rds = gdal.Open(sample_image)  # Sample first image to detect if alpha band (band-4) already exists
+        if rds.RasterCount > 3:
+            if input_image_format == "jpg":
+                vrt_options = gdal.BuildVRTOptions(addAlpha=False) #resampleAlg=None
+            elif input_image_format == "tif":
+                vrt_options = gdal.BuildVRTOptions(addAlpha=False)
+        else:
+            if input_image_format == "jpg":
+                vrt_options = gdal.BuildVRTOptions(addAlpha=False)  # resampleAlg=None
+            elif input_image_format == "tif":
+                vrt_options = gdal.BuildVRTOptions(addAlpha=True)
+        rds = None  # Destroys the Open GDAL Operation
+        my_vrt = gdal.BuildVRT(vrt_file, source_image_list, options=vrt_options)
+        my_vrt = None  # Destroys the VRT Opertion to remove the shapefile lock. Necessary for concurrent processing
 
-    processed_tiles = []
+    result_manifest = StreamingManifest(output_dir / f"manifest{manifest_format}", crs=output_crs)
 
     if tile_manifest is None:
         output_image = output_dir / f"tile.{input_image_format}"
-        reproject_image(input_vrt=vrt_file,
-                        scratch_dir=scratch_dir,
-                        output_image=output_image,
-                        output_image_format=input_image_format,
-                        output_crs=output_crs,
-                        mask_geometry=mask_geometry_gdf,
-                        fid=0)
+        profile = resolve_warp_profile(warp_profile, processes=1)
+        # Runs in the calling process, so the GDAL options are restored once the image is written
+        with gdal_config(profile):
+            result = reproject_image(input_vrt=vrt_file,
+                                     warp_profile=profile,
+                                     output_image=output_image,
+                                     output_image_format=input_image_format,
+                                     output_crs=output_crs,
+                                     mask_geometry=mask_geometry_gdf,
+                                     fid=0)
+        result_manifest.append(result)
 
     elif tile_manifest:
 
-        # TODO: Implement Multiprocessing here MFA's
         print("Commence Imagery Reprojection & Tiline Process")
         system_cores = cpu_count()
         if max_cores:
@@ -331,45 +337,33 @@ def reprojection(input_dir, output_dir, tile_manifest=None, mask_geometry=None,
         if num_features > max_cores:
             num_cores = max_cores
 
-        with concurrent.futures.ProcessPoolExecutor(num_cores) as executor:
+        # Each worker opens the VRT and parses the mask once, jobs only carry their tile bounds
+        mask_wkt = _as_geometry(mask_geometry_gdf).wkt if mask_geometry_gdf is not None else None
+        profile = resolve_warp_profile(warp_profile, processes=num_cores or system_cores)
+
+        def _jobs():
+            # Built lazily, only the tiles in flight exist as pickled jobs at any time
+            for index, geometry in zip(tile_manifest_gdf.index, tile_manifest_gdf.geometry):
+                output_image = output_dir / f"tile_{index}.{input_image_format}"
+                yield {'input_vrt': None,
+                       'output_image': output_image.as_posix(),
+                       'output_image_format': input_image_format,
+                       'output_crs': output_crs,
+                       'bounds_geometry': geometry,
+                       'fid': index}
+
+        with BoundedExecutor(num_cores, processes=True, initializer=_init_worker,
+                             initargs=(vrt_file, mask_wkt, profile)) as executor:
             with tqdm(total=num_features) as progress:
-                jobs = []
-                for index, row in tile_manifest_gdf.iterrows():
-                    geometry = tile_manifest_gdf.loc[index, 'geometry']
-                    output_image = output_dir / f"tile_{index}.{input_image_format}"
-                    jobs.append(executor.submit(reproject_image,
-                                                input_vrt=vrt_file,
-                                                scratch_dir=scratch_dir.as_posix(),
-                                                output_image=output_image.as_posix(),
-                                                output_image_format=input_image_format,
-                                                output_crs=output_crs,
-                                                bounds_geometry=geometry,
-                                                mask_geometry=mask_geometry_gdf,
-                                                fid=index))
-                for job in jobs:
-                    result = job.result()
-                    if result is not None:
-                        processed_tiles.append(result)
+                for job, future in executor.as_completed(reproject_image, _jobs()):
+                    result_manifest.append(future.result())
                     progress.update()
     # Cleaup After Processing
-    rmtree(scratch_dir, ignore_errors=True)
-    del my_vrt
-    Path(vrt_file).unlink()
-
-    if len(processed_tiles) >= 1:
-        ts = time.time()
-        print({'status': 'Begin Loading Manifest to GeoDataFrame'})
-        # print(f'Begin Loading Manifest to GeoDataFrame')
-        result = gpd.GeoDataFrame(processed_tiles).set_crs(output_crs)
-        del processed_tiles
-        te = time.time()
-        print({'status': f'Loaded Manifest as GeoDataFrame in {te - ts} seconds'})
-        print({'status': 'Begin Exporting Results to geojson file'})
-        ts = time.time()
-        manifest_file = output_dir / "manifest.geojson"
-        result.to_file(manifest_file, driver='GeoJSON')
-        te = time.time()
-        print({'status': f"Exported to GeoJSON in {te - ts} seconds"})
+    rmtree(output_dir / "vrt", ignore_errors=True)
+    Path(vrt_file).unlink(missing_ok=True)
+
+    manifest_file = result_manifest.close()
+    print({'status': f"Recorded {result_manifest.count} tiles in {manifest_file}"})
     end_time = time.perf_counter()
     total_time = end_time-start_time
     total_min = total_time/60
@@ -387,5 +381,6 @@ if __name__ == "__main__":
     output_dir = r'C:/output_test'
     tile_manifest = r'C:/output_tiles/FL/1245025_MiamiBeach/manifest_extents.geojson'
     output_crs = 'EPSG:2236'  # Example: NAD83 Florida East (ftUS) | Lookup your CRS at: http://www.spatialreference.org
+    warp_profile = "tuned"  # "tuned" or None for GDAL defaults
 
-    reprojection(input_dir, output_dir, tile_manifest, output_crs=output_crs)
+    reprojection(input_dir, output_dir, tile_manifest, output_crs=output_crs, warp_profile=warp_profile)
@@ -20,32 +20,8 @@ out_image = f"test_image.{format}"
 x, y = lat_lon_to_slippy_coords(lat_deg, lon_deg, zoom)
 z = zoom
 
-# Get Vert Image Tile as Bytes
-tileResourceType = "Vert"
-image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-imBytes = Image.open(image_tile_bytes)
-imBytes.show()
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "North"
-image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-imBytes = Image.open(image_tile_bytes)
-imBytes.show()
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "South"
-image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-imBytes = Image.open(image_tile_bytes)
-imBytes.show()
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "East"
-image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-imBytes = Image.open(image_tile_bytes)
-imBytes.show()
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "West"
-image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-imBytes = Image.open(image_tile_bytes)
-imBytes.show()
+# Get the Vert, North, South, East and West Image Tiles as Bytes in one concurrent request
+image_tiles = nearmap.tileMultiViewV3(z, x, y, format, "bytes", rate_limit_mode="slow")
+for tileResourceType, image_tile_bytes in image_tiles.items():
+    imBytes = Image.open(image_tile_bytes)
+    imBytes.show()
@@ -21,34 +21,12 @@ image_pixel_offset = 25
 x, y = lat_lon_to_slippy_coords(lat_deg, lon_deg, zoom)
 z = zoom
 
-# Get Vert Image Tile as Bytes
-tileResourceType = "Vert"
-vert_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-vert_imBytes = Image.open(vert_image_tile_bytes)
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "North"
-north_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-north_imBytes = Image.open(north_image_tile_bytes)
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "South"
-south_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-south_imBytes = Image.open(south_image_tile_bytes)
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "East"
-east_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-east_imBytes = Image.open(east_image_tile_bytes)
-
-# Get Vert Image Tile as Bytes
-tileResourceType = "West"
-west_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-west_imBytes = Image.open(west_image_tile_bytes)
+# Get the Vert, North, South, East and West Image Tiles as Bytes in one concurrent request
+image_tiles = nearmap.tileMultiViewV3(z, x, y, format, "bytes", rate_limit_mode="slow")
 
 # Merge the Tiles into a single image
-img_list = [["Vert", vert_imBytes], ["North", north_imBytes], ["South", south_imBytes], ["East", east_imBytes],
-            ["West", west_imBytes]]
+img_list = [[tileResourceType, Image.open(image_tile_bytes)] for tileResourceType, image_tile_bytes in
+            image_tiles.items()]
 len = sum([_[1].size[0] for _ in img_list]) + (image_pixel_offset*(len(img_list)+1))
 height = max([_[1].size[1] for _ in img_list]) + (image_pixel_offset*2)
 merged_image = Image.new('RGB', (len, height), (250, 250, 250))
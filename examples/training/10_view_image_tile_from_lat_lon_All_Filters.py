@@ -10,55 +10,14 @@ from PIL.ImageFilter import (
 
 
 def process_image(filter_of_interest):
-    # Get Vert Image Tile as Bytes
-    tileResourceType = "Vert"
-    vert_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-    vert_imBytes = Image.open(vert_image_tile_bytes)
-    if filter_of_interest:
-        vert_imBytesFiltered = vert_imBytes.filter(filter_of_interest)
-    else:
-        vert_imBytesFiltered = vert_imBytes
-
-    # Get Vert Image Tile as Bytes
-    tileResourceType = "North"
-    north_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-    north_imBytes = Image.open(north_image_tile_bytes)
-    if filter_of_interest:
-        north_imBytesFiltered = north_imBytes.filter(filter_of_interest)
-    else:
-        north_imBytesFiltered = north_imBytes
-
-    # Get Vert Image Tile as Bytes
-    tileResourceType = "South"
-    south_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-    south_imBytes = Image.open(south_image_tile_bytes)
-    if filter_of_interest:
-        south_imBytesFiltered = south_imBytes.filter(filter_of_interest)
-    else:
-        south_imBytesFiltered = south_imBytes
-
-    # Get Vert Image Tile as Bytes
-    tileResourceType = "East"
-    east_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-    east_imBytes = Image.open(east_image_tile_bytes)
-    if filter_of_interest:
-        east_imBytesFiltered = east_imBytes.filter(filter_of_interest)
-    else:
-        east_imBytesFiltered = east_imBytes
-
-    # Get Vert Image Tile as Bytes
-    tileResourceType = "West"
-    west_image_tile_bytes = nearmap.tileV3(tileResourceType, z, x, y, format, "bytes", rate_limit_mode="slow")
-    west_imBytes = Image.open(west_image_tile_bytes)
-    if filter_of_interest:
-        west_imBytesFiltered = west_imBytes.filter(filter_of_interest)
-    else:
-        west_imBytesFiltered = west_imBytes
+    # Filter the Vert, North, South, East and West Image Tiles
+    img_list = []
+    for tileResourceType, image_tile_bytes in image_tiles.items():
+        image_tile_bytes.seek(0)
+        imBytes = Image.open(image_tile_bytes)
+        img_list.append([tileResourceType, imBytes.filter(filter_of_interest) if filter_of_interest else imBytes])
 
     # Merge the Tiles into a single image
-    img_list = [["Vert", vert_imBytesFiltered], ["North", north_imBytesFiltered], ["South", south_imBytesFiltered],
-                ["East", east_imBytesFiltered], ["West", west_imBytesFiltered]]
-
     length = sum([_[1].size[0] for _ in img_list]) + (image_pixel_offset * (len(img_list) + 1))
     height = max([_[1].size[1] for _ in img_list]) + (image_pixel_offset * 2)
     merged_image = Image.new('RGB', (length, height), (250, 250, 250))
@@ -107,6 +66,9 @@ if __name__ == "__main__":
     x, y = lat_lon_to_slippy_coords(lat_deg, lon_deg, zoom)
     z = zoom
 
+    # Get the Vert, North, South, East and West Image Tiles as Bytes once, in one concurrent request
+    image_tiles = nearmap.tileMultiViewV3(z, x, y, format, "bytes", rate_limit_mode="slow")
+
     filters = [None, BLUR, CONTOUR, DETAIL, EDGE_ENHANCE, EDGE_ENHANCE_MORE, EMBOSS, FIND_EDGES, SMOOTH, SMOOTH_MORE,
                SHARPEN]
     processed_images = []
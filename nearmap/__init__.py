@@ -12,6 +12,18 @@ __version__ = "0.1.0"
 
 from . import _api
 
+# Submodules that pull in the geospatial stack (pandas, shapely, pyproj, fiona, gdal) are only imported when first
+# accessed (PEP 562) so that 'import nearmap' stays fast for short lived processes.
+_lazy_submodules = ["auth", "geospatial", "_ai_metadata", "_ai_sync", "_key_pool", "_download", "_download_lib",
+                    "_tile_store"]
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        from importlib import import_module
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class NEARMAP(object):
     """
@@ -23,6 +35,8 @@ class NEARMAP(object):
         **Argument**        **Description**
         ----------------    ---------------------------------------------------------------
         api_key             Your Nearmap API Key. More info: https://docs.nearmap.com/display/ND/Managing+API+Keys
+                            A list of API Keys or an APIKeyPool routes each request to the key
+                            with the most rate limit headroom and fails over when a key is throttled.
         ----------------    ---------------------------------------------------------------
 
         .. code-block:: python
@@ -30,15 +44,65 @@ class NEARMAP(object):
             # Usage Example: Connect to Nearmap using API Key
 
             nearmap = NEARMAP()
+
+            # Usage Example: Connect to Nearmap using a pool of API Keys
+
+            nearmap = NEARMAP(["api_key_1", "api_key_2"])
     """
 
     base_url = "https://api.nearmap.com/"
     api_key = None
+    key_pool = None
 
     def __init__(self, api_key=None):
         if api_key is None:
             raise Exception("error: API Key not detected")
+        from nearmap._key_pool import APIKeyPool
+        if isinstance(api_key, (list, tuple)):
+            api_key = APIKeyPool(api_key)
+        if isinstance(api_key, APIKeyPool):
+            # Requests are built with the pool token and routed to a pooled key as they are sent
+            self.key_pool = api_key
+            api_key = api_key.token
+        elif not isinstance(api_key, str):
+            raise Exception(f"error: api_key must be a string, a list of strings or an APIKeyPool, not "
+                            f"{type(api_key).__name__}")
         self.api_key = api_key
+        self._ai_metadata = None
+
+    @property
+    def ai_metadata(self):
+        """
+        Cached and indexed registry of the AI Packs and AI Classes available to your API Key. The catalogs are
+        downloaded on first use and cached on disk for 24 hours. See nearmap._ai_metadata.AIMetadata
+        """
+        if self._ai_metadata is None:
+            from nearmap._ai_metadata import AIMetadata
+            self._ai_metadata = AIMetadata(self.base_url, self.api_key)
+        return self._ai_metadata
+
+    @property
+    def instrumentation(self):
+        """
+        Request level metrics and hooks for every API call: per endpoint request counts, latency histograms, bytes,
+        status codes, retries and rate limit headroom. Metrics are shared by all NEARMAP instances in the process.
+        See nearmap._instrumentation.Instrumentation
+        """
+        return _api.instrumentation
+
+    @property
+    def tile_store(self):
+        """
+        Optional cache tier in front of tileV3 and tileSurveyV3, e.g. nearmap._tile_store.RedisTileStore. Tiles
+        found in the store are returned without a request and fetched tiles are stored as raw bytes. Tiles of the
+        latest imagery expire (after a day by default) so new surveys are picked up, and an unavailable store falls
+        through to the API. Shared by all NEARMAP instances in the process. Set to None to disable.
+        """
+        return _api.tile_store
+
+    @tile_store.setter
+    def tile_store(self, store):
+        _api.tile_store = store
 
     ####################
     # Download Features
@@ -57,6 +121,8 @@ class NEARMAP(object):
                ---------------     --------------------------------------------------------------------
                polygon             Required string or list of lon/lat coords in WGS84 (EPSG : 4326)
                                    Example: "lon1,lat1,lon2,lat2,..." -or [lon1,lat1,lon2,lat2,...]
+                                   -or- file path (.geojson, .json, .shp, .gpkg, .gdb/layer, .kml, .kmz). Every
+                                   polygon of a multi feature file is gridded in one call, shared cells are kept once.
                ---------------     --------------------------------------------------------------------
                out_folder          Required file location where the output tif responses will be saved.
                                    Example: file path
@@ -125,6 +191,8 @@ class NEARMAP(object):
                                     Refer to Coverage API - Filter Surveys for further detail on tags.
                                     https://docs.nearmap.com/display/ND/Coverage+API#CoverageAPI-FilterSurveys
                ===============     ====================================================================
+               Note: With a pool of API Keys the ortho tiles are fetched with the one pooled key that has the most
+               rate limit headroom when the call starts. Keys are not rotated per cell.
                :return: tif file responses in a mosiac of the area of interest.
                """
         return _api.download_ortho(self.api_key, polygon, out_folder, out_format, tertiary, since, until, mosaic,
@@ -142,6 +210,8 @@ class NEARMAP(object):
                 ---------------     --------------------------------------------------------------------
                 polygon             Required string or list of lon/lat coords in WGS84 (EPSG : 4326)
                                     Example: "lon1,lat1,lon2,lat2,..." -or [lon1,lat1,lon2,lat2,...]
+                                    -or- file path (.geojson, .json, .shp, .gpkg, .gdb/layer, .kml, .kmz). Every
+                                    polygon of a multi feature file is gridded in one call, shared cells are kept once.
                 ---------------     --------------------------------------------------------------------
                 out_folder   Required file location where the output tif responses will be saved.
                                     Example: file path
@@ -203,6 +273,8 @@ class NEARMAP(object):
                ---------------     --------------------------------------------------------------------
                polygon             Required string or list of lon/lat coords in WGS84 (EPSG : 4326)
                                    Example: "lon1,lat1,lon2,lat2,..." -or [lon1,lat1,lon2,lat2,...]
+                                   -or- file path (.geojson, .json, .shp, .gpkg, .gdb/layer, .kml, .kmz). Every
+                                   polygon of a multi feature file is gridded in one call, shared cells are kept once.
                ---------------     --------------------------------------------------------------------
                since               Optional string.    The first day from which to retrieve the ai data (inclusive).
                                    The two possible formats are:
@@ -271,6 +343,8 @@ class NEARMAP(object):
                ---------------     --------------------------------------------------------------------
                polygon             Required string or list of lon/lat coords in WGS84 (EPSG : 4326)
                                    Example: "lon1,lat1,lon2,lat2,..." -or [lon1,lat1,lon2,lat2,...]
+                                   -or- file path (.geojson, .json, .shp, .gpkg, .gdb/layer, .kml, .kmz). Every
+                                   polygon of a multi feature file is gridded in one call, shared cells are kept once.
                ---------------     --------------------------------------------------------------------
                since               Optional string.    The first day from which to retrieve the ai data (inclusive).
                                    The two possible formats are:
@@ -317,6 +391,8 @@ class NEARMAP(object):
                ---------------     --------------------------------------------------------------------
                surveyResourceID    placeholder for later use.... of no current usage value
                ===============     ====================================================================
+               Note: With a pool of API Keys the ortho tiles are fetched with the one pooled key that has the most
+               rate limit headroom when the call starts. Keys are not rotated per cell.
                :return: json, text, or pandas dataframe object
                """
 
@@ -324,6 +400,48 @@ class NEARMAP(object):
                                    include, exclude, packs, out_ai_format, out_ortho_format, lat_lon_direction,
                                    surveyResourceID)
 
+    def sync_ai(self, polygon, out_folder, since=None, until=None, packs=None, index_file=None,
+                lat_lon_direction="yx"):
+        """
+               Function incrementally syncs AI Features for an area of interest. Before downloading, each cell is
+               checked against the Coverage API for an AI enabled survey (a survey with an 'aifeatures' resource)
+               newer than the survey recorded for that cell on the previous sync, or for the same survey re-processed
+               with a new AI system version. Only those cells are re-downloaded and upserted. Sync state is kept in a
+               local SQLite index.
+               More Info: https://docs.nearmap.com/display/ND/AI+Feature+API
+               ===============     ====================================================================
+               **Argument**        **Description**
+               ---------------     --------------------------------------------------------------------
+               polygon             Required string, list or dict.
+                                   string or list of lon/lat coords in WGS84 (EPSG : 4326) which will be split into
+                                   the download_ai grid.
+                                   Example: "lon1,lat1,lon2,lat2,..." -or [lon1,lat1,lon2,lat2,...]
+                                   -or- dict of pre-defined cells such as parcels keyed by a unique id.
+                                   Example: {"parcel_1": [lon1,lat1,lon2,lat2,...], ...}
+               ---------------     --------------------------------------------------------------------
+               out_folder          Required folder. Each cell is written to out_folder/cells/{cell_id}.json
+               ---------------     --------------------------------------------------------------------
+               since               Optional string.    The first day from which to retrieve the ai data (inclusive).
+                                   See download_ai for the available formats.
+               ---------------     --------------------------------------------------------------------
+               until               Optional string.    The last day from which to retrieve the ai data (inclusive).
+                                   See download_ai for the available formats.
+               ---------------     --------------------------------------------------------------------
+               packs               Optional string.    Input the name or list of names for the AI packs you want to
+                                   download.
+               ---------------     --------------------------------------------------------------------
+               index_file          Optional string.    SQLite sync index file.
+                                   Default: out_folder/ai_sync_index.sqlite
+               ---------------     --------------------------------------------------------------------
+               lat_lon_direction   Optional string.  Reverses the ordering of the default point input parameter from
+                                   lon/lat to lat/lon coords to support US and other nations using this ordering.
+                                   Usage: "xy" for US, "yx" for other
+               ===============     ====================================================================
+               :return: dict of 'checked', 'updated' and 'unchanged' cell ids
+               """
+        return _api.sync_ai(self.base_url, self.api_key, polygon, out_folder, since, until, packs, index_file,
+                            lat_lon_direction)
+
     ###############
     #  NEARMAP AI
     #############
@@ -381,6 +499,8 @@ class NEARMAP(object):
                             returned by default.
                             The available output dataset are:
                                 "json" - returns a json object (This is the default)
+                                "stream" - returns a generator yielding one feature json object at a time. The
+                                           response is parsed incrementally when the ijson library is installed.
                                 "text" - returns a text object
                                 "pandas" - returns a pandas dataframe object
                                 "geopandas" - returns a geopandas geodataframe object
@@ -468,6 +588,51 @@ class NEARMAP(object):
         """
         return _api.aiPacksV4(self.base_url, self.api_key, out_format, return_url)
 
+    def aiFeaturesByPackV4(self, polygon, since=None, until=None, packs=None, out_format="json", output=None,
+                           lat_lon_direction="yx", surveyResourceID=None):
+        """
+        Function retrieves AI Features for every requested AI Pack in a single features.json request and partitions
+        the returned features by AI Pack locally, using the feature class to pack mapping from packs.json. This
+        replaces issuing one aiFeaturesV4 request per AI Pack for the same area.
+        More Info: https://docs.nearmap.com/display/ND/AI+Feature+API
+
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        polygon             Required string or list of lon/lat coords in WGS84 (EPSG : 4326)
+                            Example: "lon1,lat1,lon2,lat2,..." -or [lon1,lat1,lon2,lat2,...]
+        ---------------     --------------------------------------------------------------------
+        since               Optional string.    The first day from which to retrieve the ai data (inclusive).
+                            See aiFeaturesV4 for the available formats.
+        ---------------     --------------------------------------------------------------------
+        until               Optional string.    The last day from which to retrieve the ai data (inclusive).
+                            See aiFeaturesV4 for the available formats.
+        ---------------     --------------------------------------------------------------------
+        packs               Optional string or list.  The AI Pack codes to retrieve. Example: ["building", "solar"]
+                            If not specified all AI Packs available with your subscription are retrieved.
+        ---------------     --------------------------------------------------------------------
+        out_format          Optional string.    Output format of the partitioned dataset.
+                            The available values are:
+                                "json" - returns a dict of {pack: json object} (This is the default). When 'output'
+                                         is specified one {pack}.json file is written per AI Pack.
+                                "gpkg" - writes a single nearmap.gpkg geopackage to 'output' with one layer per
+                                         AI Pack
+        ---------------     --------------------------------------------------------------------
+        output              Optional string.    Output folder for writing the partitioned dataset to.
+        ---------------     --------------------------------------------------------------------
+        lat_lon_direction   Optional string.  Reverses the ordering of the default point input parameter from lon/lat
+                            to lat/lon coords to support US and other nations using this ordering.
+                            Usage: "xy" for US, "yx" for other
+        ---------------     --------------------------------------------------------------------
+        surveyResourceID    placeholder for later use.... of no current usage value
+        ===============     ====================================================================
+
+        :return: dict of json objects keyed by AI Pack code, or output folder
+
+        """
+        return _api.aiFeaturesByPackV4(self.base_url, self.api_key, polygon, since, until, packs, out_format, output,
+                                       lat_lon_direction, surveyResourceID, self.ai_metadata)
+
     #####################
     #  NEARMAP Coverage
     ###################
@@ -1044,13 +1209,15 @@ class NEARMAP(object):
                             costs within 30 days since the coverage call was made.
         ---------------     --------------------------------------------------------------------
         out_image           Required string.  The URL to the service or string "bytes" for streaming
+                            or string "buffer" to return a memoryview over a pooled, reusable buffer. Return
+                            the memoryview with nearmap.release_buffer() once consumed.
         ---------------     --------------------------------------------------------------------
         lat_lon_direction   Optional string.  Reverses the ordering of the default point input parameter from lon/lat
                             to lat/lon coords to support US and other nations using this ordering.
                             Usage: "xy" for US, "yx" for other
         ===============     ====================================================================
 
-        :return: out_image or bytes
+        :return: out_image, bytes or memoryview
 
         """
         return _api.imageStaticMapV2(self.base_url, surveyID, image_type, file_format, point, radius,
@@ -1160,14 +1327,75 @@ class NEARMAP(object):
                             https://docs.nearmap.com/display/ND/Coverage+API#CoverageAPI-FilterSurveys
         ---------------     --------------------------------------------------------------------
         out_image           Required string.  The output fil path or string "bytes" for streaming
+                            or string "buffer" to return a memoryview over a pooled, reusable buffer. Return
+                            the memoryview with nearmap.release_buffer() once consumed.
         ===============     ====================================================================
 
-        :return: out_image or bytes
+        :return: out_image, bytes or memoryview
 
         """
         return _api.tileV3(self.base_url, self.api_key, tileResourceType, z, x, y, out_format, out_image, tertiary,
                            since, until, mosaic, include, exclude, rate_limit_mode, return_url)
 
+    def tileMultiViewV3(self, z, x, y, out_format, out_image, views=None, dates=None, tertiary=None, mosaic=None,
+                        include=None, exclude=None, rate_limit_mode="slow", max_threads=None, name_pattern=None):
+        """
+        Function retrieves several tile resource types (and optionally several survey dates) of the same location
+        concurrently, so fetching Vert, North, South, East and West costs about one round trip instead of five.
+
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        z                   Required integer.   The zoom level. The highest resolution is typically 21.
+        ---------------     --------------------------------------------------------------------
+        x                   Required integer or list of integers.   The X tile coordinate(s) (column).
+        ---------------     --------------------------------------------------------------------
+        y                   Required integer or list of integers.   The Y tile coordinate(s) (row).
+                            Must be the same length as x when lists are used.
+        ---------------     --------------------------------------------------------------------
+        out_format          Required string. The format of the tile output: jpg, png or img.
+        ---------------     --------------------------------------------------------------------
+        out_image           Required string.  An output folder, or string "bytes" for streaming or string
+                            "buffer" for pooled memoryviews. Files are named by name_pattern.
+        ---------------     --------------------------------------------------------------------
+        views               Optional list.  The tile resource types to fetch.
+                            Default: ["Vert", "North", "South", "East", "West"]
+        ---------------     --------------------------------------------------------------------
+        dates               Optional list of strings.   Survey dates (YYYY-MM-DD) to fetch each view for, e.g.
+                            the captureDate values of coverageV2. Each date is requested with since and until
+                            set to that date.
+        ---------------     --------------------------------------------------------------------
+        tertiary            Optional string.    See tileV3.
+        ---------------     --------------------------------------------------------------------
+        mosaic              Optional string.    See tileV3.
+        ---------------     --------------------------------------------------------------------
+        include             Optional string.    See tileV3.
+        ---------------     --------------------------------------------------------------------
+        exclude             Optional string.    See tileV3.
+        ---------------     --------------------------------------------------------------------
+        max_threads         Optional integer.   Concurrent requests. Default: one per tile up to 32.
+        ---------------     --------------------------------------------------------------------
+        name_pattern        Optional string.    File name of each tile written to the out_image folder, formatted
+                            with the fields {view}, {x}, {y}, {z}, {date} and {format}. Every tile of the call must
+                            get a distinct name, e.g. "{view}.{format}" for the views of a single tile.
+                            Default: "{view}_{x}_{y}_{z}.{format}", or "{date}_{view}_{x}_{y}_{z}.{format}" when
+                            dates are requested.
+        ===============     ====================================================================
+
+        :return: dictionary of {view: tile}, {date: {view: tile}} when dates are given, keyed first by (x, y) when
+                 x and y are lists. A tile is out_image's type (file path, bytes or memoryview) or None if not found.
+
+        .. code-block:: python
+
+            # Usage Example: Every view of a tile in one call
+
+            tiles = nearmap.tileMultiViewV3(19, 119799, 215845, "jpg", "bytes")
+            vert = Image.open(tiles["Vert"])
+
+        """
+        return _api.tileMultiViewV3(self.base_url, self.api_key, z, x, y, out_format, out_image, views, dates,
+                                    tertiary, mosaic, include, exclude, rate_limit_mode, max_threads, name_pattern)
+
     def tileSurveyV3(self, surveyid, contentType, z, x, y, out_format, out_image, rate_limit_mode="slow",
                      return_url=False):
         """
@@ -1213,10 +1441,19 @@ class NEARMAP(object):
                             the response.
         ---------------     --------------------------------------------------------------------
         out_image           Required string.  The output fil path or string "bytes" for streaming
+                            or string "buffer" to return a memoryview over a pooled, reusable buffer. Return
+                            the memoryview with nearmap.release_buffer() once consumed.
         ===============     ====================================================================
 
-        :return: out_image or bytes
+        :return: out_image, bytes or memoryview
 
         """
         return _api.tileSurveyV3(self.base_url, self.api_key, surveyid, contentType, z, x, y, out_format, out_image,
                                  rate_limit_mode, return_url)
+
+    def release_buffer(self, view):
+        """
+        Returns a memoryview from an out_image="buffer" request to the buffer pool so it can be reused by the next
+        request. The memoryview must not be used after it is released.
+        """
+        return _api.release_buffer(view)
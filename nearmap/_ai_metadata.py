@@ -0,0 +1,183 @@
+####################################
+#   File name: _ai_metadata.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+from hashlib import sha1
+from pathlib import Path
+from time import time
+
+try:
+    from ujson import loads, dumps
+except ModuleNotFoundError:
+    from json import loads, dumps
+
+
+def _default_cache_dir():
+    return Path.home() / ".nearmap" / "cache"
+
+
+class AIMetadata(object):
+    """
+        .. _AIMetadata:
+
+        Registry of the AI Feature API packs.json and classes.json catalogs for an API Key. Catalogs are downloaded
+        once, cached on disk for 'ttl' seconds and indexed so feature class and pack lookups are dictionary hits
+        rather than linear scans of the catalog json.
+
+        ================    ===============================================================
+        **Argument**        **Description**
+        ----------------    ---------------------------------------------------------------
+        base_url            Required string. The Nearmap API base url.
+        ----------------    ---------------------------------------------------------------
+        api_key             Required string. Your Nearmap API Key.
+        ----------------    ---------------------------------------------------------------
+        cache_dir           Optional string. Folder for the cached catalogs. Default: ~/.nearmap/cache
+                            Set to False to disable the on disk cache.
+        ----------------    ---------------------------------------------------------------
+        ttl                 Optional integer. Seconds before cached catalogs are downloaded again. Default: 86400
+        ================    ===============================================================
+
+        .. code-block:: python
+
+            # Usage Example: Lookup the AI Packs a feature class belongs to
+
+            nearmap = NEARMAP(api_key)
+            nearmap.ai_metadata.packs_for_class(class_id)
+    """
+
+    def __init__(self, base_url, api_key, cache_dir=None, ttl=86400):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.ttl = ttl
+        if cache_dir is None:
+            cache_dir = _default_cache_dir()
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._packs = None
+        self._classes = None
+
+    ###################
+    # Catalog Loading
+    #################
+
+    def _cache_file(self, name):
+        key_hash = sha1(self.api_key.encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"ai_{name}_{key_hash}.json"
+
+    def _load(self, name, fetch):
+        cache_file = None
+        if self.cache_dir:
+            cache_file = self._cache_file(name)
+            if cache_file.is_file() and time() - cache_file.stat().st_mtime < self.ttl:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    catalog = loads(f.read())
+                if isinstance(catalog, dict) and name in catalog:
+                    return catalog
+        catalog = fetch(self.base_url, self.api_key, out_format="json")
+        # Error responses (bad key, rate limit) are returned but never cached
+        assert isinstance(catalog, dict), f"Error: unexpected AI {name} response {catalog}"
+        if name not in catalog:
+            return catalog
+        if cache_file is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, "w", encoding="utf-8") as f:
+                f.write(dumps(catalog))
+        return catalog
+
+    def _index(self):
+        class_ids = []
+        class_descriptions = dict()
+        for c in self._classes.get("classes", []):
+            class_ids.append(c.get("id"))
+            class_descriptions[c.get("id")] = c.get("description")
+        pack_codes = [p.get("code") for p in self._packs.get("packs", [])]
+        class_packs = dict()
+        for pack in self._packs.get("packs", []):
+            for feature_class in pack.get("featureClasses", []):
+                class_id = feature_class.get("id")
+                if class_id not in class_descriptions:
+                    class_ids.append(class_id)
+                    class_descriptions[class_id] = feature_class.get("description")
+                class_packs.setdefault(class_id, [])
+                if pack.get("code") not in class_packs[class_id]:
+                    class_packs[class_id].append(pack.get("code"))
+
+        self._class_ids = class_ids
+        self._class_codes = {class_id: code for code, class_id in enumerate(class_ids)}
+        self._class_descriptions = class_descriptions
+        self._description_class = {v: k for k, v in class_descriptions.items()}
+        self._pack_codes = pack_codes
+        self._class_packs = class_packs
+
+    def refresh(self, force=False):
+        from nearmap._api import aiPacksV4, aiClassesV4
+
+        if force and self.cache_dir:
+            [self._cache_file(_).unlink() for _ in ["packs", "classes"] if self._cache_file(_).is_file()]
+        self._packs = self._load("packs", aiPacksV4)
+        self._classes = self._load("classes", aiClassesV4)
+        self._index()
+        return self
+
+    def _loaded(self):
+        if self._packs is None or self._classes is None or "packs" not in self._packs or \
+                "classes" not in self._classes:
+            self.refresh()
+        return self
+
+    ############
+    # Catalogs
+    ##########
+
+    @property
+    def packs(self):
+        return self._loaded()._packs
+
+    @property
+    def classes(self):
+        return self._loaded()._classes
+
+    @property
+    def pack_codes(self):
+        return list(self._loaded()._pack_codes)
+
+    @property
+    def class_ids(self):
+        return list(self._loaded()._class_ids)
+
+    ############
+    # Lookups
+    ##########
+
+    def packs_for_class(self, class_id):
+        return list(self._loaded()._class_packs.get(class_id, []))
+
+    def class_to_packs(self, packs=None):
+        class_packs = self._loaded()._class_packs
+        if not packs:
+            return {k: list(v) for k, v in class_packs.items()}
+        return {k: [p for p in v if p in packs] for k, v in class_packs.items() if set(v) & set(packs)}
+
+    def class_description(self, class_id):
+        return self._loaded()._class_descriptions.get(class_id)
+
+    def class_id(self, description):
+        return self._loaded()._description_class.get(description)
+
+    def class_code(self, class_id):
+        """Returns the compact integer code of a feature class id or -1 if the class is not in the catalog."""
+        return self._loaded()._class_codes.get(class_id, -1)
+
+    def class_id_from_code(self, code):
+        return self._loaded()._class_ids[code]
+
+    def as_categorical(self, class_ids):
+        """Encodes a sequence of feature class ids as a pandas Categorical with integer codes stable for the catalog."""
+        import pandas as pd
+        class_codes = self._loaded()._class_codes
+        # Classes missing from the catalog get code -1 (NaN)
+        return pd.Categorical.from_codes([class_codes.get(c, -1) for c in class_ids], categories=self._class_ids)
@@ -0,0 +1,180 @@
+####################################
+#   File name: _ai_sync.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    from ujson import dumps
+except ModuleNotFoundError:
+    from json import dumps
+
+
+class AISyncIndex(object):
+    """
+    SQLite index of the latest AI survey date and system version downloaded for each cell. Used by sync_ai to skip
+    cells that have not been flown since the previous sync.
+    """
+
+    def __init__(self, index_file):
+        self.index_file = Path(index_file)
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.index_file.as_posix())
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cells ("
+                          "cell_id TEXT PRIMARY KEY, "
+                          "survey_date TEXT, "
+                          "system_version TEXT, "
+                          "checked_at TEXT, "
+                          "updated_at TEXT, "
+                          "file TEXT)")
+        self.conn.commit()
+
+    def get(self, cell_id):
+        row = self.conn.execute("SELECT survey_date, system_version FROM cells WHERE cell_id = ?",
+                                (cell_id,)).fetchone()
+        if row is None:
+            return None
+        return {'survey_date': row[0], 'system_version': row[1]}
+
+    def mark_checked(self, cell_id):
+        now = datetime.now(timezone.utc).isoformat()
+        self.conn.execute("INSERT INTO cells (cell_id, checked_at) VALUES (?, ?) "
+                          "ON CONFLICT(cell_id) DO UPDATE SET checked_at = excluded.checked_at", (cell_id, now))
+
+    def upsert(self, cell_id, survey_date, system_version, file):
+        now = datetime.now(timezone.utc).isoformat()
+        self.conn.execute("INSERT INTO cells (cell_id, survey_date, system_version, checked_at, updated_at, file) "
+                          "VALUES (?, ?, ?, ?, ?, ?) "
+                          "ON CONFLICT(cell_id) DO UPDATE SET survey_date = excluded.survey_date, "
+                          "system_version = excluded.system_version, checked_at = excluded.checked_at, "
+                          "updated_at = excluded.updated_at, file = excluded.file",
+                          (cell_id, survey_date, system_version, now, now, file))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def _cell_id(polygon):
+    xs = polygon[::2]
+    ys = polygon[1::2]
+    return f"{min(xs):.6f}_{min(ys):.6f}_{max(xs):.6f}_{max(ys):.6f}"
+
+
+def _cell_centroid(polygon):
+    xs = polygon[::2]
+    ys = polygon[1::2]
+    return [min(xs) + (max(xs) - min(xs)) / 2, min(ys) + (max(ys) - min(ys)) / 2]
+
+
+def get_cells(polygon):
+    """
+    Returns a dict of {cell_id: [lon1,lat1,lon2,lat2,...]} for the sync process. A dict input is treated as
+    pre-defined cells such as parcels keyed by their unique id. Any other input is split into the download_ai grid.
+    """
+    if isinstance(polygon, dict):
+        return polygon
+    from nearmap._download_lib import iter_coords, create_slippy_grid
+
+    coords = iter_coords(polygon)
+    slippy_grid = create_slippy_grid(coords)
+    cells = dict()
+    for row, column in slippy_grid.iterrows():
+        if not column.geometry.is_empty:
+            cell = [item for sublist in list(column.tile.exterior.coords) for item in sublist]
+            cells[_cell_id(cell)] = cell
+    return cells
+
+
+def latest_ai_survey(base_url, api_key, point, since=None, until=None, lat_lon_direction="yx", limit=20):
+    """
+    Returns the most recent survey with an 'aifeatures' resource at the point, or None if no AI enabled survey exists.
+    Surveys are requested newest first and paged until an AI enabled survey is found.
+    """
+    from nearmap._api import pointV2
+
+    offset = 0
+    while True:
+        coverage = pointV2(base_url, api_key, point, since=since, until=until, limit=limit, offset=offset,
+                           fields="id,captureDate,resources", sort="-captureDate",
+                           lat_lon_direction=lat_lon_direction)
+        surveys = coverage.get("surveys", [])
+        ai_surveys = [s for s in surveys if "aifeatures" in (s.get("resources") or {})]
+        if ai_surveys:
+            return sorted(ai_surveys, key=lambda s: s.get("captureDate", ""), reverse=True)[0]
+        if len(surveys) < limit:
+            return None
+        offset += limit
+
+
+def _ai_system_version(survey):
+    """Returns the AI system version of the survey's 'aifeatures' resource, or None when it is not reported"""
+    for resource in survey.get("resources", {}).get("aifeatures", []):
+        system_version = (resource.get("properties") or {}).get("systemVersion")
+        if system_version:
+            return system_version
+    return None
+
+
+def _is_current(state, survey):
+    """True when the indexed cell already holds the survey's AI features"""
+    if not state or not state['survey_date']:
+        return False
+    capture_date = survey.get("captureDate", "")
+    if state['survey_date'] != capture_date:
+        return state['survey_date'] > capture_date
+    # Same survey. A re-processed survey is only detected through a new system version
+    system_version = _ai_system_version(survey)
+    return system_version is None or system_version == state['system_version']
+
+
+def sync_ai(base_url, api_key, polygon, out_folder, since=None, until=None, packs=None, index_file=None,
+            lat_lon_direction="yx"):
+    """
+    The following function incrementally syncs AI Features for a set of cells. Cells are only re-downloaded when the
+    Coverage API reports an AI enabled survey newer than the survey recorded for that cell in the sync index, or the
+    same survey re-processed with a new AI system version.
+    Note: See __init__.py.sync_ai for full description.
+    :return: dict of checked, updated and unchanged cell ids
+    """
+    from nearmap._api import aiFeaturesV4
+
+    out_folder = Path(out_folder)
+    cells_folder = out_folder / "cells"
+    cells_folder.mkdir(parents=True, exist_ok=True)
+    if index_file is None:
+        index_file = out_folder / "ai_sync_index.sqlite"
+    index = AISyncIndex(index_file)
+
+    results = {'checked': [], 'updated': [], 'unchanged': []}
+    try:
+        for cell_id, cell in get_cells(polygon).items():
+            results['checked'].append(cell_id)
+            survey = latest_ai_survey(base_url, api_key, _cell_centroid(cell), since, until, lat_lon_direction)
+            if survey is None or _is_current(index.get(cell_id), survey):
+                index.mark_checked(cell_id)
+                results['unchanged'].append(cell_id)
+                continue
+            payload = aiFeaturesV4(base_url, api_key, cell, since, until, packs, out_format="json",
+                                   lat_lon_direction=lat_lon_direction)
+            survey_dates = [f.get("surveyDate") for f in payload.get("features", []) if f.get("surveyDate")]
+            survey_date = max(survey_dates) if survey_dates else survey.get("captureDate")
+            cell_file = cells_folder / f"{cell_id}.json"
+            with open(cell_file, 'w', encoding='utf-8') as f:
+                f.write(dumps(payload))
+            index.upsert(cell_id, survey_date, payload.get("systemVersion"), cell_file.as_posix())
+            index.commit()
+            results['updated'].append(cell_id)
+    finally:
+        index.close()
+    return results
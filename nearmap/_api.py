@@ -9,20 +9,50 @@
 ####################################
 
 from datetime import datetime, timezone, timedelta
-from requests import get
 from io import BytesIO
 from time import sleep
 from pathlib import Path
-from os import mkdir
+from os import mkdir, replace
 from os.path import splitext
 from re import sub
 
+from nearmap._instrumentation import Instrumentation
+from nearmap._key_pool import pool_for_url, resolve_api_key
+
 try:
     from ujson import loads, dumps
 except ModuleNotFoundError:
     from json import loads, dumps
 
 
+# Process wide request metrics and hooks. Every request made by the library passes through get()
+instrumentation = Instrumentation()
+
+# Optional cache tier (nearmap._tile_store.RedisTileStore) consulted by _get_image before tiles/v3 requests
+tile_store = None
+
+
+def _send(url, **kwargs):
+    # requests is imported on first use so that 'import nearmap' stays light
+    from requests import get as requests_get
+    endpoint, start = instrumentation.before_request(url)
+    try:
+        response = requests_get(url, **kwargs)
+    except Exception:
+        instrumentation.after_request(endpoint, url, None, start)
+        raise
+    instrumentation.after_request(endpoint, url, response, start, stream=kwargs.get("stream", False))
+    return response
+
+
+def get(url, **kwargs):
+    # Urls built with an APIKeyPool token are routed to the pooled key with the most rate limit headroom
+    pool = pool_for_url(url)
+    if pool is not None:
+        return pool.request(url, _send, **kwargs)
+    return _send(url, **kwargs)
+
+
 def _create_folder(folder):
     folder = Path(folder)
     folder.mkdir(parents=True, exist_ok=True)
@@ -38,15 +68,133 @@ def _format_polygon(polygon, lat_lon_direction):
     return str(polygon)[1:-1].replace(" ", "")
 
 
+_CHUNK_SIZE = 1024 * 1024  # 1 MB streaming chunks for writing responses to disk
+
+
+class BufferPool(object):
+    """
+    Pool of reusable bytearrays used for the "buffer" output of image requests. Image bodies are read straight from
+    the socket into a pooled bytearray and returned as a memoryview, avoiding the copy into a new bytes object and
+    BytesIO per tile. Views must be handed back with release() once consumed so their buffer can be reused.
+    """
+
+    def __init__(self, buffer_size=256 * 1024, max_buffers=64):
+        from threading import Lock
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+        self._buffers = []
+        self._pooled = set()  # id() of the buffers in _buffers, so a double release cannot pool a buffer twice
+        self._lock = Lock()
+
+    def acquire(self, size=None):
+        size = max(size or 0, self.buffer_size)
+        with self._lock:
+            for i, buf in enumerate(self._buffers):
+                if len(buf) >= size:
+                    self._pooled.discard(id(buf))
+                    return self._buffers.pop(i)
+        return bytearray(size)
+
+    def release(self, view):
+        if isinstance(view, memoryview):
+            try:
+                buf = view.obj
+            except ValueError:
+                return  # the view was already released
+            view.release()
+        else:
+            buf = view
+        with self._lock:
+            if id(buf) not in self._pooled and len(self._buffers) < self.max_buffers:
+                self._pooled.add(id(buf))
+                self._buffers.append(buf)
+
+
+_buffer_pool = BufferPool()
+
+
+def release_buffer(view):
+    _buffer_pool.release(view)
+
+
+def _read_into_buffer(response, pool=None):
+    pool = pool or _buffer_pool
+    content_length = response.headers.get('Content-Length')
+    buf = pool.acquire(int(content_length) if content_length else None)
+    response.raw.decode_content = True
+    n = 0
+    try:
+        while True:
+            if n == len(buf):
+                buf.extend(bytes(len(buf)))  # grow when the server does not send a Content-Length
+            view = memoryview(buf)
+            chunk = view[n:]
+            read = response.raw.readinto(chunk)
+            chunk.release()
+            view.release()
+            if not read:
+                break
+            n += read
+    except BaseException:
+        pool.release(buf)
+        raise
+    finally:
+        response.close()
+    return memoryview(buf)[:n]
+
+
+def _write_response(response, out_file):
+    # Written to a temporary file and renamed once complete, so a dropped connection never leaves a truncated file
+    part_file = f"{out_file}.part"
+    try:
+        with open(part_file, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+        replace(part_file, out_file)
+    except BaseException:
+        Path(part_file).unlink(missing_ok=True)
+        raise
+    finally:
+        response.close()
+    return out_file
+
+
+def _read_with_retry(url, response, read, request, retries=5):
+    """
+    Returns read(response) for a streamed response. The body is read after the headers arrive, so a connection
+    dropped mid-body is retried here: the url is requested again with request() and read from the start.
+    """
+    attempt = 1
+    while True:
+        try:
+            return read(response)
+        except OSError:  # requests' ConnectionError and ChunkedEncodingError are OSErrors
+            response.close()
+            if attempt >= retries:
+                raise
+        instrumentation.record_retry(url)
+        sleep(attempt * 0.03)
+        attempt += 1
+        response = request()
+        while response.status_code != 200 and attempt < retries:
+            response.close()
+            instrumentation.record_retry(url)
+            sleep(attempt * 0.03)
+            attempt += 1
+            response = request()
+        if response.status_code != 200:
+            response.close()
+            print(_http_response_error_reporting(response.status_code))
+            return None
+
+
 def _download_file(url, out_file):
     r = get(url, stream=True)
     # print(r.headers)
     if r.status_code == 200:
-        with open(out_file, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
-        return out_file
+        return _read_with_retry(url, r, lambda response: _write_response(response, out_file),
+                                lambda: get(url, stream=True))
     else:
         print(_http_response_error_reporting(r.status_code))
 
@@ -54,7 +202,7 @@ def _download_file(url, out_file):
 def _get_image(url, out_format, out_image, rate_limit_mode="slow", quiet=False):
     def _image_get_op(url, out_format, out_image):
         iter = 1
-        if out_image.lower() == "bytes":
+        if out_image.lower() in ["bytes", "buffer"]:
             return get(url, stream=True)
         else:
             assert out_image.endswith(
@@ -62,10 +210,11 @@ def _get_image(url, out_format, out_image, rate_limit_mode="slow", quiet=False):
             data = None
             while data is None:
                 try:
-                    data = get(url, allow_redirects=True)
+                    data = get(url, allow_redirects=True, stream=True)
                     return data
                     # return get(url, allow_redirects=True)
                 except(ConnectionError, ConnectionResetError, ConnectionAbortedError) as e:
+                    instrumentation.record_retry(url)
                     backoff_time = iter * 0.03
                     if backoff_time >= 1800:
                         sleep(backoff_time)
@@ -73,6 +222,7 @@ def _get_image(url, out_format, out_image, rate_limit_mode="slow", quiet=False):
                     sleep(backoff_time)
                     iter += 1
                 except OSError as e:
+                    instrumentation.record_retry(url)
                     if iter < 10000:
                         iter += 10000  # start pausing for 5 min + interval if max retries exceeded
                     backoff_time = iter * 0.03
@@ -86,6 +236,19 @@ def _get_image(url, out_format, out_image, rate_limit_mode="slow", quiet=False):
     assert out_format in img_formats, f"Error, output image format must be a member of {','.join(img_formats)}"
     assert out_image, "error: Output Image File Path or Bytes flag undefined."
 
+    store = tile_store
+    key = store.key_for_url(url) if store is not None else None
+    if key is not None:
+        try:
+            data = store.get(key)
+        except Exception as e:
+            # An unreachable store is a cache miss, the tile is requested from the API
+            if not quiet:
+                print(f"warning: tile store get failed ({e})")
+            data = None
+        if data is not None:
+            return _deliver_image(data, out_image)
+
     image = None
     iter = 1
     image = _image_get_op(url, out_format, out_image)
@@ -95,11 +258,14 @@ def _get_image(url, out_format, out_image, rate_limit_mode="slow", quiet=False):
         if not quiet:
             print(_http_response_error_reporting(response_code))
     if response_code == 404:
+        image.close()
         return None
     # Begin Rate Limiting if response = 429
     # if response_code == 429:  # If user hits default rate limit pause for milliseconds.
     if response_code == 429 or str(response_code)[:1] == "5":
         sleep(0.1)
+        image.close()  # release the streamed connection before retrying
+        instrumentation.record_retry(url)
         image = _image_get_op(url, out_format, out_image)
         response_code = image.status_code
     # if response_code == 429:  # If rate limit is still hit implement slow or fast rate_limit_mode
@@ -118,6 +284,8 @@ def _get_image(url, out_format, out_image, rate_limit_mode="slow", quiet=False):
                     print(f"Rate Limit Exceeded. Reached hourly limit of {rate_limit}. Begin Throttling for "
                           f"{delay_time} seconds")
                 sleep(delay_time)
+                image.close()
+                instrumentation.record_retry(url)
                 image = _image_get_op(url, out_format, out_image)
                 response_code = image.status_code
 
@@ -130,20 +298,63 @@ def _get_image(url, out_format, out_image, rate_limit_mode="slow", quiet=False):
                     print(f"Rate Limit Exceeded. Reached hourly limit of {rate_limit}. Begin Throttling for "
                           f"{delay_time} seconds")
                 sleep(delay_time)
+                image.close()
+                instrumentation.record_retry(url)
                 image = _image_get_op(url, out_format, out_image)
                 response_code = image.status_code
                 if delay_time != max_delay_time:  # Incremental Delay increase
                     delay_time *= 2
                 elif delay_time >= max_delay_time:  # Cap delay time at 60 seconds
                     delay_time = max_delay_time
+
+    def _read_image(image):
+        if out_image.lower() == "bytes":
+            return BytesIO(image.content)
+        elif out_image.lower() == "buffer":
+            return _read_into_buffer(image)
+        else:
+            image_format = image.headers.get('Content-Type').replace('image/', '')
+            base_path = out_image.replace('.img', '').replace('.jpg', '').replace('.png', '')
+            path = f'{base_path}.jpg' if image_format == "jpeg" else f'{base_path}.png'
+            return _write_response(image, path)
+
+    if response_code != 200:
+        return _read_image(image)
+    result = _read_with_retry(url, image, _read_image, lambda: _image_get_op(url, out_format, out_image))
+    if key is not None and result is not None:
+        _store_image(store, key, result, quiet)
+    return result
+
+
+def _store_image(store, key, result, quiet=False):
+    # Caches a tile after it has been streamed to its output, so a cache miss keeps the streamed read
+    try:
+        if isinstance(result, BytesIO):
+            with result.getbuffer() as view:
+                store.set(key, view)
+        elif isinstance(result, memoryview):
+            store.set(key, result)
+        else:
+            with open(result, 'rb') as f:
+                store.set(key, f.read())
+    except Exception as e:
+        if not quiet:
+            print(f"warning: tile store set failed ({e})")
+
+
+def _deliver_image(data, out_image):
+    # Returns tile bytes held in memory (a tile store hit) in the out_image form
     if out_image.lower() == "bytes":
-        return BytesIO(image.content)
-    else:
-        image_format = image.headers.get('Content-Type').replace('image/', '')
-        base_path = out_image.replace('.img', '').replace('.jpg', '').replace('.png', '')
-        path = f'{base_path}.jpg' if image_format == "jpeg" else f'{base_path}.png'
-        open(path, 'wb').write(image.content)
-        return path
+        return BytesIO(data)
+    elif out_image.lower() == "buffer":
+        buf = _buffer_pool.acquire(len(data))
+        buf[:len(data)] = data
+        return memoryview(buf)[:len(data)]
+    base_path = out_image.replace('.img', '').replace('.jpg', '').replace('.png', '')
+    path = f'{base_path}.png' if bytes(data[:4]) == b"\x89PNG" else f'{base_path}.jpg'
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
 
 
 def _http_response_error_reporting(status):
@@ -175,25 +386,24 @@ def _http_response_error_reporting(status):
 
 def download_ortho(api_key, polygon, out_folder, out_format="tif", tertiary=None, since=None, until=None, mosaic=None,
                    include=None, exclude=None, res=None, zoom_level=None):
-    from nearmap._download_lib import get_coords, create_grid, grid_to_slippy_grid, generate_static_images
+    from nearmap._download_lib import iter_coords, create_slippy_grid, generate_static_images
     from nearmap._download import ortho_imagery_downloader
 
-    coords = get_coords(in_file=polygon)
-    grid = create_grid(coords)
-    slippy_grid = grid_to_slippy_grid(in_polygon_coords=coords, in_grid=grid)
+    coords = iter_coords(polygon)
+    slippy_grid = create_slippy_grid(coords)
     Path(out_folder).mkdir(parents=True, exist_ok=True)
-    ortho_out = ortho_imagery_downloader(api_key, slippy_grid, out_folder, out_format, tertiary, since, until, mosaic,
-                                         include, exclude, res, zoom_level)
+    # GDAL requests tiles itself, so a key pool is resolved to its key with the most headroom up front
+    ortho_out = ortho_imagery_downloader(resolve_api_key(api_key), slippy_grid, out_folder, out_format, tertiary, since,
+                                         until, mosaic, include, exclude, res, zoom_level)
     return slippy_grid, ortho_out
 
 
 def download_dsm(base_url, api_key, polygon, out_folder, since=None, until=None, fields=None):
-    from nearmap._download_lib import get_coords, create_grid, grid_to_slippy_grid
+    from nearmap._download_lib import iter_coords, create_slippy_grid
     from nearmap._download import dsm_imagery_downloader
 
-    coords = get_coords(in_file=polygon)
-    grid = create_grid(coords)
-    slippy_grid = grid_to_slippy_grid(in_polygon_coords=coords, in_grid=grid)
+    coords = iter_coords(polygon)
+    slippy_grid = create_slippy_grid(coords)
     Path(out_folder).mkdir(parents=True, exist_ok=True)
     dsm_out = dsm_imagery_downloader(base_url, api_key, slippy_grid, out_folder, since, until, fields)
     return slippy_grid, dsm_out
@@ -201,12 +411,11 @@ def download_dsm(base_url, api_key, polygon, out_folder, since=None, until=None,
 
 def download_ai(base_url, api_key, polygon, out_folder, since=None, until=None, packs=None, out_format="json",
                 lat_lon_direction="yx", surveyResourceID=None):
-    from nearmap._download_lib import get_coords, create_grid, grid_to_slippy_grid
+    from nearmap._download_lib import iter_coords, create_slippy_grid
     from nearmap._download import generate_ai_pack
 
-    coords = get_coords(in_file=polygon)
-    grid = create_grid(coords)
-    slippy_grid = grid_to_slippy_grid(in_polygon_coords=coords, in_grid=grid)
+    coords = iter_coords(polygon)
+    slippy_grid = create_slippy_grid(coords)
     Path(out_folder).mkdir(parents=True, exist_ok=True)
     ai_out = generate_ai_pack(base_url, api_key, slippy_grid, out_folder, since, until, packs, out_format,
                               lat_lon_direction, surveyResourceID)
@@ -217,18 +426,17 @@ def download_multi(base_url, api_key, polygon, out_folder, tertiary=None, since=
                    include=None, exclude=None, packs=None, out_ai_format="json", out_ortho_format="json",
                    lat_lon_direction="yx", surveyResourceID=None):
     from nearmap._download import ortho_imagery_downloader, dsm_imagery_downloader, generate_ai_pack
-    from nearmap._download_lib import get_coords, create_grid, grid_to_slippy_grid
+    from nearmap._download_lib import iter_coords, create_slippy_grid
 
-    coords = get_coords(in_file=polygon)
-    grid = create_grid(coords)
-    slippy_grid = grid_to_slippy_grid(in_polygon_coords=coords, in_grid=grid)
+    coords = iter_coords(polygon)
+    slippy_grid = create_slippy_grid(coords)
     Path(out_folder).mkdir(parents=True, exist_ok=True)
     ortho_out_folder = f"{out_folder}/ortho"
     Path(ortho_out_folder).mkdir(parents=True, exist_ok=True)
     print("Downloading Ortho Imagery")
 
-    ortho_out = ortho_imagery_downloader(api_key, slippy_grid, ortho_out_folder, out_ortho_format, tertiary, since,
-                                         until, mosaic, include, exclude)
+    ortho_out = ortho_imagery_downloader(resolve_api_key(api_key), slippy_grid, ortho_out_folder, out_ortho_format,
+                                         tertiary, since, until, mosaic, include, exclude)
     dsm_out_folder = f"{out_folder}/dsm"
     Path(dsm_out_folder).mkdir(parents=True, exist_ok=True)
     print("Downloading DSM (Digital Surface Model) Data")
@@ -242,11 +450,80 @@ def download_multi(base_url, api_key, polygon, out_folder, tertiary=None, since=
     return slippy_grid, ortho_out, dsm_out, ai_out
 
 
+def sync_ai(base_url, api_key, polygon, out_folder, since=None, until=None, packs=None, index_file=None,
+            lat_lon_direction="yx"):
+    from nearmap._ai_sync import sync_ai as _sync_ai
+
+    return _sync_ai(base_url, api_key, polygon, out_folder, since, until, packs, index_file, lat_lon_direction)
+
+
 ###############
 #  NEARMAP AI
 #############
 
 
+def _flatten_ai_feature(f):
+    from shapely import geometry
+    temp_dict = dict()
+    temp_dict['geometry'] = geometry.shape(f.get('geometry'))
+    for k in f.keys():
+        if k not in ['attributes', 'geometry', 'components', 'confidence', 'fidelity']:
+            temp_dict[k] = f.get(k)
+        if k in ['confidence', 'fidelity']:
+            v = f.get(k)
+            if v:
+                temp_dict[k] = round(v, 3)
+            else:
+                temp_dict[k] = v
+        if 'attributes' in f.keys():
+            attrs = f.get('attributes')
+            if len(attrs) > 0:
+                for attr_k in attrs[0].keys():
+                    if attr_k not in ['components', 'numStories', 'height', 'description']:
+                        temp_dict[attr_k] = attrs[0].get(attr_k)
+                    if attr_k == 'description':
+                        temp_dict['attr_desc'] = attrs[0].get(attr_k)
+                    if attr_k == 'components':
+                        components = attrs[0].get(attr_k)
+                        c_count = 0
+                        for c in components:
+                            for c_k in c.keys():
+                                temp_dict[f"comp{c_count}_{c_k}"] = components[c_count].get(c_k)
+                            c_count += 1
+                    if attr_k == 'height':
+                        temp_dict['heightMeters'] = round(attrs[0].get(attr_k), 3)
+                        temp_dict['heightFeet'] = round(float(attrs[0].get(attr_k)) * 3.281, 3)
+                    if attr_k == 'numStories':
+                        e = dict(sorted(attrs[0].get(attr_k).items(), key=lambda item: item[1],
+                                        reverse=True))
+                        top_story = int(list(e.keys())[0].replace('+', ''))
+                        temp_dict['numStories'] = top_story
+                        v = attrs[0].get(attr_k).get(f'{top_story}')
+                        if v:
+                            temp_dict['numStorConfidence'] = round(v, 3)
+                        else:
+                            temp_dict['numStorConfidence'] = None
+    return temp_dict
+
+
+def _iter_ai_features(url):
+    """Yields AI features one at a time, parsing the response incrementally when ijson is installed."""
+    try:
+        from ijson import items
+    except ModuleNotFoundError:
+        items = None
+    with get(url, stream=items is not None) as r:
+        # An error body has no features, so report the status rather than yielding nothing
+        if r.status_code != 200:
+            print(_http_response_error_reporting(r.status_code))
+            r.raise_for_status()
+        if items is None:
+            yield from r.json().get('features', [])
+            return
+        r.raw.decode_content = True
+        yield from items(r.raw, 'features.item', use_float=True)
+
+
 def aiFeaturesV4(base_url, api_key, polygon, since=None, until=None, packs=None, out_format="json", output=None,
                  lat_lon_direction="yx", surveyResourceID=None, return_url=False):
     if not return_url:
@@ -278,6 +555,8 @@ def aiFeaturesV4(base_url, api_key, polygon, since=None, until=None, packs=None,
     supported_db_formats = ["gpkg", "gdb"]
     if out_format == "json":
         return get(url).json() if not return_url else "f'" + url + "'"
+    if out_format == "stream":
+        return _iter_ai_features(url) if not return_url else "f'" + url + "'"
     all_supported_formats = []
     [all_supported_formats.extend(_) for _ in [supported_df_formats,
                                                supported_spreadsheet_formats,
@@ -316,54 +595,7 @@ def aiFeaturesV4(base_url, api_key, polygon, since=None, until=None, packs=None,
 
         import geopandas as gpd
         import pandas as pd
-        from shapely import geometry
-        my_json = get(url).json().get('features')
-        column_names = []
-        for f in my_json:
-            [column_names.append(i) for i in f.keys() if i not in column_names]
-        features_list = list()
-        for f in my_json:
-            temp_dict = dict()
-            temp_dict['geometry'] = geometry.shape(f.get('geometry'))
-            for k in f.keys():
-                if k in column_names:
-                    if k not in ['attributes', 'geometry', 'components', 'confidence', 'fidelity']:
-                        temp_dict[k] = f.get(k)
-                    if k in ['confidence', 'fidelity']:
-                        v = f.get(k)
-                        if v:
-                            temp_dict[k] = round(v, 3)
-                        else:
-                            temp_dict[k] = v
-                    if 'attributes' in f.keys():
-                        attrs = f.get('attributes')
-                        if len(attrs) > 0:
-                            for attr_k in attrs[0].keys():
-                                if attr_k not in ['components', 'numStories', 'height', 'description']:
-                                    temp_dict[attr_k] = attrs[0].get(attr_k)
-                                if attr_k == 'description':
-                                    temp_dict['attr_desc'] = attrs[0].get(attr_k)
-                                if attr_k == 'components':
-                                    components = attrs[0].get(attr_k)
-                                    c_count = 0
-                                    for c in components:
-                                        for c_k in c.keys():
-                                            temp_dict[f"comp{c_count}_{c_k}"] = components[c_count].get(c_k)
-                                        c_count += 1
-                                if attr_k == 'height':
-                                    temp_dict['heightMeters'] = round(attrs[0].get(attr_k), 3)
-                                    temp_dict['heightFeet'] = round(float(attrs[0].get(attr_k)) * 3.281, 3)
-                                if attr_k == 'numStories':
-                                    e = dict(sorted(attrs[0].get(attr_k).items(), key=lambda item: item[1],
-                                                    reverse=True))
-                                    top_story = int(list(e.keys())[0].replace('+', ''))
-                                    temp_dict['numStories'] = top_story
-                                    v = attrs[0].get(attr_k).get(f'{top_story}')
-                                    if v:
-                                        temp_dict['numStorConfidence'] = round(v, 3)
-                                    else:
-                                        temp_dict['numStorConfidence'] = None
-            features_list.append(temp_dict)
+        features_list = [_flatten_ai_feature(f) for f in _iter_ai_features(url)]
         if not features_list:
             print(f"Error: No Features Detected for AI Pack '{packs}'")
             return None
@@ -422,7 +654,8 @@ def aiClassesV4(base_url, api_key, out_format="json", return_url=False):
         f"{base_url}" + "ai/features/v4/classes.json?apikey={api_key}"
     if out_format.lower() in ["pandas", "pd"]:
         import pandas as pd
-        return pd.read_json(url)
+        from io import StringIO
+        return pd.read_json(StringIO(get(url).text))
     elif out_format.lower() == "text":
         return get(url).text
     elif out_format.lower() == "json":
@@ -437,7 +670,8 @@ def aiPacksV4(base_url, api_key, out_format="json", return_url=False):
         f"{base_url}" + "ai/features/v4/packs.json?apikey={api_key}"
     if out_format.lower() in ["pandas", "pd"]:
         import pandas as pd
-        return pd.read_json(url)
+        from io import StringIO
+        return pd.read_json(StringIO(get(url).text))
     elif out_format.lower() == "text":
         return get(url).text
     elif out_format.lower() == "json":
@@ -447,6 +681,48 @@ def aiPacksV4(base_url, api_key, out_format="json", return_url=False):
         exit()
 
 
+def aiFeaturesByPackV4(base_url, api_key, polygon, since=None, until=None, packs=None, out_format="json", output=None,
+                       lat_lon_direction="yx", surveyResourceID=None, ai_metadata=None):
+    if ai_metadata is None:
+        from nearmap._ai_metadata import AIMetadata
+        ai_metadata = AIMetadata(base_url, api_key)
+    if type(packs) == str:
+        packs = packs.split(",")
+    if not packs:
+        packs = ai_metadata.pack_codes
+    class_to_packs = ai_metadata.class_to_packs(packs)
+
+    # One request for every pack, then split locally by the pack each feature class belongs to
+    payload = aiFeaturesV4(base_url, api_key, polygon, since, until, packs, out_format="json",
+                           lat_lon_direction=lat_lon_direction, surveyResourceID=surveyResourceID)
+    header = {k: v for k, v in payload.items() if k != "features"}
+    partitions = {pack: [] for pack in packs}
+    for f in payload.get("features", []):
+        for pack in class_to_packs.get(f.get("classId"), []):
+            partitions[pack].append(f)
+    partitions = {pack: dict(header, features=features) for pack, features in partitions.items()}
+
+    supported_formats = ["json", "gpkg"]
+    assert out_format in supported_formats, f"Error: out_format {out_format} not a member of {supported_formats}"
+    if not output:
+        return partitions
+    output = _create_folder(output)
+    if out_format == "json":
+        for pack, pack_payload in partitions.items():
+            with open(output / f"{pack}.json", 'w', encoding='utf-8') as f:
+                f.write(dumps(pack_payload))
+    elif out_format == "gpkg":
+        import geopandas as gpd
+        for pack, pack_payload in partitions.items():
+            features_list = [_flatten_ai_feature(f) for f in pack_payload["features"]]
+            if features_list:
+                gdf = gpd.GeoDataFrame(features_list, geometry='geometry', crs='EPSG:4326').dropna(axis=1)
+                # Compact integer class code, stable for the catalog, alongside the classId string
+                gdf['classCode'] = ai_metadata.as_categorical(gdf['classId']).codes
+                gdf.to_file(output / "nearmap.gpkg", driver="GPKG", layer=sub(r'[\W_]+', '', pack).strip())
+    return output
+
+
 #####################
 #  NEARMAP Coverage
 ###################
@@ -606,7 +882,6 @@ def coverageStaticMapV2(base_url, api_key, point, radius, resources=None, overla
     if offset:
         url += f"&offset={offset}" if not return_url else "&offset={offset}"
     url += f"&apikey={api_key}" if not return_url else "&apikey={api_key}"
-    print(url)
     return get(url).json() if not return_url else "f'" + url + "'"
 
 
@@ -623,6 +898,8 @@ def imageStaticMapV2(base_url, surveyID, image_type, file_format, point, radius,
         raise Exception("error: Output Image File Path or Bytes flag undefined.")
     if out_image.lower() == "bytes":
         return BytesIO(get(url, stream=True).content)
+    elif out_image.lower() == "buffer":
+        return _read_into_buffer(get(url, stream=True))
     else:
         if out_image.endswith(file_format):
             return _download_file(url, out_image)
@@ -668,6 +945,55 @@ def tileV3(base_url, api_key, tileResourceType, z, x, y, out_format, out_image,
     return _get_image(url, out_format, out_image, rate_limit_mode) if not return_url else "f'" + url + "'"
 
 
+tile_views = ["Vert", "North", "South", "East", "West"]
+
+
+def tileMultiViewV3(base_url, api_key, z, x, y, out_format, out_image, views=None, dates=None, tertiary=None,
+                    mosaic=None, include=None, exclude=None, rate_limit_mode="slow", max_threads=None,
+                    name_pattern=None):
+    # Fetches every view (and date) of one or more tiles concurrently so a location costs about one round trip
+    from concurrent.futures import ThreadPoolExecutor
+
+    views = views or tile_views
+    multi_tile = isinstance(x, (list, tuple))
+    xs, ys = (list(x), list(y)) if multi_tile else ([x], [y])
+    assert len(xs) == len(ys), f"error: x and y must be the same length | {len(xs)} | {len(ys)}"
+    out_format = out_format.replace(".", "").lower().strip()
+    to_file = out_image.lower() not in ["bytes", "buffer"]
+    if to_file:
+        Path(out_image).mkdir(parents=True, exist_ok=True)
+    if name_pattern is None:
+        name_pattern = "{date}_{view}_{x}_{y}_{z}.{format}" if dates else "{view}_{x}_{y}_{z}.{format}"
+
+    jobs = []
+    for tile_x, tile_y in zip(xs, ys):
+        for date in dates or [None]:
+            for view in views:
+                if to_file:
+                    name = name_pattern.format(view=view, x=tile_x, y=tile_y, z=z, date=date, format=out_format)
+                    out_file = (Path(out_image) / name).as_posix()
+                else:
+                    out_file = out_image
+                # A survey date is requested as a one day since/until window
+                jobs.append(((tile_x, tile_y), date, view,
+                             (base_url, api_key, view, z, tile_x, tile_y, out_format, out_file, tertiary, date, date,
+                              mosaic, include, exclude, rate_limit_mode)))
+
+    if to_file:
+        out_files = [args[7] for tile, date, view, args in jobs]
+        assert len(set(out_files)) == len(out_files), f"error: name_pattern {name_pattern} gives several tiles the " \
+                                                      f"same file name. Add the fields that differ: view, x, y, date"
+    with ThreadPoolExecutor(max_threads or max(1, min(len(jobs), 32))) as executor:
+        futures = [executor.submit(tileV3, *args) for tile, date, view, args in jobs]
+        results = dict()
+        for (tile, date, view, args), future in zip(jobs, futures):
+            result = results.setdefault(tile, dict()) if multi_tile else results
+            if dates:
+                result = result.setdefault(date, dict())
+            result[view] = future.result()
+    return results
+
+
 def tileSurveyV3(base_url, api_key, surveyid, contentType, z, x, y, out_format, out_image, rate_limit_mode="slow",
                  return_url=False):
     if return_url:
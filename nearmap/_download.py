@@ -13,8 +13,6 @@ try:
 except ModuleNotFoundError:
     from json import dump, dumps
 
-from tqdm.auto import tqdm
-
 
 def process_payload(combined_dataframe, out_folder, out_format, save=True):
     """
@@ -154,7 +152,9 @@ def generate_ai_pack(base_url, api_key, df_parcels, out_folder, since=None, unti
    Note: See __init__.py.download_ai for full description.
    :return: geopackage of all features as well as geopackage for each individual feature.
    """
+    import pandas as pd
     import geopandas as gpd
+    from tqdm.auto import tqdm
     from nearmap._api import aiFeaturesV4
 
     # TODO automatically derive from first feature in json.
@@ -174,25 +174,31 @@ def generate_ai_pack(base_url, api_key, df_parcels, out_folder, since=None, unti
 
     full_ai_df = gpd.GeoDataFrame(columns=column_names, crs='EPSG:4326')
     full_ai_df.set_geometry(col='geometry', inplace=True)
+    ai_dfs = [full_ai_df]
 
     # Specify the AI Packs. This list represents all AI Packs that are currently available.
     for row, column in tqdm(df_parcels.iterrows(), total=df_parcels.shape[0]):
         if not column.geometry.is_empty:
-            # pull the shapely polygon from the current row of grid df
-            poly_obj = df_parcels.loc[row, 'geometry']
-            # define the polygon being used on the current row
-            current_grid = list(poly_obj.exterior.coords)
-            polygon = [item for sublist in current_grid for item in sublist]
-            # print('THIS IS A POLYGON REQUEST')
-            # print(polygon)
-            # make request for json data for the formatted polygon
-            response = aiFeaturesV4(base_url, api_key, polygon, since, until, packs, out_format="json",
-                                    lat_lon_direction="yx")
-            # print('THIS IS THE RESPONSE')
-            # print(response)
-            df_features = get_parcel_as_geodataframe(response, poly_obj)
-            full_ai_df = full_ai_df.append(df_features)
-
+            # pull the shapely polygon from the current row of grid df. Cells shared by several features or split by
+            # a concave feature hold a MultiPolygon, each part is requested on its own
+            for poly_obj in getattr(df_parcels.loc[row, 'geometry'], 'geoms', [df_parcels.loc[row, 'geometry']]):
+                if poly_obj.geom_type != "Polygon":
+                    continue
+                # define the polygon being used on the current row
+                current_grid = list(poly_obj.exterior.coords)
+                polygon = [item for sublist in current_grid for item in sublist]
+                # print('THIS IS A POLYGON REQUEST')
+                # print(polygon)
+                # make request for json data for the formatted polygon
+                response = aiFeaturesV4(base_url, api_key, polygon, since, until, packs, out_format="json",
+                                        lat_lon_direction="yx")
+                # print('THIS IS THE RESPONSE')
+                # print(response)
+                df_features = get_parcel_as_geodataframe(response, poly_obj)
+                ai_dfs.append(df_features)
+
+    # Concatenate once at the end rather than copying the growing frame for every grid cell
+    full_ai_df = pd.concat(ai_dfs)
     # print(type(full_ai_df))
     full_ai_gdf = gpd.GeoDataFrame(full_ai_df, geometry='geometry')
 
@@ -341,6 +347,7 @@ def ortho_imagery_downloader(api_key, df_parcels, out_folder, out_format="tif",
     from pathlib import Path
     from shutil import copyfile
     from os import remove
+    from tqdm.auto import tqdm
 
     def structure_rest_endpoint(url, tertiary=None, since=None, until=None, mosaic=None, include=None, exclude=None):
         if tertiary:
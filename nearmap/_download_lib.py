@@ -12,15 +12,19 @@ from zipfile import ZipFile
 import xml.etree.ElementTree as ET
 import math
 from os.path import split
-import pandas as pd
-from shapely.geometry import Polygon
-from pyproj import Proj, transform
+from itertools import chain, islice
 
 try:
     from ujson import loads
 except ModuleNotFoundError:
     from json import loads
 
+# Size of a grid cell in degrees
+_grid_delta_x = 72.6685631 - 72.6661572
+_grid_delta_y = 41.7575483 - 41.7557535
+# Grid origin for polygons read lazily, when the top left of all of them is not known up front
+_grid_world_origin = (-180.0, 90.0)
+
 
 def _nest_level(lst):
     if not isinstance(lst, list):
@@ -30,6 +34,29 @@ def _nest_level(lst):
     return max(_nest_level(lst[0]) + 1, _nest_level(lst[1:]))
 
 
+def _geometry_rings(geometry):
+    # Exterior ring of a GeoJSON like Polygon, or of each part of a MultiPolygon, as lists of (lon, lat) tuples
+    if geometry is None:
+        return []
+    if geometry.get('type') == "Polygon":
+        polygons = [geometry['coordinates']]
+    elif geometry.get('type') == "MultiPolygon":
+        polygons = geometry['coordinates']
+    else:
+        return []
+    return [[tuple(coord[:2]) for coord in polygon[0]] for polygon in polygons]
+
+
+def _read_rings(in_file, layer=None):
+    # Exterior rings of every feature of a vector file read with GeoPandas (pyogrio or fiona engine)
+    import geopandas as gpd
+    from shapely.geometry import mapping
+    coords = []
+    for geometry in gpd.read_file(in_file, layer=layer).geometry:
+        coords.extend(_geometry_rings(mapping(geometry) if geometry is not None else None))
+    return coords
+
+
 def get_shp_coords(in_shp):
     """
     The following function obtains coordinates from a shapefile
@@ -43,14 +70,33 @@ def get_shp_coords(in_shp):
     :return: list of geometry coordinates
     """
     try:
-        import fiona
-        coords = []
-        with fiona.open(in_shp) as c:
-            for i, record in enumerate(c):
-                coords.append(record['geometry']['coordinates'][0])
-        return coords
+        return _read_rings(in_shp)
+    except ModuleNotFoundError:
+        print("Shapefile processing requires GeoPandas: https://geopandas.org | Library not detected")
+        exit()
+
+
+def get_gpkg_coords(in_gpkg):
+    """
+    The following function obtains coordinates from a layer of a GeoPackage
+    ===============     ====================================================================
+    **Argument**        **Description**
+    ---------------     --------------------------------------------------------------------
+    in_file             Required String:    File Input
+                        Supported File formats are:
+                            - .gpkg (first layer)
+                            - .gpkg/myLayerName
+    ===============     ====================================================================
+    :return: list of geometry coordinates
+    """
+    try:
+        if in_gpkg.lower().endswith(".gpkg"):
+            gpkg, layer = in_gpkg, 0
+        else:
+            gpkg, layer = split(in_gpkg)
+        return _read_rings(gpkg, layer)
     except ModuleNotFoundError:
-        print("Shapefile processing requires Fiona: https://github.com/Toblerity/Fiona | Library not detected")
+        print("GeoPackage processing requires GeoPandas: https://geopandas.org | Library not detected")
         exit()
 
 
@@ -96,16 +142,21 @@ def get_json_coords(in_json):
         data = f.read()
     obj = loads(data)
     try:  # Check for geoJSON and process if geoJSON
-        # features = obj["features"][0]["geometry"]["coordinates"] #old code returned error
-        features = [tuple(x) for x in obj["features"][0]["geometry"]["coordinates"][0]] #returns in form: [(-72.6639175415039, 41.759131982892384), (-72.6665997505188, 41.7591479892674)...
-        return features
+        # Every Polygon/MultiPolygon feature, in form: [(-72.6639175415039, 41.759131982892384), (-72.66659975, ...
+        features = obj["features"] if "features" in obj else [obj]
+        rings = [ring for feature in features for ring in _geometry_rings(feature.get("geometry", feature))]
+        if not rings:
+            raise KeyError("coordinates")
+        # A single polygon is returned as its ring for the single polygon grid
+        return rings[0] if len(rings) == 1 else rings
     except KeyError as e:  # Input is Standard JSON
         if str(e).lower().replace("'", "") == "coordinates":
             try:
                 spatial_ref = obj["spatialReference"]["wkid"]
                 if spatial_ref == 4326:
-                    features = obj["features"][0]["geometry"]["rings"]
-                    return features
+                    rings = [[tuple(coord[:2]) for coord in feature["geometry"]["rings"][0]]
+                             for feature in obj["features"]]
+                    return rings
                 else:
                     print(f"Input JSON spatial reference must be WGS84 wkid 4326. Detected {spatial_ref} instead...")
                     exit()
@@ -114,6 +165,55 @@ def get_json_coords(in_json):
                 exit()
 
 
+def _kml_coordinates(text):
+    # KML coordinates are whitespace separated lon,lat[,alt] tuples. Altitude is dropped
+    coords = []
+    for point in text.split():
+        values = point.split(",")
+        coords.append((float(values[0]), float(values[1])))
+    return coords
+
+
+def iter_kml_coords(in_file):
+    """
+    Yields the outer ring of each Polygon of a KML or KMZ file as a list of (lon, lat) tuples. The file is read with
+    iterparse and each Placemark is cleared once read, so large exports stream in constant memory. Polygon holes
+    (innerBoundaryIs), points, lines and rings with fewer than 4 coordinates are skipped.
+    """
+    kml = in_file
+    kmz = None
+    if str(in_file).lower().endswith("kmz"):
+        kmz = ZipFile(in_file, 'r')
+        names = [name for name in kmz.namelist() if name.lower().endswith(".kml")]
+        assert names, f"Error, no .kml document found in {in_file}"
+        kml = kmz.open('doc.kml' if 'doc.kml' in names else names[0], 'r')
+    try:
+        outer = 0
+        parents = []
+        for event, elem in ET.iterparse(kml, events=("start", "end")):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                parents.append(elem)
+                outer += tag == "outerBoundaryIs"
+                continue
+            parents.pop()
+            if tag == "outerBoundaryIs":
+                outer -= 1
+            elif tag == "coordinates":
+                if outer and elem.text and elem.text.strip():
+                    ring = _kml_coordinates(elem.text)
+                    if len(ring) >= 4:
+                        yield ring
+                elem.clear()
+            elif tag == "Placemark" and parents:
+                # Drop the finished Placemark from the tree so memory does not grow with the file
+                parents[-1].remove(elem)
+    finally:
+        if kmz is not None:
+            kml.close()
+            kmz.close()
+
+
 def get_kml_coords(in_file):
     """
     The following function obtains coordinates from kml and kmz files
@@ -125,20 +225,9 @@ def get_kml_coords(in_file):
                             -KMZ
                             -KML
     ===============     ====================================================================
-    :return: list of geometry coordinates
+    :return: list of geometry coordinates. Use iter_kml_coords to read them one at a time
     """
-    kml = in_file
-    if in_file.endswith("kmz"):
-        kmz = ZipFile(in_file, 'r')
-        kml = kmz.open('doc.kml', 'r')
-    root = ET.parse(kml).getroot()
-    coord_list = []
-    for description in root.iter('{http://www.opengis.net/kml/2.2}coordinates'):
-        coords = [float(i) for i in description.text.strip().replace("0 ", "").split(",")]
-        if coords[-1] == 0:
-            del coords[-1]
-        coord_list.append(list(zip(coords[::2], coords[1::2])))
-    return coord_list
+    return list(iter_kml_coords(in_file))
 
 
 def get_coords(in_file):
@@ -166,11 +255,26 @@ def get_coords(in_file):
         return get_shp_coords(in_shp=in_file)
     elif ".gdb" in in_file:
         return get_feature_class_coords(in_feature_class=in_file)
+    elif ".gpkg" in in_file:
+        return get_gpkg_coords(in_gpkg=in_file)
     else:
         print(f"file format {in_file} not supported...")
 
 
-def create_grid(in_polygon):  # Create Grid Row
+def iter_coords(in_file):
+    """
+    Returns an iterator over the polygons of an input file, each a list of (lon, lat) coords. KML and KMZ files are
+    streamed with iter_kml_coords so polygons are read as the grid is built, other formats are read with get_coords.
+    """
+    if isinstance(in_file, str) and in_file.lower().endswith(("kmz", "kml")):
+        return iter_kml_coords(in_file)
+    coords = get_coords(in_file)
+    if not coords:
+        return iter([])
+    return iter([coords] if _nest_level(coords) == 1 else coords)
+
+
+def create_grid(in_polygon, origin=None):  # Create Grid Row
     """
     The following function generates a unit grid. This grid has a defined standard grid size as well as a standard
     grid shift. This grid is used to make API calls that are an acceptable size. The sizing is somewhat arbitrary but
@@ -179,14 +283,18 @@ def create_grid(in_polygon):  # Create Grid Row
     **Argument**        **Description**
     ---------------     --------------------------------------------------------------------
     in_polygon          Required list:  Required list of coords for a single polygon.
+    ---------------     --------------------------------------------------------------------
+    origin              Optional (lon, lat) tuple. Snaps the grid to cells counted from origin so grids of
+                        several polygons share cells. Default: the polygon's top left corner
     ===============     ====================================================================
     :return: list of grid coords
     """
+    from shapely.geometry import Polygon
 
     # create unit box move equations to help make the grid once we create our first grid square.
     def _unit_box_move_x(grid_box, x_number=0):
         # unit box shift
-        delta_x = (72.6685631 - 72.6661572) * x_number
+        delta_x = _grid_delta_x * x_number
         right_shift_output_box = []
         for coordinate in grid_box:
             right_shift_output_box.append((coordinate[0] + delta_x, coordinate[1]))
@@ -194,7 +302,7 @@ def create_grid(in_polygon):  # Create Grid Row
 
     def _unit_box_move_y(grid_box, y_number=0):
         # unit box shift
-        delta_y = (41.7575483 - 41.7557535) * y_number
+        delta_y = _grid_delta_y * y_number
         down_shift_output_box = []
         for coordinate in grid_box:
             down_shift_output_box.append((coordinate[0], coordinate[1] - delta_y))
@@ -222,9 +330,12 @@ def create_grid(in_polygon):  # Create Grid Row
     max_y = max(list_of_y)
 
     # set the grid origin
+    delta_x = _grid_delta_x
+    delta_y = _grid_delta_y
     grid_origin = (min_x, max_y)
-    delta_x = (72.6685631-72.6661572)
-    delta_y = (41.7575483-41.7557535)
+    if origin is not None:
+        grid_origin = (origin[0] + math.floor((min_x - origin[0]) / delta_x) * delta_x,
+                       origin[1] - math.floor((origin[1] - max_y) / delta_y) * delta_y)
 
     # set unit box to the origin
     starting_box = [grid_origin,
@@ -234,10 +345,10 @@ def create_grid(in_polygon):  # Create Grid Row
                     grid_origin]
 
     # determine number of grids in the x and y direction.
-    total_x_change = abs(max_x - min_x)  # find total x change
+    total_x_change = abs(max_x - grid_origin[0])  # find total x change
     number_of_x_grids = math.ceil(total_x_change/delta_x)  # divide by the shift size to find number of grids required
 
-    total_y_change = abs(max_y - min_y)  # find total y change
+    total_y_change = abs(grid_origin[1] - min_y)  # find total y change
     number_of_y_grids = math.ceil(total_y_change/delta_y)  # divide by the shift size to find number of grids required
 
     total = number_of_x_grids*number_of_y_grids
@@ -269,17 +380,22 @@ def create_grid(in_polygon):  # Create Grid Row
     return grid
 
 
-def grid_to_slippy_grid(in_polygon_coords, in_grid):
+def _slippy_cells(cells, zoom=20):
+    # Slippy tile (x, y, zoom) of every vertex of every grid cell, converted in one call
+    import numpy as np
+    from nearmap.geospatial.tiles import latlon_to_tile
 
-    def _deg_to_num(lon_deg, lat_deg, zoom):
-        lat_rad = math.radians(lat_deg)
-        n = 2.0 ** zoom
-        xtile = int((lon_deg + 180.0) / 360.0 * n)
-        ytile = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
-        return xtile, ytile, zoom
+    rings = [np.asarray(cell.exterior.coords)[:, :2] for cell in cells]
+    coordinates = np.concatenate(rings)
+    slippy_x, slippy_y = latlon_to_tile(coordinates[:, 1], coordinates[:, 0], zoom)
+    splits = np.cumsum([len(ring) for ring in rings])[:-1]
+    return [[(x, y, zoom) for x, y in zip(xs.tolist(), ys.tolist())]
+            for xs, ys in zip(np.split(slippy_x, splits), np.split(slippy_y, splits))]
 
-    def _coord_lister(geom):
-        return list(geom.exterior.coords)
+
+def grid_to_slippy_grid(in_polygon_coords, in_grid):
+    import pandas as pd
+    from shapely.geometry import Polygon
 
     nesting_level = _nest_level(in_polygon_coords)
     assert nesting_level in [2, 1], "Error, input polygon cannot be read."
@@ -293,28 +409,7 @@ def grid_to_slippy_grid(in_polygon_coords, in_grid):
     df_parcels = grid_layout
 
     # convert testing box to slippy
-    slippy_testing_box = []
-    zoom = 20
-    for row, column in df_parcels.iterrows():
-        current_row_listed_coordinates = _coord_lister(column.tile)
-        processing_list = []
-        for coordinate in current_row_listed_coordinates:
-            processing_list.append(_deg_to_num(coordinate[0], coordinate[1], zoom))
-        slippy_testing_box.append(processing_list)
-
-    df_parcels['slippy_grid'] = slippy_testing_box
-
-    x_grid_size = df_parcels['slippy_grid'][1][0][0] - df_parcels['slippy_grid'][0][0][0]
-    y_grid_size = None
-
-    for row, column in df_parcels.iterrows():
-        # check for the first time the y changes on the grid
-        change_in_y = df_parcels.iloc[row + 1]['slippy_grid'][0][1] - df_parcels.iloc[row]['slippy_grid'][0][1]
-        if change_in_y == 0:
-            pass
-        else:
-            y_grid_size = change_in_y
-            break
+    df_parcels['slippy_grid'] = _slippy_cells(df_parcels['tile'])
 
     intersection_geometries = []
     for row, column in df_parcels.iterrows():
@@ -326,9 +421,115 @@ def grid_to_slippy_grid(in_polygon_coords, in_grid):
     return df_parcels
 
 
+def _grid_cell_id(cell, origin):
+    # Column and row of a cell counted from the shared grid origin
+    west, south, east, north = cell.bounds
+    return round((west - origin[0]) / _grid_delta_x), round((origin[1] - north) / _grid_delta_y)
+
+
+def _feature_grid(in_polygon, origin):
+    # Grid cells of one polygon that it intersects as (cell id, cell, intersection)
+    from shapely.geometry import Polygon
+
+    feature = Polygon(in_polygon)
+    if not feature.is_valid:
+        feature = feature.buffer(0)
+    cells = []
+    for cell in create_grid(in_polygon, origin):
+        part = feature.intersection(cell)
+        if not part.is_empty:
+            cells.append((_grid_cell_id(cell, origin), cell, part))
+    return cells
+
+
+def grid_features(in_polygons, max_workers=None, origin=None):
+    """
+    The following function grids many polygons at once. Every polygon's grid is built on one shared origin, in this
+    process or in parallel on a process pool, so cells shared by neighbouring or overlapping polygons are the same
+    cell and are kept once (by tile_id) with the union of the polygons inside it.
+    ===============     ====================================================================
+    **Argument**        **Description**
+    ---------------     --------------------------------------------------------------------
+    in_polygons         Required list or iterable of polygons, each a list of (lon, lat) coords.
+                        An iterable such as iter_kml_coords is read one polygon at a time.
+    ---------------     --------------------------------------------------------------------
+    max_workers         Optional integer. Processes building grids. Default: None, grids in
+                        this process. A pool only pays off for many large polygons, shipping
+                        small ones to processes costs more than gridding them.
+    ---------------     --------------------------------------------------------------------
+    origin              Optional (lon, lat) tuple the cells are snapped to. Default: the top
+                        left of all polygons for a list, a fixed world origin for iterables
+    ===============     ====================================================================
+    :return: DataFrame of grid cells in the grid_to_slippy_grid layout plus a tile_id column
+
+    Note: polygons are not held once gridded, but the cells are kept until the DataFrame is built, so memory grows
+    with the area covered rather than the number of polygons.
+    """
+    import pandas as pd
+    from shapely.ops import unary_union
+    from nearmap._executor import BoundedExecutor
+
+    if origin is None and isinstance(in_polygons, list):
+        origin = (min(coord[0] for polygon in in_polygons for coord in polygon),
+                  max(coord[1] for polygon in in_polygons for coord in polygon))
+    elif origin is None:
+        # An iterable can only be read once, so its cells are snapped to a fixed world grid instead
+        origin = _grid_world_origin
+    cells = dict()
+    parts = dict()
+    jobs = ((polygon, origin) for polygon in in_polygons)
+
+    def _feature_grids():
+        if max_workers and max_workers > 1:
+            with BoundedExecutor(max_workers, processes=True) as executor:
+                for job, future in executor.as_completed(_feature_grid, jobs):
+                    yield future.result()
+        else:
+            for job in jobs:
+                yield _feature_grid(*job)
+
+    for feature_grid in _feature_grids():
+        for tile_id, cell, part in feature_grid:
+            cells.setdefault(tile_id, cell)
+            parts.setdefault(tile_id, []).append(part)
+
+    # Row by row from the top left, like the single polygon grid
+    tile_ids = sorted(cells, key=lambda tile_id: (tile_id[1], tile_id[0]))
+    df_parcels = pd.DataFrame({'tile': [cells[tile_id] for tile_id in tile_ids]})
+    df_parcels['slippy_grid'] = _slippy_cells(df_parcels['tile']) if tile_ids else []
+    df_parcels['geometry'] = [parts[tile_id][0] if len(parts[tile_id]) == 1 else unary_union(parts[tile_id])
+                              for tile_id in tile_ids]
+    df_parcels['tile_number'] = list(range(len(tile_ids)))
+    df_parcels['tile_id'] = [f"{column}_{row}" for column, row in tile_ids]
+    return df_parcels
+
+
+def create_slippy_grid(in_polygon_coords, max_workers=None):
+    """
+    The following function grids the coords returned by get_coords for the download functions. A single polygon is
+    gridded as before, several polygons (multi feature files) are gridded together with grid_features. An iterator
+    of polygons (iter_coords) is read lazily into grid_features.
+    :return: DataFrame of grid cells
+    """
+    if not isinstance(in_polygon_coords, list):
+        polygons = iter(in_polygon_coords)
+        first = list(islice(polygons, 2))
+        assert first, "Error, no polygons read from the input."
+        if len(first) > 1:
+            return grid_features(chain(first, polygons), max_workers)
+        in_polygon_coords = first[0]
+    nesting_level = _nest_level(in_polygon_coords)
+    assert nesting_level in [2, 1], "Error, input polygon cannot be read."
+    if nesting_level == 1 or len(in_polygon_coords) == 1:
+        return grid_to_slippy_grid(in_polygon_coords=in_polygon_coords, in_grid=create_grid(in_polygon_coords))
+    return grid_features(in_polygon_coords, max_workers)
+
+
 def generate_static_images(df_parcels, api_key, since=None, until=None, limit=1000, offset=0, fields=None,
                            sort="captureDate", overlap=None, include=None, exclude=None):
 
+    import pandas as pd
+    from pyproj import Proj, transform
     from _api import polyV2
     base_url = "https://api.nearmap.com/"
 
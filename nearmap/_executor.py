@@ -0,0 +1,118 @@
+####################################
+#   File name: _executor.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Bounded work queue over a thread or process pool. Jobs are pulled lazily from an iterable and at most max_in_flight
+of them are submitted at a time, so a manifest of millions of tiles never becomes millions of futures and pickled
+arguments. Inputs every job needs are shipped once per worker through shared and read in the job with shared().
+"""
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from os import cpu_count
+
+# Inputs shared by every job of a worker, set once per process (or once for a thread pool) by _initialize
+_shared = dict()
+
+
+def shared(name=None):
+    """Returns the shared inputs of the current worker, or the one called name"""
+    return _shared if name is None else _shared.get(name)
+
+
+def _initialize(shared_inputs, initializer, initargs):
+    _shared.clear()
+    _shared.update(shared_inputs or dict())
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class BoundedExecutor(object):
+    """
+        .. _BoundedExecutor:
+
+        ================    ===============================================================
+        **Argument**        **Description**
+        ----------------    ---------------------------------------------------------------
+        max_workers         Optional integer. Pool size. Default: cpu count for processes, 25
+                            for threads.
+        ----------------    ---------------------------------------------------------------
+        max_in_flight       Optional integer. Most jobs submitted and not yet consumed.
+                            Default: 2 x max_workers
+        ----------------    ---------------------------------------------------------------
+        processes           Optional boolean. Use a process pool. Default: False (threads)
+        ----------------    ---------------------------------------------------------------
+        shared              Optional dictionary of inputs sent once to each worker and read
+                            in jobs with nearmap._executor.shared(name).
+        ----------------    ---------------------------------------------------------------
+        initializer         Optional callable run once per worker after shared is set.
+        ----------------    ---------------------------------------------------------------
+        initargs            Optional tuple of initializer arguments.
+        ================    ===============================================================
+
+        .. code-block:: python
+
+            # Usage Example: Reproject tiles with 8 processes and at most 16 pending jobs
+
+            with BoundedExecutor(8, processes=True, shared={'mask_wkt': mask.wkt}) as executor:
+                for job, future in executor.as_completed(reproject_tile, ({'bounds': b} for b in tile_bounds)):
+                    results.append(future.result())
+    """
+
+    def __init__(self, max_workers=None, max_in_flight=None, processes=False, shared=None, initializer=None,
+                 initargs=()):
+        self.max_workers = max_workers or ((cpu_count() or 1) if processes else 25)
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self._executor = pool(self.max_workers, initializer=_initialize, initargs=(shared, initializer, initargs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(cancel=exc_type is not None)
+
+    def submit(self, func, job):
+        """Submits func(**job) for dict jobs, func(*job) for tuple jobs and func(job) otherwise"""
+        if isinstance(job, dict):
+            return self._executor.submit(func, **job)
+        if isinstance(job, tuple):
+            return self._executor.submit(func, *job)
+        return self._executor.submit(func, job)
+
+    def as_completed(self, func, jobs):
+        """
+        Yields (job, future) as futures complete while keeping at most max_in_flight jobs submitted. Jobs are read
+        from the iterable only as capacity frees up. Call future.result() to get the result or raise the job's error.
+        """
+        pending = dict()
+        for job in jobs:
+            pending[self.submit(func, job)] = job
+            if len(pending) >= self.max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+
+    def map(self, func, jobs):
+        """Yields results as they complete (not in job order). Raises the first job error"""
+        for job, future in self.as_completed(func, jobs):
+            yield future.result()
+
+    def shutdown(self, cancel=False):
+        if cancel:
+            # cancel_futures is Python 3.9+, so on an error only drop what has not started yet
+            try:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                return
+            except TypeError:
+                pass
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,271 @@
+####################################
+#   File name: _instrumentation.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+from re import sub
+from threading import Lock
+from time import perf_counter
+
+# Latency histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf")]
+
+# (name, type, help) of each exported metric family, in exposition order
+_prometheus_families = [
+    ("nearmap_requests_total", "counter", "Requests sent to the Nearmap API."),
+    ("nearmap_request_errors_total", "counter", "Requests that failed or returned a 4xx/5xx status."),
+    ("nearmap_request_retries_total", "counter", "Requests retried after a rate limit, server or network error."),
+    ("nearmap_response_bytes_total", "counter", "Response body bytes, from Content-Length for streamed responses."),
+    ("nearmap_responses_total", "counter", "Responses by HTTP status code."),
+    ("nearmap_request_duration_seconds", "histogram", "Request latency. Streamed responses (images, files, AI "
+                                                      "feature streams) are timed to the response headers, not to "
+                                                      "the end of the body."),
+    ("nearmap_ratelimit_remaining", "gauge", "Latest x-ratelimit-remaining header.")]
+
+
+def _redact(url):
+    return sub(r"(apikey=)[^&]*", r"\1***", url)
+
+
+def endpoint_name(url):
+    """Returns the endpoint of a request url, ex: 'tiles/v3/Vert', 'ai/features/v4/features', 'coverage/v2/point'"""
+    path = url.split("://", 1)[-1].split("?", 1)[0]
+    segments = path.split("/")[1:]
+    n = 4 if segments and segments[0] == "ai" else 3
+    return "/".join(segments[:n]).split(".")[0]
+
+
+class _EndpointMetrics(object):
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.status_codes = dict()
+        self.latency_buckets = [0] * len(buckets)
+        self.latency_sum = 0.0
+        self.rate_limit_limit = None
+        self.rate_limit_remaining = None
+        self.rate_limit_reset = None
+
+    def as_dict(self):
+        return {'requests': self.requests,
+                'errors': self.errors,
+                'retries': self.retries,
+                'bytes': self.bytes,
+                'status_codes': dict(self.status_codes),
+                'latency_sum': self.latency_sum,
+                'latency_buckets': dict(zip(self.buckets, self.latency_buckets)),
+                'rate_limit_limit': self.rate_limit_limit,
+                'rate_limit_remaining': self.rate_limit_remaining,
+                'rate_limit_reset': self.rate_limit_reset}
+
+
+class Instrumentation(object):
+    """
+        .. _Instrumentation:
+
+        Request level instrumentation for the Nearmap API. Every request made by the library is timed and counted
+        per endpoint (requests, errors, retries, status codes, bytes, latency histogram and the latest x-ratelimit-*
+        headers). Pre and post request hooks can be registered to forward requests to other monitoring systems.
+        Urls passed to hooks have the API Key redacted.
+
+        .. code-block:: python
+
+            # Usage Example: Find the slow endpoint in a pipeline
+
+            nearmap = NEARMAP(api_key)
+            nearmap.instrumentation.add_post_request_hook(lambda endpoint, url, response, elapsed: print(endpoint, elapsed))
+            ...
+            print(nearmap.instrumentation.metrics())
+            print(nearmap.instrumentation.to_prometheus())
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = buckets or DEFAULT_BUCKETS
+        self.enabled = True
+        self._pre_request_hooks = []
+        self._post_request_hooks = []
+        self._endpoints = dict()
+        self._lock = Lock()
+
+    ##########
+    # Hooks
+    ########
+
+    def add_pre_request_hook(self, hook):
+        """hook(endpoint, url) is called before each request"""
+        self._pre_request_hooks.append(hook)
+        return hook
+
+    def add_post_request_hook(self, hook):
+        """hook(endpoint, url, response, elapsed) is called after each request. response is None on failure"""
+        self._post_request_hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        for hooks in [self._pre_request_hooks, self._post_request_hooks]:
+            if hook in hooks:
+                hooks.remove(hook)
+
+    ##############
+    # Recording
+    ############
+
+    def _endpoint(self, endpoint):
+        if endpoint not in self._endpoints:
+            self._endpoints[endpoint] = _EndpointMetrics(self.buckets)
+        return self._endpoints[endpoint]
+
+    def before_request(self, url):
+        endpoint = endpoint_name(url)
+        if self.enabled and self._pre_request_hooks:
+            redacted = _redact(url)
+            [hook(endpoint, redacted) for hook in self._pre_request_hooks]
+        return endpoint, perf_counter()
+
+    def after_request(self, endpoint, url, response, start, stream=False):
+        # Called once the headers arrive. For streamed responses the body is still unread, so elapsed is time to headers
+        elapsed = perf_counter() - start
+        if not self.enabled:
+            return elapsed
+        with self._lock:
+            m = self._endpoint(endpoint)
+            m.requests += 1
+            m.latency_sum += elapsed
+            for i, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    m.latency_buckets[i] += 1
+                    break
+            if response is None:
+                m.errors += 1
+            else:
+                status = response.status_code
+                m.status_codes[status] = m.status_codes.get(status, 0) + 1
+                if status >= 400:
+                    m.errors += 1
+                content_length = response.headers.get("Content-Length")
+                if content_length:
+                    m.bytes += int(content_length)
+                elif not stream:
+                    m.bytes += len(response.content)
+                if "x-ratelimit-remaining" in response.headers:
+                    m.rate_limit_limit = response.headers.get("x-ratelimit-limit")
+                    m.rate_limit_remaining = response.headers.get("x-ratelimit-remaining")
+                    m.rate_limit_reset = response.headers.get("x-ratelimit-reset")
+        if self._post_request_hooks:
+            redacted = _redact(url)
+            [hook(endpoint, redacted, response, elapsed) for hook in self._post_request_hooks]
+        return elapsed
+
+    def record_retry(self, url):
+        if self.enabled:
+            with self._lock:
+                self._endpoint(endpoint_name(url)).retries += 1
+
+    ###########
+    # Metrics
+    #########
+
+    def metrics(self):
+        with self._lock:
+            return {endpoint: m.as_dict() for endpoint, m in self._endpoints.items()}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = dict()
+
+    ##############
+    # Exporters
+    ############
+
+    def to_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format (version 0.0.4). Each metric family is written as
+        its HELP and TYPE lines followed by the samples of every endpoint.
+        """
+        metrics = self.metrics()
+
+        def _samples(m, label):
+            yield "nearmap_requests_total", [f"nearmap_requests_total{{{label}}} {m['requests']}"]
+            yield "nearmap_request_errors_total", [f"nearmap_request_errors_total{{{label}}} {m['errors']}"]
+            yield "nearmap_request_retries_total", [f"nearmap_request_retries_total{{{label}}} {m['retries']}"]
+            yield "nearmap_response_bytes_total", [f"nearmap_response_bytes_total{{{label}}} {m['bytes']}"]
+            yield "nearmap_responses_total", [f'nearmap_responses_total{{{label},status="{status}"}} {count}'
+                                              for status, count in m['status_codes'].items()]
+            histogram = []
+            cumulative = 0
+            for bound, count in m['latency_buckets'].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else bound
+                histogram.append(f'nearmap_request_duration_seconds_bucket{{{label},le="{le}"}} {cumulative}')
+            histogram.append(f"nearmap_request_duration_seconds_sum{{{label}}} {m['latency_sum']}")
+            histogram.append(f"nearmap_request_duration_seconds_count{{{label}}} {m['requests']}")
+            yield "nearmap_request_duration_seconds", histogram
+            if m['rate_limit_remaining'] is not None:
+                yield "nearmap_ratelimit_remaining", [f"nearmap_ratelimit_remaining{{{label}}} "
+                                                      f"{m['rate_limit_remaining']}"]
+
+        samples = {name: [] for name, metric_type, help_text in _prometheus_families}
+        for endpoint, m in metrics.items():
+            for name, family_samples in _samples(m, f'endpoint="{endpoint}"'):
+                samples[name].extend(family_samples)
+        lines = []
+        for name, metric_type, help_text in _prometheus_families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples[name])
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port=9464, addr="127.0.0.1"):
+        """
+        Serves to_prometheus() on http://addr:port/metrics from a background thread for Prometheus scraping. Listens
+        on localhost only by default. Pass addr="0.0.0.0" to expose the metrics to other hosts.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from threading import Thread
+        instrumentation = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = instrumentation.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def enable_opentelemetry(self, meter_provider=None):
+        """Records request counts, latency and bytes to OpenTelemetry instruments. Requires opentelemetry-api"""
+        try:
+            from opentelemetry import metrics
+        except ModuleNotFoundError:
+            print("OpenTelemetry export requires opentelemetry-api: https://opentelemetry.io | Library not detected")
+            return None
+        meter = (meter_provider or metrics.get_meter_provider()).get_meter("nearmap")
+        requests_counter = meter.create_counter("nearmap.requests", unit="1")
+        bytes_counter = meter.create_counter("nearmap.response.bytes", unit="By")
+        duration = meter.create_histogram("nearmap.request.duration", unit="s")
+
+        def _otel_hook(endpoint, url, response, elapsed):
+            attributes = {"endpoint": endpoint,
+                          "status_code": response.status_code if response is not None else 0}
+            requests_counter.add(1, attributes)
+            duration.record(elapsed, attributes)
+            if response is not None and response.headers.get("Content-Length"):
+                bytes_counter.add(int(response.headers.get("Content-Length")), attributes)
+
+        return self.add_post_request_hook(_otel_hook)
@@ -0,0 +1,189 @@
+####################################
+#   File name: _key_pool.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+from hashlib import sha1
+from re import search
+from threading import Lock
+from time import time
+from uuid import uuid4
+from weakref import WeakValueDictionary
+
+# token -> APIKeyPool. Urls are built with the pool token in place of an API Key and resolved in _api.get. Pools are
+# held weakly, so a pool is dropped from the registry once its owner (a NEARMAP instance) is garbage collected
+_pools = WeakValueDictionary()
+
+
+def pool_for_url(url):
+    if "apikey=keypool-" not in url:
+        return None
+    token = search(r"apikey=(keypool-[0-9a-f]+)", url)
+    return _pools.get(token.group(1)) if token else None
+
+
+def resolve_api_key(api_key):
+    """Returns a real API Key for a pool token (the key with the most headroom) or api_key unchanged"""
+    pool = _pools.get(api_key)
+    return pool.best_key() if pool is not None else api_key
+
+
+def key_identity(api_key):
+    """
+    Returns a stable identity of api_key for cache namespaces. Pool tokens are unique per pool, so a pool token is
+    replaced by the identity of its key set, which is the same across pools and runs over the same keys.
+    """
+    pool = _pools.get(api_key)
+    return pool.key_set if pool is not None else api_key
+
+
+class _KeyState(object):
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset = None
+        self.throttled_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+
+
+class APIKeyPool(object):
+    """
+        .. _APIKeyPool:
+
+        A pool of Nearmap API Keys. Each request is routed to the key with the most rate limit headroom according
+        to the x-ratelimit-remaining and x-ratelimit-reset headers of that key's previous responses. When a key is
+        throttled (429) the request fails over to the next key with headroom, so aggregate throughput scales with
+        the number of keys. The pool token is only routed while the pool is referenced (NEARMAP keeps a reference
+        in key_pool) and until close() is called.
+
+        ================    ===============================================================
+        **Argument**        **Description**
+        ----------------    ---------------------------------------------------------------
+        api_keys            Required list of Nearmap API Keys.
+        ================    ===============================================================
+
+        .. code-block:: python
+
+            # Usage Example: Spread a bulk tile job across several API Keys
+
+            nearmap = NEARMAP(["api_key_1", "api_key_2", "api_key_3"])
+            print(nearmap.key_pool.stats())
+    """
+
+    def __init__(self, api_keys):
+        api_keys = list(dict.fromkeys(api_keys))
+        assert len(api_keys) > 0, "Error: APIKeyPool requires at least one API Key"
+        self.api_keys = api_keys
+        # Every pool gets its own token, so pools over the same keys never replace each other in the registry
+        self.token = f"keypool-{uuid4().hex}"
+        self.key_set = f"keyset-{sha1(','.join(sorted(api_keys)).encode('utf-8')).hexdigest()[:16]}"
+        self._state = {key: _KeyState() for key in api_keys}
+        self._lock = Lock()
+        _pools[self.token] = self
+
+    def __str__(self):
+        return self.token
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Removes the pool from the registry. Urls built with its token are no longer routed to a pooled key"""
+        if _pools.get(self.token) is self:
+            del _pools[self.token]
+
+    def __len__(self):
+        return len(self.api_keys)
+
+    ##################
+    # Key Selection
+    ################
+
+    def _headroom(self, key, now):
+        state = self._state[key]
+        if state.throttled_until > now:
+            return float("-inf")
+        if state.remaining is None or (state.reset is not None and state.reset <= now):
+            return float("inf")
+        return state.remaining - state.in_flight
+
+    def best_key(self, exclude=None):
+        """Returns the key with the most headroom. If every key is throttled the key that resets first is returned"""
+        now = time()
+        with self._lock:
+            keys = [k for k in self.api_keys if not exclude or k not in exclude] or self.api_keys
+            available = [k for k in keys if self._state[k].throttled_until <= now]
+            if not available:
+                return min(keys, key=lambda k: self._state[k].throttled_until)
+            return max(available, key=lambda k: self._headroom(k, now))
+
+    def acquire(self, exclude=None):
+        key = self.best_key(exclude)
+        with self._lock:
+            self._state[key].in_flight += 1
+        return key
+
+    def release(self, key, response=None):
+        """Returns a key to the pool and records the rate limit headers of its response"""
+        with self._lock:
+            state = self._state[key]
+            state.in_flight = max(state.in_flight - 1, 0)
+            if response is None:
+                return
+            state.requests += 1
+            headers = response.headers
+            if headers.get("x-ratelimit-limit"):
+                state.limit = int(float(headers["x-ratelimit-limit"]))
+            if headers.get("x-ratelimit-remaining"):
+                state.remaining = int(float(headers["x-ratelimit-remaining"]))
+            if headers.get("x-ratelimit-reset"):
+                state.reset = float(headers["x-ratelimit-reset"])
+            if response.status_code == 429:
+                state.throttled += 1
+                state.remaining = 0
+                state.throttled_until = state.reset if state.reset and state.reset > time() else time() + 1
+            elif state.remaining == 0 and state.reset:
+                # Quota spent: rest the key until its window resets rather than spending a request on a 429
+                state.throttled_until = state.reset
+
+    ############
+    # Request
+    ##########
+
+    def request(self, url, send, **kwargs):
+        """
+        Sends url with the pool token replaced by the key with the most headroom. A throttled response fails over
+        to the remaining keys before being returned to the caller.
+        """
+        tried = []
+        while True:
+            key = self.acquire(exclude=tried)
+            response = None
+            try:
+                response = send(url.replace(f"apikey={self.token}", f"apikey={key}"), **kwargs)
+            finally:
+                self.release(key, response)
+            tried.append(key)
+            if response.status_code != 429 or len(tried) >= len(self.api_keys) or \
+                    self._headroom(self.best_key(exclude=tried), time()) == float("-inf"):
+                return response
+            response.close()
+
+    def stats(self):
+        with self._lock:
+            return {f"{key[:4]}...{key[-4:]}": {'limit': s.limit,
+                                                'remaining': s.remaining,
+                                                'reset': s.reset,
+                                                'in_flight': s.in_flight,
+                                                'requests': s.requests,
+                                                'throttled': s.throttled} for key, s in self._state.items()}
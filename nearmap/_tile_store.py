@@ -0,0 +1,261 @@
+####################################
+#   File name: _tile_store.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Redis tile store. Tiles are held as the raw response bytes (no decode/re-encode) under namespaced keys
+{namespace}:{api key hash}:{survey}:{z}:{x}:{y}:{view}.{format}, written and read in pipelined batches. Tiles of a
+survey never change, latest imagery does, so "latest" tiles always expire (after a day unless a TTL is given).
+Assigning a store to NEARMAP.tile_store makes it a cache tier in front of tileV3 and tileSurveyV3.
+"""
+
+from hashlib import sha1
+from threading import Lock
+from urllib.parse import urlsplit, parse_qsl
+
+# Query parameters that change which imagery a tiles/v3 url returns. The API Key is kept as a hash, since keys can
+# be entitled to different content
+_tile_filters = ["since", "until", "mosaic", "include", "exclude", "tertiary"]
+
+# Seconds "latest" tiles are kept when no TTL is given. New surveys replace the latest imagery
+DEFAULT_LATEST_TTL = 86400
+
+
+def _import_redis(asyncio=False):
+    try:
+        if asyncio:
+            import redis.asyncio as redis
+        else:
+            import redis
+    except ModuleNotFoundError:
+        raise ImportError("The tile store requires redis-py: https://github.com/redis/redis-py | Library not detected")
+    return redis
+
+
+def _key_hash(api_key):
+    return sha1(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def image_format(data):
+    """Returns "png" or "jpg" from the leading bytes of a tile"""
+    return "png" if bytes(data[:8]) == b"\x89PNG\r\n\x1a\n" else "jpg"
+
+
+class _TileKeys(object):
+
+    def __init__(self, namespace="nearmap", ttl=None, batch_size=500, latest_ttl=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.latest_ttl = latest_ttl or ttl or DEFAULT_LATEST_TTL
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def key(self, survey, view, z, x, y, out_format, api_key=None):
+        """Returns the key of a tile. survey is a survey ID or "latest" for the latest imagery"""
+        namespace = f"{self.namespace}:{_key_hash(api_key)}" if api_key else self.namespace
+        return f"{namespace}:{survey or 'latest'}:{z}:{x}:{y}:{view}.{out_format}"
+
+    def ttl_for(self, key, ttl=None):
+        """Returns the TTL of a key: ttl if given, latest_ttl for "latest" tiles, otherwise the store ttl"""
+        if ttl:
+            return ttl
+        return self.latest_ttl if ":latest:" in key or ":latest-" in key else self.ttl
+
+    def key_for_url(self, url):
+        """Returns the key of a tiles/v3 url, or None for urls that are not tiles"""
+        parts = urlsplit(url)
+        path = parts.path.split("tiles/v3/", 1)
+        if len(path) != 2:
+            return None
+        segments = path[1].split("/")
+        if segments[0] == "surveys" and len(segments) == 6:
+            survey, view, z, x, tile = segments[1:]
+        elif len(segments) == 4:
+            view, z, x, tile = segments
+            filters = sorted((k, v) for k, v in parse_qsl(parts.query) if k in _tile_filters)
+            # Date and tag filters select different surveys, so each filter combination has its own namespace
+            survey = f"latest-{sha1(str(filters).encode('utf-8')).hexdigest()[:12]}" if filters else "latest"
+        else:
+            return None
+        y, _, out_format = tile.partition(".")
+        api_key = dict(parse_qsl(parts.query)).get("apikey")
+        if api_key:
+            from nearmap._key_pool import key_identity
+            api_key = key_identity(api_key)
+        return self.key(survey, view, z, x, y, out_format, api_key)
+
+    def _batches(self, items):
+        items = list(items)
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
+
+    def _count(self, results):
+        with self._lock:
+            hits = sum(r is not None for r in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / requests if requests else 0.0}
+
+
+class RedisTileStore(_TileKeys):
+    """
+        .. _RedisTileStore:
+
+        Raw tile bytes in Redis under {namespace}:{api key hash}:{survey}:{z}:{x}:{y}:{view}.{format} keys.
+
+        ================    ===============================================================
+        **Argument**        **Description**
+        ----------------    ---------------------------------------------------------------
+        client              Optional redis.Redis client. Created from url when not given.
+        ----------------    ---------------------------------------------------------------
+        url                 Optional string. Redis url. Default: redis://localhost:6379/0
+        ----------------    ---------------------------------------------------------------
+        namespace           Optional string. Key prefix. Default: nearmap
+        ----------------    ---------------------------------------------------------------
+        ttl                 Optional integer. Seconds before a stored tile expires. Default: None
+                            (survey tiles never expire)
+        ----------------    ---------------------------------------------------------------
+        latest_ttl          Optional integer. Seconds before a "latest" tile expires, since a new
+                            survey replaces it. Default: ttl, or 86400 when ttl is None
+        ----------------    ---------------------------------------------------------------
+        max_memory          Optional string or integer. Sets the server maxmemory (e.g. "2gb") with
+                            eviction_policy so the store evicts tiles rather than growing unbounded.
+                            Managed Redis services that block CONFIG SET are left unchanged.
+        ----------------    ---------------------------------------------------------------
+        eviction_policy     Optional string. Redis maxmemory-policy. Default: allkeys-lru
+        ----------------    ---------------------------------------------------------------
+        batch_size          Optional integer. Keys per pipelined MGET/MSET round trip. Default: 500
+        ================    ===============================================================
+
+        .. code-block:: python
+
+            # Usage Example: Cache tileV3 responses in Redis for a day
+
+            nearmap.tile_store = RedisTileStore(ttl=86400, max_memory="2gb")
+            tile = nearmap.tileV3("Vert", 19, 119799, 215845, "jpg", "bytes")
+    """
+
+    def __init__(self, client=None, url="redis://localhost:6379/0", namespace="nearmap", ttl=None, max_memory=None,
+                 eviction_policy="allkeys-lru", batch_size=500, latest_ttl=None):
+        super().__init__(namespace, ttl, batch_size, latest_ttl)
+        if client is None:
+            client = _import_redis().Redis.from_url(url)
+        self.client = client
+        if max_memory:
+            self.set_max_memory(max_memory, eviction_policy)
+
+    def set_max_memory(self, max_memory, eviction_policy="allkeys-lru"):
+        try:
+            self.client.config_set("maxmemory", max_memory)
+            self.client.config_set("maxmemory-policy", eviction_policy)
+        except Exception as e:
+            print(f"warning: unable to set Redis maxmemory ({e}). Configure eviction on the server")
+
+    def get(self, key):
+        return self._count([self.client.get(key)])[0]
+
+    def set(self, key, data, ttl=None):
+        self.client.set(key, bytes(data), ex=self.ttl_for(key, ttl))
+
+    def get_many(self, keys):
+        """Returns the tiles of keys (None where missing) with one MGET per batch_size keys"""
+        results = []
+        for batch in self._batches(keys):
+            results.extend(self.client.mget(batch))
+        return self._count(results)
+
+    def set_many(self, tiles, ttl=None):
+        """Stores a {key: bytes} mapping with pipelined MSET, or SET EX per key when a TTL applies"""
+        for batch in self._batches(tiles.items()):
+            pipe = self.client.pipeline(transaction=False)
+            no_expiry = dict()
+            for key, data in batch:
+                key_ttl = self.ttl_for(key, ttl)
+                if key_ttl:
+                    pipe.set(key, bytes(data), ex=key_ttl)
+                else:
+                    no_expiry[key] = bytes(data)
+            if no_expiry:
+                pipe.mset(no_expiry)
+            pipe.execute()
+
+    def put_file(self, in_tile, key=None):
+        """Stores a tile file as is. key defaults to the file stem"""
+        from pathlib import Path
+        with open(in_tile, 'rb') as f:
+            key = key or Path(in_tile).stem
+            self.set(key, f.read())
+        return key
+
+    def clear(self):
+        """Deletes every key of the namespace"""
+        deleted = 0
+        for batch in self._batches(self.client.scan_iter(match=f"{self.namespace}:*", count=self.batch_size)):
+            deleted += self.client.delete(*batch)
+        return deleted
+
+    def close(self):
+        self.client.close()
+
+
+class AsyncRedisTileStore(_TileKeys):
+    """
+        .. _AsyncRedisTileStore:
+
+        asyncio counterpart of RedisTileStore for aiohttp pipelines. Takes the same arguments with a
+        redis.asyncio.Redis client. Every method except key and key_for_url is a coroutine.
+    """
+
+    def __init__(self, client=None, url="redis://localhost:6379/0", namespace="nearmap", ttl=None, batch_size=500,
+                 latest_ttl=None):
+        super().__init__(namespace, ttl, batch_size, latest_ttl)
+        if client is None:
+            client = _import_redis(asyncio=True).Redis.from_url(url)
+        self.client = client
+
+    async def get(self, key):
+        return self._count([await self.client.get(key)])[0]
+
+    async def set(self, key, data, ttl=None):
+        await self.client.set(key, bytes(data), ex=self.ttl_for(key, ttl))
+
+    async def get_many(self, keys):
+        results = []
+        for batch in self._batches(keys):
+            results.extend(await self.client.mget(batch))
+        return self._count(results)
+
+    async def set_many(self, tiles, ttl=None):
+        for batch in self._batches(tiles.items()):
+            async with self.client.pipeline(transaction=False) as pipe:
+                no_expiry = dict()
+                for key, data in batch:
+                    key_ttl = self.ttl_for(key, ttl)
+                    if key_ttl:
+                        pipe.set(key, bytes(data), ex=key_ttl)
+                    else:
+                        no_expiry[key] = bytes(data)
+                if no_expiry:
+                    pipe.mset(no_expiry)
+                await pipe.execute()
+
+    async def clear(self):
+        deleted = 0
+        keys = [key async for key in self.client.scan_iter(match=f"{self.namespace}:*", count=self.batch_size)]
+        for batch in self._batches(keys):
+            deleted += await self.client.delete(*batch)
+        return deleted
+
+    async def close(self):
+        await self.client.aclose() if hasattr(self.client, "aclose") else await self.client.close()
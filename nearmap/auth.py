@@ -22,3 +22,13 @@ def get_api_key():
     # Closing file
     f.close()
     return my_json['API_KEY']
+
+
+def get_api_keys():
+    # load a list of source credentials for an APIKeyPool. Add "API_KEYS": ["key_1", "key_2"] to api_key.json
+    api_key = join(dirname(realpath(__file__)), "api_key.json")
+    f = open(api_key, "r")
+    my_json = loads(f.read())
+    # Closing file
+    f.close()
+    return my_json.get('API_KEYS') or [my_json['API_KEY']]
@@ -3,62 +3,14 @@ import asyncio
 import aiofiles
 import os
 import time
-from math import log, tan, radians, cos, atan, sinh, pi, degrees
 from nearmap.auth import get_api_key
 from pathlib import Path
-from shutil import rmtree
-from osgeo.gdal import Translate
-try:
-    from osgeo_utils import gdal_merge
-except ImportError:
-    from osgeo.utils import gdal_merge
-
-
-def sec(x):
-    return 1/cos(x)
-
-
-def latlon_to_xy(lat, lon, z):
-    tile_count = pow(2, z)
-    xtile = (lon + 180) / 360
-    ytile = (1 - log(tan(radians(lat)) + sec(radians(lat))) / pi) / 2
-    return int(tile_count*xtile), int(tile_count*ytile)
-
-
-def xy_to_latlon(xtile, ytile, z):
-    n = pow(2, z)
-    lon_deg = (xtile / n * 360.0) - 180.0
-    lat_rad = atan(sinh(pi * (1 - 2 * ytile / n)))
-    lat_deg = degrees(lat_rad)
-    return lat_deg, lon_deg
-
-
-def x_to_lon_edges(x, z):
-    tile_count = pow(2, z)
-    unit = 360 / tile_count
-    lon1 = -180 + x * unit
-    lon2 = lon1 + unit
-    return lon1, lon2
-
-
-def mercator_to_lat(mercator_y):
-    return degrees(atan(sinh(mercator_y)))
-
-
-def y_to_lat_edges(y, z):
-    tile_count = pow(2, z)
-    unit = 1 / tile_count
-    relative_y1 = y * unit
-    relative_y2 = relative_y1 + unit
-    lat1 = degrees(atan(sinh((pi * (1 - 2 * relative_y1)))))
-    lat2 = degrees(atan(sinh((pi * (1 - 2 * relative_y2)))))
-    return lat1, lat2
-
-
-def tile_edges(x, y, z):
-    lat1, lat2 = y_to_lat_edges(y, z)
-    lon1, lon2 = x_to_lon_edges(x, z)
-    return [lon1, lat1, lon2, lat2]
+from shutil import rmtree, move
+import numpy as np
+from nearmap.geospatial.manifest import create_manifest, read_manifest, write_manifest, sort_manifest
+from nearmap.geospatial.mosaic import TileMosaic
+from nearmap.geospatial.vrt import build_manifest_vrt
+from nearmap.geospatial.tiles import latlon_to_tile
 
 
 async def get(session, url, path):
@@ -96,7 +48,13 @@ async def get_tiles_client(urls, max_threads):
 
 
 def get_tiles(api_key, zoom, start_x, start_y, x_tiles, y_tiles, output_dir, max_threads=25, method="merge",
-              out_format="tif"):
+              out_format="tif", tile_manifest=None, order=None):
+    # tile_manifest: optional .npy/.parquet/.geojson manifest from slippy_tile_gen.py downloaded instead of the
+    # x_tiles by y_tiles block at start_x, start_y. The job's tiles are written to scratch_folder/manifest.npy
+    # order: "hilbert", "zorder", "row" or None (manifest order) tile scheduling order
+    # method "merge" writes output_dir/image_0.tif as a 4 band RGBA raster in Web Mercator (EPSG:3857), tiles never
+    # downloaded are transparent. Earlier versions wrote a 3 band RGB raster in WGS84 (EPSG:4326).
+    # out_format: "tif" (tiled GeoTIFF) or "cog" (Cloud Optimized GeoTIFF, also written with a .tif extension)
 
     def _create_folder(folder):
         folder = Path(folder)
@@ -108,80 +66,74 @@ def get_tiles(api_key, zoom, start_x, start_y, x_tiles, y_tiles, output_dir, max
     method = method.lower()
     available_methods = ["merge", "georeference", "tile", None]
     assert method in available_methods, f"Method: {method} not in {available_methods}"
-    available_formats = ['tif', None]
+    merge_drivers = {'tif': 'GTiff', 'cog': 'COG', None: 'GTiff'}
+    available_formats = list(merge_drivers)
     assert out_format in available_formats, f'Out_Format: {out_format} not in {available_formats}'
 
     scratch_folder = os.path.join(os.path.abspath(''), 'scratch_folder')
     unprocessed_folder = f'{scratch_folder}\\unprocessed'
-    georeferenced_folder = f'{scratch_folder}\\georeferenced'
-    [_create_folder(f) for f in [scratch_folder, unprocessed_folder, georeferenced_folder]]
+    [_create_folder(f) for f in [scratch_folder, unprocessed_folder]]
+
+    if tile_manifest is not None:
+        manifest = read_manifest(tile_manifest)
+    else:
+        ys, xs = np.mgrid[start_y:start_y + y_tiles, start_x:start_x + x_tiles]
+        manifest = create_manifest(zoom, xs.ravel(), ys.ravel())
+    manifest = sort_manifest(manifest, order)
+    write_manifest(manifest, f'{scratch_folder}\\manifest.npy')
 
     urls = []
     start = time.time()
     itr = 0
-    for y in range(start_y, start_y + y_tiles):
-        for x in range(start_x, start_x + x_tiles):
-            url = f'https://api.nearmap.com/tiles/v3/Vert/{zoom}/{x}/{y}.img?apikey={api_key}'
-            path = f'{unprocessed_folder}\\{x}_{y}_{zoom}.img'
-            temp = dict()
-            temp['url'] = url
-            temp['path'] = path
-            temp['x'] = x
-            temp['y'] = y
-            temp['zoom'] = zoom
-            urls.append(temp)
-            itr += 1
+    for zoom, x, y in zip(manifest['z'].tolist(), manifest['x'].tolist(), manifest['y'].tolist()):
+        url = f'https://api.nearmap.com/tiles/v3/Vert/{zoom}/{x}/{y}.img?apikey={api_key}'
+        path = f'{unprocessed_folder}\\{x}_{y}_{zoom}.img'
+        temp = dict()
+        temp['url'] = url
+        temp['path'] = path
+        temp['x'] = x
+        temp['y'] = y
+        temp['zoom'] = zoom
+        urls.append(temp)
+        itr += 1
 
     loop = asyncio.get_event_loop()
     loop.run_until_complete(get_tiles_client(urls, max_threads))
     end = time.time()
     print(f"Downloaded Image Tiles in {end - start} Seconds")
-    if method in ["merge", "georeference", None]:
+    if method in [None, "merge"]:
+        # Tiles are decoded straight into one Web Mercator mosaic array and written once, no per tile copies
         start = time.time()
-
-        def _georeference_tile(in_file, out_file, x, y, zoom):
-            bounds = tile_edges(x, y, zoom)
-            # filename, extension = os.path.splitext(path)
-            Translate(out_file, in_file, outputSRS='EPSG:4326', outputBounds=bounds)
-
-        georeferenced_tiles = []
-        # TODO: Implement multiprocessing pool for gdal translate operation
-        for url in urls:
-            in_image = url.get('path')
-            try:
-                in_image = url.get('path').replace('.img', '.jpg')
-                out_image = f'{georeferenced_folder}\\{Path(in_image).name}'
-                _georeference_tile(in_image, out_image, url.get('x'), url.get('y'), url.get('zoom'))
-                georeferenced_tiles.append(out_image)
-            except:
-                in_image = url.get('path').replace('.img', '.png')
-                out_image = f'{georeferenced_folder}\\{Path(in_image).name}'
-                _georeference_tile(in_image, out_image, url.get('x'), url.get('y'), url.get('zoom'))
-                georeferenced_tiles.append(out_image)
+        _create_folder(output_dir)
+
+        def _tile_file(url):
+            path = Path(url.get('path'))
+            jpg = path.with_suffix('.jpg')
+            return jpg if jpg.is_file() else path.with_suffix('.png')
+
+        mosaic = TileMosaic.from_manifest(manifest)
+        mosaic.paste_many((url.get('x'), url.get('y'), _tile_file(url)) for url in urls
+                          if _tile_file(url).is_file())
+        out_raster = f'{output_dir}\\image_0.tif'
+        raster = mosaic.write(out_raster, driver=merge_drivers[out_format])
         rmtree(unprocessed_folder)
         end = time.time()
+        print(f"Merged Image Tiles in {end - start} Seconds")
+        #rmtree(scratch_folder)
+        return raster
+    elif method == "georeference":
+        # A VRT places the downloaded tiles on their Web Mercator grid in place, no georeferenced copies
+        start = time.time()
+        tiles_folder = _create_folder(output_dir) / "tiles"
+        tiles_folder.mkdir(exist_ok=True)
+        # Move the tiles rather than the folder, which would nest unprocessed/ inside an existing tiles/
+        for tile in Path(unprocessed_folder).iterdir():
+            move(str(tile), str(tiles_folder / tile.name))
+        rmtree(unprocessed_folder)
+        vrt = build_manifest_vrt(manifest, tiles_folder, Path(output_dir) / "tiles.vrt")
+        end = time.time()
         print(f"Georeferenced Image Tiles in {end - start} Seconds")
-        if method in [None, "merge"]:
-            start = time.time()
-            _create_folder(output_dir)
-
-            def _merge_tiles(in_rasters, out_raster, out_format):
-                # Only options - GTiff (the default) or HFA (Erdas Imagine)
-                parameters = ['', '-o', out_raster, '-of', out_format] + in_rasters
-                gdal_merge.main(parameters)
-                return out_raster
-
-            formats = {'tif': {'gdal_name': 'GTiff'},
-                       'jpg': {'gdal_name': 'JPG'},
-                       'png': {'gdal_name': 'PNG'}
-                       }
-
-            out_raster = f'{output_dir}\\image_0.{out_format}'
-            raster = _merge_tiles(georeferenced_tiles, out_raster, formats.get('tif').get('gdal_name'))
-            end = time.time()
-            print(f"Merged Image Tiles in {end - start} Seconds")
-            #rmtree(scratch_folder)
-            return raster
+        return vrt
 
 
 if __name__ == "__main__":
@@ -204,9 +156,9 @@ if __name__ == "__main__":
     y_tiles = 5# 220#400
     output_dir = os.path.join(os.path.abspath(''), 'output')
     method = "georeference" #"tile" #"merge"  # Options: "merge", "georeference", "tile", "retile"
-    out_format = "tif"
+    out_format = "tif"  # Options: "tif", "cog"
 
     # Run Script
-    start_x, start_y = latlon_to_xy(lon, lat, zoom)
+    start_x, start_y = (int(_) for _ in latlon_to_tile(lat, lon, zoom))
     start_x, start_y = [581685, 892982]
     get_tiles(api_key, zoom, start_x, start_y, x_tiles, y_tiles, output_dir, max_threads, method, out_format)
@@ -5,10 +5,10 @@ from nearmap.auth import get_api_key
 from nearmap._api import _get_image
 from pathlib import Path
 from shutil import rmtree
-import geopandas as gpd
-import concurrent.futures
 from pathlib import Path
 from os.path import exists
+from nearmap.geospatial.manifest import read_manifest, manifest_formats, sort_manifest
+from nearmap._executor import BoundedExecutor
 
 
 def download_tiles(in_params):
@@ -19,9 +19,12 @@ def download_tiles(in_params):
     _get_image(url=url, out_format=ext, out_image=path, rate_limit_mode="slow")
 
 
-def threaded_get_tiles(api_key, in_geojson, output_dir, overwrite_images, threads=25):
+def threaded_get_tiles(api_key, in_geojson, output_dir, overwrite_images, threads=25, order=None):
+    # order: "hilbert", "zorder", "row" or None (manifest order). Space filling orders keep neighbouring tiles
+    # together on disk and let partial progress form contiguous blocks
 
-    assert Path(in_geojson).suffix.lower() in '.geojson', f'error: in_geojson not detected as geojson file: {in_geojson}'
+    assert Path(in_geojson).suffix.lower() in manifest_formats, f'error: in_geojson not detected as a tile manifest ' \
+                                                                f'{manifest_formats}: {in_geojson}'
 
     scratch_folder = output_dir
 
@@ -35,40 +38,37 @@ def threaded_get_tiles(api_key, in_geojson, output_dir, overwrite_images, thread
     Path(scratch_folder).mkdir(parents=True, exist_ok=True)
     tiles_folder = f'{scratch_folder}\\tiles'
     [_create_folder(f) for f in [scratch_folder, tiles_folder]]
-    urls = []
 
     start = time.time()
-    itr = 0
     print("Begin loading Manifest")
-    gdf = gpd.read_file(in_geojson)
-    print(f"Preparing to download {len(gdf.index)} tiles")
-
-    jobs = []
-    with concurrent.futures.ThreadPoolExecutor(threads) as executor:
-        for index, row in tqdm(gdf.iterrows(), total=gdf.shape[0]):
-            url = f'https://api.nearmap.com/tiles/v3/Vert/{row["zoom"]}/{row["x"]}/{row["y"]}.img?apikey={api_key}'
-            path = f'{tiles_folder}\\{row["x"]}_{row["y"]}_{row["zoom"]}.img'
+    manifest = sort_manifest(read_manifest(in_geojson), order)
+    print(f"Preparing to download {len(manifest)} tiles")
+
+    def _jobs():
+        # Jobs are built lazily as the executor frees capacity, so only a few futures exist at a time
+        tiles = zip(manifest['z'].tolist(), manifest['x'].tolist(), manifest['y'].tolist())
+        for zoom, x, y in tiles:
+            url = f'https://api.nearmap.com/tiles/v3/Vert/{zoom}/{x}/{y}.img?apikey={api_key}'
+            path = f'{tiles_folder}\\{x}_{y}_{zoom}.img'
             if True in [Path(path.replace('.img', '.jpg')).is_file(), Path(path.replace('.img', '.png')).is_file()]:
-                print(f"skipping {path} | File Already Exists")
+                progress.update()
             else:
-                temp = dict()
-                temp['url'] = url
-                temp['path'] = path
-                temp['x'] = row["x"]
-                temp['y'] = row["y"]
-                temp['zoom'] = row["zoom"]
-                urls.append(temp)
-                itr += 1
-                jobs.append(executor.submit(download_tiles, temp))
-    print(f"Begin Downloading Tiles")
+                # download_tiles takes the parameter dict as one argument, not as keywords
+                yield ({'url': url, 'path': path, 'x': x, 'y': y, 'zoom': zoom},)
 
-    results = []
-    for job in jobs:
-        result = job.result()
-        # print(result)
+    print(f"Begin Downloading Tiles")
+    failed = 0
+    with BoundedExecutor(threads) as executor, tqdm(total=len(manifest)) as progress:
+        for job, future in executor.as_completed(download_tiles, _jobs()):
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Unable to download {job[0]['url'].split('?')[0]} | {e}")
+            progress.update()
 
     end = time.time()
-    print(f"Downloaded Image Tiles complete in {end - start} Seconds")
+    print(f"Downloaded Image Tiles complete in {end - start} Seconds | {failed} failed")
 
 if __name__ == "__main__":
 
@@ -81,6 +81,7 @@ if __name__ == "__main__":
     threads = 20
     #output_dir = os.path.join(os.path.abspath(''), 'miami_beach_data')
     output_dir = r'D:\SNAP\LA\2255000_NewOrleans'
-    in_geojson = r'NewOrleans.geojson'
+    in_geojson = r'NewOrleans.npy'  # Tile manifest from slippy_tile_gen.py (.npy, .parquet or .geojson)
     overwrite_images = False
-    threaded_get_tiles(api_key, in_geojson, output_dir, overwrite_images, threads)
+    order = "hilbert"  # Tile scheduling order: "hilbert", "zorder", "row" or None
+    threaded_get_tiles(api_key, in_geojson, output_dir, overwrite_images, threads, order)
@@ -1,37 +1,39 @@
-from PIL import Image
-import redis
-from io import BytesIO
 from pathlib import Path
+from nearmap._tile_store import RedisTileStore
 
 
-def to_redis(redis_server, in_tile):
-    image_name = Path(in_tile).stem
-    output = BytesIO()
-    im = Image.open(in_tile)
-    im.save(output, format=im.format)
-    redis_server.set(image_name, output.getvalue())
-    output.close()
-    return image_name
-
-
-def from_redis(redis_server, tile_name, out_format):
-    tile = redis_server.get(tile_name)
-    if tile:
-        if out_format.lower() == "binary":
-            tile = redis_server.get(tile_name)
-            return tile
-        else:
-            f = Image.open(tile)
-            return f.save(tile_name)
-    else:
+def to_redis(tile_store, in_tile):
+    # Stores the tile file's bytes as is, keyed by the file stem
+    return tile_store.put_file(in_tile, key=Path(in_tile).stem)
+
+
+def from_redis(tile_store, tile_name, out_format):
+    tile = tile_store.get(tile_name)
+    if tile is None:
         return None
+    if out_format.lower() == "binary":
+        return tile
+    with open(tile_name, 'wb') as f:
+        f.write(tile)
+    return tile_name
+
+
+def bulk_to_redis(tile_store, in_tiles):
+    # Pipelined MSET of a folder of tiles
+    tiles = dict()
+    for in_tile in in_tiles:
+        with open(in_tile, 'rb') as f:
+            tiles[Path(in_tile).stem] = f.read()
+    tile_store.set_many(tiles)
+    return list(tiles)
 
 
 if __name__ == "__main__":
-    r = redis.StrictRedis(host='localhost', port=6379, db=0)
+    tile_store = RedisTileStore(url="redis://localhost:6379/0", namespace="nearmap", ttl=86400, max_memory="2gb")
     in_tile = "id_z_x_y.jpg"
-    redis_tile = to_redis(redis_server=r, in_tile=in_tile)
-    image_tile = from_redis(redis_server=r, tile_name=in_tile, out_format="binary")
+    redis_tile = to_redis(tile_store=tile_store, in_tile=in_tile)
+    image_tile = from_redis(tile_store=tile_store, tile_name=redis_tile, out_format="binary")
 
-    #  TODO Assess Asyncio + Celery when streaming tiles
-    #  https://stackoverflow.com/questions/39815771/how-to-combine-celery-with-asyncio
+    # Cache tier for the Tile API: tiles are read from Redis when present and stored after each download
+    # nearmap.tile_store = tile_store
+    # For asyncio pipelines use AsyncRedisTileStore with the same arguments
@@ -0,0 +1,328 @@
+import os
+import sqlite3
+import time
+import concurrent.futures
+import numpy as np
+from itertools import islice
+from pathlib import Path
+from socket import gethostname
+from nearmap.auth import get_api_key
+from nearmap._api import _get_image
+from nearmap.geospatial.tiles import tile_to_quadkey
+
+####################################
+# Quadkey sharded tile job runner
+#   A tile manifest is split into quadkey shards held in a SQLite queue. Workers on any number of processes or hosts
+#   claim one shard at a time, download it into its own tile store and report progress back to the queue.
+#   For multiple hosts place queue_file on storage every host can lock (a local disk exported over NFS/SMB is not
+#   safe for SQLite locking, use a shared disk or run one queue host and point workers at it).
+####################################
+
+
+# Longest a live worker can go without reporting: the "slow" rate limit mode of _get_image sleeps until the hourly
+# rate limit window resets. Stale timeouts must exceed it, or shards of throttled workers are requeued and run twice
+RATE_LIMIT_BACKOFF = 3600
+DEFAULT_STALE_TIMEOUT = 2 * RATE_LIMIT_BACKOFF
+
+
+def _check_stale_timeout(stale_timeout):
+    assert stale_timeout > RATE_LIMIT_BACKOFF, f"Error: stale_timeout {stale_timeout} must exceed the " \
+                                               f"{RATE_LIMIT_BACKOFF} second rate limit backoff of a live worker"
+
+
+def shard_keys(zs, xs, ys, shard_zoom):
+    """Returns the quadkey[:shard_zoom] shard of every tile, computed per zoom level without building full quadkeys"""
+    zs, xs, ys = (np.asarray(a, dtype=np.int64) for a in (zs, xs, ys))
+    keys = np.empty(len(zs), dtype=object)
+    for z in np.unique(zs).tolist():
+        at_zoom = zs == z
+        level = min(z, shard_zoom)
+        keys[at_zoom] = tile_to_quadkey(xs[at_zoom] >> (z - level), ys[at_zoom] >> (z - level), level)
+    return keys
+
+
+def _worker_alive(worker):
+    """
+    False when worker ("host:pid") ran on this host and its process has exited. Workers on other hosts, and local
+    workers on platforms without a safe liveness check, are assumed alive and left to requeue_stale.
+    """
+    host, _, pid = (worker or "").rpartition(":")
+    if host != gethostname() or not pid.isdigit():
+        return True
+    try:
+        import psutil
+        return psutil.pid_exists(int(pid))
+    except ModuleNotFoundError:
+        pass
+    if os.name == "nt":
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_manifest(in_manifest, chunk_size=100000):
+    # Yields (z, x, y) from a slippy_tile_gen manifest (.npy, .parquet or .geojson) without building geometries
+    from nearmap.geospatial.manifest import read_manifest as read_tile_manifest
+    manifest = read_tile_manifest(in_manifest)
+    for start in range(0, len(manifest), chunk_size):
+        chunk = manifest[start:start + chunk_size]
+        yield from zip(chunk['z'].tolist(), chunk['x'].tolist(), chunk['y'].tolist())
+
+
+class ShardQueue(object):
+    """
+    SQLite backed queue of quadkey shards. Every shard row records its status (pending, running, done, failed), the
+    worker holding it and its progress. Tiles are stored with their shard so any worker can claim any shard.
+    """
+
+    def __init__(self, queue_file):
+        self.queue_file = Path(queue_file)
+        self.queue_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.queue_file.as_posix(), timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS shards ("
+                          "shard TEXT PRIMARY KEY, "
+                          "status TEXT DEFAULT 'pending', "
+                          "worker TEXT, "
+                          "tiles INTEGER DEFAULT 0, "
+                          "done INTEGER DEFAULT 0, "
+                          "failed INTEGER DEFAULT 0, "
+                          "updated_at REAL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS tiles (shard TEXT, z INTEGER, x INTEGER, y INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tiles_shard ON tiles (shard)")
+
+    def load(self, tiles, shard_zoom, chunk_size=100000):
+        """Splits an iterable of (z, x, y) into quadkey[:shard_zoom] shards and queues them"""
+        counts = dict()
+        tiles = iter(tiles)
+        self.conn.execute("BEGIN")
+        while True:
+            chunk = list(islice(tiles, chunk_size))
+            if not chunk:
+                break
+            zs, xs, ys = (np.asarray(column, dtype=np.int64) for column in zip(*chunk))
+            shards = shard_keys(zs, xs, ys, shard_zoom)
+            for shard, count in zip(*np.unique(shards.astype(str), return_counts=True)):
+                counts[str(shard)] = counts.get(str(shard), 0) + int(count)
+            self.conn.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)",
+                                  zip(shards.tolist(), zs.tolist(), xs.tolist(), ys.tolist()))
+        self.conn.executemany("INSERT OR IGNORE INTO shards (shard, tiles, updated_at) VALUES (?, ?, ?)",
+                              [(shard, count, time.time()) for shard, count in counts.items()])
+        self.conn.execute("COMMIT")
+        return counts
+
+    def claim(self, worker):
+        """Atomically hands the next pending shard to worker. Returns None when the queue is drained"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        row = self.conn.execute("SELECT shard FROM shards WHERE status = 'pending' ORDER BY shard LIMIT 1").fetchone()
+        if row is not None:
+            self.conn.execute("UPDATE shards SET status = 'running', worker = ?, updated_at = ? WHERE shard = ?",
+                              (worker, time.time(), row[0]))
+        self.conn.execute("COMMIT")
+        return row[0] if row else None
+
+    def tiles(self, shard):
+        return self.conn.execute("SELECT z, x, y FROM tiles WHERE shard = ?", (shard,)).fetchall()
+
+    def report(self, shard, worker, done, failed, status=None):
+        """
+        Records the progress of a shard held by worker. Returns False when the worker no longer holds the shard (it
+        was requeued as stale and claimed again), the worker should then stop working on it
+        """
+        if status:
+            cursor = self.conn.execute("UPDATE shards SET done = ?, failed = ?, status = ?, updated_at = ? "
+                                       "WHERE shard = ? AND worker = ?",
+                                       (done, failed, status, time.time(), shard, worker))
+        else:
+            cursor = self.conn.execute("UPDATE shards SET done = ?, failed = ?, updated_at = ? "
+                                       "WHERE shard = ? AND worker = ?", (done, failed, time.time(), shard, worker))
+        return cursor.rowcount > 0
+
+    def requeue_stale(self, timeout=DEFAULT_STALE_TIMEOUT):
+        """Returns running shards that have not reported for timeout seconds (dead workers) to the queue"""
+        return self.conn.execute("UPDATE shards SET status = 'pending', worker = NULL "
+                                 "WHERE status = 'running' AND updated_at < ?", (time.time() - timeout,)).rowcount
+
+    def requeue_dead(self, is_alive=_worker_alive):
+        """Returns running shards whose worker process is no longer alive to the queue"""
+        running = self.conn.execute("SELECT shard, worker FROM shards WHERE status = 'running'").fetchall()
+        dead = [(shard, worker) for shard, worker in running if not is_alive(worker)]
+        for shard, worker in dead:
+            self.conn.execute("UPDATE shards SET status = 'pending', worker = NULL "
+                              "WHERE shard = ? AND status = 'running' AND worker = ?", (shard, worker))
+        return len(dead)
+
+    def requeue_failed(self):
+        return self.conn.execute("UPDATE shards SET status = 'pending', worker = NULL, done = 0, failed = 0 "
+                                 "WHERE status = 'failed'").rowcount
+
+    def progress(self):
+        row = self.conn.execute("SELECT SUM(tiles), SUM(done), SUM(failed), SUM(status = 'done'), "
+                                "SUM(status = 'running'), SUM(status = 'pending'), COUNT(*) FROM shards").fetchone()
+        return {'tiles': row[0] or 0, 'done': row[1] or 0, 'failed': row[2] or 0, 'shards_done': row[3] or 0,
+                'shards_running': row[4] or 0, 'shards_pending': row[5] or 0, 'shards': row[6] or 0}
+
+    def close(self):
+        self.conn.close()
+
+
+def download_tile(url, path):
+    ext = Path(path).suffix.replace(".", "")
+    return _get_image(url=url, out_format=ext, out_image=path, rate_limit_mode="slow", quiet=True)
+
+
+def run_shard(api_key, queue, shard, output_dir, threads=8, base_url="https://api.nearmap.com/",
+              report_every=100, order="hilbert", worker=None):
+    """
+    Downloads every tile of a shard into output_dir/shards/{shard} and reports progress to the queue as worker.
+    Stops early if the shard was requeued and claimed by another worker while this one ran it
+    """
+    from nearmap.geospatial.manifest import tile_order
+
+    shard_folder = Path(output_dir) / "shards" / shard
+    shard_folder.mkdir(parents=True, exist_ok=True)
+    done = failed = 0
+    tiles = queue.tiles(shard)
+    if tiles and order:
+        zs, xs, ys = (np.array(column) for column in zip(*tiles))
+        tiles = [tiles[i] for i in tile_order(zs, xs, ys, order)]
+    with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+        jobs = []
+        for z, x, y in tiles:
+            path = shard_folder / f"{x}_{y}_{z}.img"
+            if path.with_suffix('.jpg').is_file() or path.with_suffix('.png').is_file():
+                done += 1  # tile store already holds the tile from an earlier, interrupted run
+                continue
+            url = f'{base_url}tiles/v3/Vert/{z}/{x}/{y}.img?apikey={api_key}'
+            jobs.append(executor.submit(download_tile, url, path.as_posix()))
+        for i, job in enumerate(concurrent.futures.as_completed(jobs)):
+            try:
+                if job.result() is None:
+                    failed += 1
+                else:
+                    done += 1
+            except Exception:
+                failed += 1
+            if i % report_every == 0 and not queue.report(shard, worker, done, failed):
+                print(f"Shard {shard} was requeued while {worker} ran it... stopping")
+                [job.cancel() for job in jobs]
+                return done, failed
+    if not queue.report(shard, worker, done, failed, status="failed" if failed else "done"):
+        print(f"Shard {shard} was requeued while {worker} ran it... result not recorded")
+    return done, failed
+
+
+def shard_worker(api_key, queue_file, output_dir, threads=8, base_url="https://api.nearmap.com/", order="hilbert"):
+    """Claims and downloads shards until the queue is drained. Run one per process or per host"""
+    key_pool = None
+    if isinstance(api_key, list):
+        from nearmap._key_pool import APIKeyPool
+        key_pool = APIKeyPool(api_key)  # held here, the registry only keeps a weak reference
+        api_key = key_pool.token
+    worker = f"{gethostname()}:{os.getpid()}"
+    queue = ShardQueue(queue_file)
+    shards = 0
+    try:
+        shard = queue.claim(worker)
+        while shard is not None:
+            run_shard(api_key, queue, shard, output_dir, threads, base_url, order=order, worker=worker)
+            shards += 1
+            shard = queue.claim(worker)
+    finally:
+        queue.close()
+        if key_pool is not None:
+            key_pool.close()
+    return worker, shards
+
+
+def resume_queue(queue, retry_failed=True, stale_timeout=DEFAULT_STALE_TIMEOUT):
+    """
+    Requeues the shards an interrupted job left behind: running shards whose worker has exited or stopped reporting
+    and, with retry_failed, shards that finished with failed tiles. Returns the number of shards requeued
+    """
+    _check_stale_timeout(stale_timeout)
+    requeued = queue.requeue_dead() + queue.requeue_stale(stale_timeout)
+    if retry_failed:
+        requeued += queue.requeue_failed()
+    return requeued
+
+
+def run_sharded_job(api_key, in_manifest, output_dir, shard_zoom=13, processes=None, threads=8,
+                    base_url="https://api.nearmap.com/", queue_file=None, order="hilbert", retry_failed=True,
+                    stale_timeout=DEFAULT_STALE_TIMEOUT, stale_check_every=60):
+    """
+    Splits in_manifest into quadkey shards and downloads them across a process pool. The queue persists in
+    output_dir/shard_queue.sqlite, so an interrupted job resumes where it stopped and workers on other hosts can
+    join by calling shard_worker on the same queue_file. Shards are claimed in quadkey order and the tiles of a
+    shard are downloaded in order ("hilbert", "zorder", "row" or None) so finished work forms contiguous blocks.
+    On resume, shards of dead workers and (with retry_failed) failed shards are queued again. While the job runs,
+    shards of dead or silent workers (no report for stale_timeout seconds) are requeued every stale_check_every
+    seconds and picked up by new workers. stale_timeout must exceed RATE_LIMIT_BACKOFF, the longest a throttled
+    worker sleeps between reports. A worker whose shard was requeued anyway stops at its next report.
+    """
+    from tqdm import tqdm
+
+    _check_stale_timeout(stale_timeout)
+    start = time.time()
+    queue_file = queue_file or Path(output_dir) / "shard_queue.sqlite"
+    queue = ShardQueue(queue_file)
+    if queue.progress()['shards'] == 0:
+        print("Begin loading Manifest")
+        counts = queue.load(read_manifest(in_manifest), shard_zoom)
+        print(f"Queued {sum(counts.values())} tiles in {len(counts)} shards at quadkey level {shard_zoom}")
+    else:
+        print(f"Resuming shard queue {queue_file} | requeued {resume_queue(queue, retry_failed, stale_timeout)} "
+              f"shards")
+    processes = processes or os.cpu_count()
+
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        def _submit_workers():
+            return [executor.submit(shard_worker, api_key, queue_file, output_dir, threads, base_url, order)
+                    for i in range(processes)]
+
+        workers = _submit_workers()
+        last_check = time.time()
+        with tqdm(total=queue.progress()['tiles']) as bar:
+            while True:
+                if time.time() - last_check >= stale_check_every:
+                    queue.requeue_dead()
+                    queue.requeue_stale(stale_timeout)
+                    last_check = time.time()
+                finished = all(w.done() for w in workers)
+                progress = queue.progress()
+                bar.n = progress['done'] + progress['failed']
+                bar.set_postfix(shards=f"{progress['shards_done']}/{progress['shards']}",
+                                running=progress['shards_running'], failed=progress['failed'])
+                bar.refresh()
+                if finished:
+                    [w.result() for w in workers]  # raise worker errors
+                    if not progress['shards_pending']:
+                        break
+                    workers = _submit_workers()  # shards requeued after the workers drained the queue
+                time.sleep(1)
+    progress = queue.progress()
+    queue.close()
+    end = time.time()
+    print(f"Downloaded {progress['done']} tiles ({progress['failed']} failed) in {end - start} Seconds")
+    return progress
+
+
+if __name__ == "__main__":
+
+    ###############
+    # User Inputs
+    #############
+
+    api_key = get_api_key()  # Edit api key in nearmap/api_key.py -or- type api key as string here
+
+    in_manifest = r'NewOrleans.npy'  # Tile manifest from slippy_tile_gen.py (.npy, .parquet or .geojson)
+    output_dir = os.path.join(os.path.abspath(''), 'output')
+    shard_zoom = 13  # Quadkey level tiles are grouped by. Matches slippy_tile_gen zip_zoom_level
+    processes = os.cpu_count()
+    threads = 8  # Download threads per process
+    run_sharded_job(api_key, in_manifest, output_dir, shard_zoom, processes, threads)
@@ -1,133 +1,43 @@
 from pathlib import Path
-from osgeo.gdal import Translate
-from math import log, tan, radians, cos, atan, sinh, pi, degrees
-import fiona
-from fiona.transform import transform_geom
-from shapely.geometry import Polygon, box, shape
-from shapely import ops
-import tiletanic
-import geopandas as gpd
-from collections import defaultdict
+from nearmap.geospatial.tilecover import cover_geojson, tile_count, runs_to_tiles
+from nearmap.geospatial.manifest import write_manifest_from_runs, create_manifest, write_manifest, sort_manifest
+from nearmap.geospatial.tiles import tile_bounds
 
 import time
-try:
-    from ujson import load, dump, dumps
-except ModuleNotFoundError:
-    from json import load, dump, dumps
-
-
-def sec(x):
-    return 1 / cos(x)
-
-
-def latlon_to_xy(lat, lon, z):
-    tile_count = pow(2, z)
-    xtile = (lon + 180) / 360
-    ytile = (1 - log(tan(radians(lat)) + sec(radians(lat))) / pi) / 2
-    return int(tile_count * xtile), int(tile_count * ytile)
-
-
-def xy_to_latlon(xtile, ytile, z):
-    n = pow(2, z)
-    lon_deg = (xtile / n * 360.0) - 180.0
-    lat_rad = atan(sinh(pi * (1 - 2 * ytile / n)))
-    lat_deg = degrees(lat_rad)
-    return lat_deg, lon_deg
-
-
-def x_to_lon_edges(x, z):
-    tile_count = pow(2, z)
-    unit = 360 / tile_count
-    lon1 = -180 + x * unit
-    lon2 = lon1 + unit
-    return lon1, lon2
-
-
-def mercator_to_lat(mercator_y):
-    return degrees(atan(sinh(mercator_y)))
-
-
-def y_to_lat_edges(y, z):
-    tile_count = pow(2, z)
-    unit = 1 / tile_count
-    relative_y1 = y * unit
-    relative_y2 = relative_y1 + unit
-    lat1 = degrees(atan(sinh((pi * (1 - 2 * relative_y1)))))
-    lat2 = degrees(atan(sinh((pi * (1 - 2 * relative_y2)))))
-    return lat1, lat2
-
-
-def tile_edges(x, y, z):
-    lat1, lat2 = y_to_lat_edges(y, z)
-    lon1, lon2 = x_to_lon_edges(x, z)
-    return [lon1, lat1, lon2, lat2]
 
 
 def georeference_tile(in_file, out_file, x, y, zoom):
-    bounds = tile_edges(x, y, zoom)
+    from osgeo.gdal import Translate
+    bounds = [float(edge) for edge in tile_bounds(x, y, zoom)]  # west, north, east, south
     # filename, extension = os.path.splitext(path)
     Translate(out_file, in_file, outputSRS='EPSG:4326', outputBounds=bounds)
 
 
-def slippy_tile_gen(in_geojson, out_geojson, zoom, buffer_distance, remove_holes, zip_tiles, zip_zoom_level):
-    print(in_geojson, out_geojson, zoom, buffer_distance, remove_holes, zip_tiles, zip_zoom_level)
+def slippy_tile_gen(in_geojson, out_geojson, zoom, buffer_distance, remove_holes, zip_tiles, zip_zoom_level,
+                    order=None):
+    print(in_geojson, out_geojson, zoom, buffer_distance, remove_holes, zip_tiles, zip_zoom_level, order)
 
     start = time.time()
     ts = time.time()
-    geoms = []
-    scheme = tiletanic.tileschemes.WebMercator()
-    in_geojson = Path(in_geojson)
-    with fiona.open(in_geojson) as src:
-        for rec in src:
-            print(rec)
-            # Convert to web mercator, load as shapely geom.
-            wm_geom = shape(transform_geom('EPSG:4326', 'EPSG:3857', rec['geometry']))
-
-            if remove_holes:
-                wm_geom = Polygon(wm_geom.exterior)
-            geoms.append(wm_geom)
-    # Find the covering.
-    tiles = []
-    for geom in geoms:
-        tiles.extend(t for t in tiletanic.tilecover.cover_geometry(scheme, wm_geom, zoom))
-    # Remove dupes if geoms overlapped.
-    tiles = set(tiles)
-    # Group by zip_zoom_level.
-    zip_d = defaultdict(list)
-    for t in tiles:
-        zip_d[scheme.quadkey(t)[:zip_zoom_level]].append(t)
-    del tiles
-    # Note that at this stage we have all the XYZ tiles per zip_zoom_level.
+    # Find the covering of every geometry as runs of tiles per row. Overlapping geometries are deduplicated.
+    runs = cover_geojson(Path(in_geojson), zoom, remove_holes)
     te = time.time()
-    print(f'tiles created in {te - ts} seconds');
+    print(f'{tile_count(runs)} tiles created in {te - ts} seconds')
 
+    print(f'Begin Exporting Results to {Path(out_geojson).suffix} manifest')
     ts = time.time()
-    r_tiles = []
-    id = 0
-    for zzl in zip_d:
-        for t in zip_d.get(zzl):
-            bounds = tile_edges(t.x, t.y, t.z)
-            r_tiles.append({
-                'geometry': box(bounds[0], bounds[1], bounds[2], bounds[3]),
-                'id': id,
-                'x': t.x,
-                'y': t.y,
-                'zoom': t.z,
-                'zip_zoom': zzl
-            })
-            id += 1
-    del zip_d
-    result = gpd.GeoDataFrame(r_tiles).set_crs('epsg:4326')
-    te = time.time()
-    print(f'formatted as geoDataFrame in {te - ts} seconds');
-    print('Begin Exporting Results to geojson file')
-    ts = time.time()
-    result.to_file(out_geojson, driver='GeoJSON')
+    # .npy and .parquet manifests hold (z, x, y, shard) only. GeoJSON is kept for tools that need tile boxes.
+    if order is None:
+        write_manifest_from_runs(runs, zoom, out_geojson, zip_zoom_level)
+    else:
+        # Ordering along a space filling curve needs the whole cover in memory (17 bytes per tile)
+        xs, ys = runs_to_tiles(runs)
+        manifest = sort_manifest(create_manifest(zoom, xs, ys, zip_zoom_level), order)
+        write_manifest(manifest, out_geojson, zip_zoom_level)
     te = time.time()
-    print(f"Exported to GeoJSON in {te - ts} seconds")
+    print(f"Exported manifest in {te - ts} seconds")
     end = time.time()  # End Clocking
     print(f"Processed {in_geojson} in {end - start} seconds")
-    #return out_geojson
     return out_geojson
 
 
@@ -138,5 +48,7 @@ if __name__ == "__main__":
     remove_holes = True
     zip_tiles = True # Attributes grid with necessary values for zipping using zipper.py
     zip_zoom_level = 13
-    out_geojson= "test.geojson"
-    slippy_tile_gen(in_geojson, out_geojson, zoom, buffer_distance, remove_holes, zip_tiles, zip_zoom_level)
+    in_geojson = "test_aoi.geojson"  # Polygon or MultiPolygon AOI(s) in EPSG:4326
+    out_geojson= "test.npy"  # Compact manifest. Use .parquet for Arrow tooling or .geojson for tile boxes
+    order = "hilbert"  # Manifest tile order: "hilbert", "zorder", "row" or None (row runs as covered)
+    slippy_tile_gen(in_geojson, out_geojson, zoom, buffer_distance, remove_holes, zip_tiles, zip_zoom_level, order)
@@ -18,6 +18,104 @@ def convert_coord_list_dms_to_dd(in_dms_coords, delimeter="-"):
     return [convert_coords_dms_to_dd(i, delimeter) for i in in_dms_coords]
 
 
+def dms_pattern(delimeter="-", hemispheres="NSEW"):
+    """
+    Returns the compiled regex used by convert_dms_array_to_dd. delimeter is one string separating degrees, minutes
+    and seconds ("-", ":", " ") or a list of the strings following each part, e.g. ["°", "'", '"'].
+    """
+    import re
+    delimeters = [delimeter] * 2 if isinstance(delimeter, str) else list(delimeter)
+    assert len(delimeters) in [2, 3], f"Error: delimeter must be a string or a list of 2 or 3 strings: {delimeter}"
+    d, m = (r'\s*' + re.escape(i.strip()) + r'\s*' if i.strip() else r'\s+' for i in delimeters[:2])
+    s = r'\s*' + re.escape(delimeters[2].strip()) + '?' if len(delimeters) == 3 else ''
+    hemisphere = f'[{re.escape(hemispheres + hemispheres.lower())}]'
+    number = r'\d+(?:\.\d*)?'
+    # Hemisphere letter before or after the coordinate, or a signed degree. Minutes and seconds are optional
+    return re.compile(rf'^\s*(?P<prefix>{hemisphere})?\s*(?P<sign>[-+])?(?P<d>{number})'
+                      rf'(?:{d}(?P<m>{number})(?:{m}(?P<s>{number}){s})?)?\s*(?P<suffix>{hemisphere})?\s*$')
+
+
+def _regex_dms(strings, pattern, negative):
+    # Any layout the pattern accepts, one regex match per string
+    import numpy as np
+    import pandas as pd
+
+    parts = pd.Series(strings, dtype=object).str.extract(pattern)
+    d, m, s = (pd.to_numeric(parts[i], errors='coerce').to_numpy(dtype=np.float64) for i in ['d', 'm', 's'])
+    dd = d + np.nan_to_num(m) / 60 + np.nan_to_num(s) / 3600
+    hemisphere = parts['prefix'].fillna(parts['suffix']).fillna('').str.upper()
+    # A hemisphere letter decides the sign, a leading minus only applies to coordinates without one
+    flip = hemisphere.isin(list(negative.upper())) | ((hemisphere == '') & (parts['sign'] == '-'))
+    return np.where(flip.to_numpy(), -dd, dd)
+
+
+def _fixed_width_dms(strings, pattern, negative, hemispheres):
+    """
+    Parses the strings laid out like the first one (same width, digits and delimeters in the same places, any
+    hemisphere letter) with array arithmetic on their characters. Returns decimal degrees and a mask of those rows.
+    """
+    import numpy as np
+
+    dd = np.full(len(strings), np.nan)
+    match = pattern.match(str(strings[0]))
+    if match is None:
+        return dd, np.zeros(len(strings), dtype=bool)
+    chars = strings.view(np.uint32).reshape(len(strings), -1)
+    template = chars[0]
+    digits = (chars >= ord('0')) & (chars <= ord('9'))
+    same = np.where(digits[0], digits, chars == template)
+    letters = [ord(i) for i in hemispheres.upper() + hemispheres.lower()]
+    hemisphere = [match.start(g) for g in ['prefix', 'suffix'] if match.group(g)]
+    for i in hemisphere:
+        same[:, i] = np.isin(chars[:, i], letters)
+    rows = same.all(axis=1)
+    chars = chars[rows]
+
+    def _number(group, scale):
+        if match.group(group) is None:
+            return 0
+        start, end = match.span(group)
+        point = match.group(group).find('.')
+        point = end if point < 0 else start + point
+        # Place value of every character in the number, 0 for the decimal point
+        weights = np.array([10.0 ** (point - 1 - i) if i < point else 10.0 ** (point - i) if i > point else 0
+                            for i in range(start, end)])
+        return (chars[:, start:end].astype(np.float64) - ord('0')) @ weights / scale
+
+    values = _number('d', 1) + _number('m', 60) + _number('s', 3600)
+    if hemisphere:
+        flip = np.isin(chars[:, hemisphere[0]], [ord(i) for i in negative.upper() + negative.lower()])
+    else:
+        flip = np.full(len(chars), match.group('sign') == '-')
+    dd[rows] = np.where(flip, -values, values)
+    return dd, rows
+
+
+def convert_dms_array_to_dd(in_dms, delimeter="-", negative="SW", hemispheres="NSEW"):
+    """
+    Converts a column of DMS strings to decimal degrees in one pass.
+    in_dms: pandas Series, NumPy array or list of strings such as "34-28-40.9000N", "W093-05-46.4" or "-93-05-46.4"
+    delimeter: see dms_pattern
+    negative: hemisphere letters that make a coordinate negative
+    Returns a float64 NumPy array, NaN where a string cannot be parsed.
+    Columns in one fixed width layout (the usual export) are parsed as character arrays, other rows by regex.
+    """
+    import numpy as np
+    import pandas as pd
+
+    pattern = dms_pattern(delimeter, hemispheres)
+    strings = np.asarray(in_dms)
+    if strings.dtype.kind != 'U':
+        strings = pd.Series(np.asarray(in_dms, dtype=object)).fillna('').astype(str).to_numpy(dtype=str)
+    strings = np.ascontiguousarray(strings)
+    if len(strings) == 0:
+        return np.empty(0)
+    dd, parsed = _fixed_width_dms(strings, pattern, negative, hemispheres)
+    if not parsed.all():
+        dd[~parsed] = _regex_dms(strings[~parsed], pattern, negative)
+    return dd
+
+
 if __name__ == "__main__":
 
     #################################
@@ -43,3 +141,11 @@ if __name__ == "__main__":
     delimeter = "-"
     result = convert_coords_dms_to_dd(in_dms_coord, delimeter)
     print(f"processed coord pair as: {result}")
+
+    #################################
+    # Convert a column of DMS strings to DD
+    ###############################
+    in_dms_column = [coord[1] for coord in in_dms_coords]
+    delimeter = "-"
+    results = convert_dms_array_to_dd(in_dms_column, delimeter)
+    print(f"processed coordinate column as: {results}")
@@ -1,12 +1,9 @@
-import fiona
-import geopandas as gpd
-from shapely.geometry import mapping, Polygon
+# fiona, geopandas, shapely and gdal are imported within the functions that use them so that importing this module
+# does not load the geospatial stack.
 from zipfile import ZipFile
-from osgeo import gdal
-from osgeo.gdalconst import GA_ReadOnly
 from pathlib import Path
-from os.path import splitext
-from math import radians, asinh, tan, pi
+from os.path import splitext, split
+from shutil import make_archive, move
 
 
 #################
@@ -15,29 +12,30 @@ from math import radians, asinh, tan, pi
 
 
 def get_file_crs(in_file):
+    import fiona
     with fiona.open(in_file, mode="r") as source:
         crs = source.crs.get('init').upper()
         return crs
 
 
 def get_db_layer_crs(in_db, layer):
+    import fiona
     with fiona.open(in_db, layer=layer.replace("main.", ""), mode="r") as source:
         crs = source.crs.get('init').upper()
         return crs
 
 def lat_lon_to_slippy_coords(lat_deg, lon_deg, zoom):
-    # From: https://wiki.openstreetmap.org/wiki/Slippy_map_tilenames
-    lat_rad = radians(lat_deg)
-    n = 2.0 ** zoom
-    xtile = int((lon_deg + 180.0) / 360.0 * n)
-    ytile = int((1.0 - asinh(tan(lat_rad)) / pi) / 2.0 * n)
-    return [xtile, ytile]
+    # Scalar form of nearmap.geospatial.tiles.latlon_to_tile, use that for many points
+    from nearmap.geospatial.tiles import latlon_to_tile
+    xtile, ytile = latlon_to_tile(lat_deg, lon_deg, zoom)
+    return [int(xtile), int(ytile)]
 
 ################
 # File Reading
 ##############
 
 def read_file_as_gdf(in_file, mask=None, to_crs='EPSG:4326'):
+    import geopandas as gpd
     supported_formats = [".shp", ".geojson"]
     supported_gdbs = [".gpkg", ".gdb"]
     f = Path(in_file)
@@ -109,6 +107,8 @@ def shapely_polygon_to_shp(in_shapely_geom, crs, out_shapefile):
     # TODO: Support parsing more than one feature in list to a shapeile
     # TODO: Rename to shapely_geometry_writer or similar.
     # TODO: Support other formats and data types (line, point, polygon, multiline, multipolgon, multipoint) than just shape.
+    import fiona
+    from shapely.geometry import mapping
     # Define a polygon feature geometry with one attribute
     schema = {
         'geometry': 'Polygon',
@@ -152,6 +152,9 @@ def delete_shapefile(in_shapefile):
 
 
 def get_raster_geom(in_raster, method=None, as_str=False):
+    from osgeo import gdal
+    from osgeo.gdalconst import GA_ReadOnly
+    from shapely.geometry import Polygon
     data = gdal.Open(in_raster, GA_ReadOnly)
     geo_transform = data.GetGeoTransform()
     xmin = geo_transform[0]
@@ -0,0 +1,228 @@
+####################################
+#   File name: manifest.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Compact columnar tile manifests. A manifest is a NumPy structured array of (z, x, y, shard), 17 bytes per tile,
+stored as .npy (memory mapped on read) or Parquet. Tile geometry is derived on demand from z/x/y. shard is the
+quadkey of the tile's parent at the shard zoom level packed into an integer, so tiles group by quadkey prefix.
+Legacy GeoJSON manifests from slippy_tile_gen can still be read and written.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from nearmap.geospatial.tiles import quadint, quadint_to_tile, tile_to_quadkey, tile_bounds
+
+MANIFEST_DTYPE = np.dtype([('z', 'u1'), ('x', 'u4'), ('y', 'u4'), ('shard', 'u8')])
+manifest_formats = [".npy", ".parquet", ".geojson"]
+
+
+def hilbert_index(x, y, z):
+    """Returns the distance of tiles along the Hilbert curve covering the 2^z by 2^z tile grid"""
+    x = np.array(x, dtype=np.int64)
+    y = np.array(y, dtype=np.int64)
+    n = 1 << int(z)
+    d = np.zeros(np.broadcast(x, y).shape, dtype=np.uint64)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += np.uint64(s) * np.uint64(s) * ((3 * rx.astype(np.uint64)) ^ ry.astype(np.uint64))
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return d
+
+
+tile_orders = ["hilbert", "zorder", "row", None]
+
+
+def tile_order(z, x, y, order="hilbert"):
+    """
+    Returns the indices that sort tiles along a space filling curve so neighbouring tiles are scheduled together.
+    "hilbert" keeps every run of the order spatially compact, "zorder" is quadkey order, "row" is y then x and
+    None keeps the input order.
+    """
+    assert order in tile_orders, f"Error: order {order} not a member of {tile_orders}"
+    z = np.broadcast_to(np.asarray(z, dtype=np.int64), np.shape(x))
+    if order is None:
+        return np.arange(len(z))
+    keys = np.zeros(len(z), dtype=np.uint64)
+    for zoom in np.unique(z):
+        at_zoom = z == zoom
+        if order == "hilbert":
+            keys[at_zoom] = hilbert_index(x[at_zoom], y[at_zoom], zoom)
+        elif order == "zorder":
+            keys[at_zoom] = quadint(x[at_zoom], y[at_zoom], zoom)
+        else:
+            keys[at_zoom] = (np.asarray(y[at_zoom], dtype=np.uint64) << np.uint64(32)) | \
+                            np.asarray(x[at_zoom], dtype=np.uint64)
+    return np.lexsort([keys, z])
+
+
+def sort_manifest(manifest, order="hilbert"):
+    """Returns the manifest ordered along a space filling curve. See tile_order"""
+    if order is None:
+        return manifest
+    return manifest[tile_order(manifest['z'], manifest['x'], manifest['y'], order)]
+
+
+def quadint_to_quadkey(q, z):
+    """Returns the quadkey string of a quadint at zoom z"""
+    x, y = quadint_to_tile(q, z)
+    return str(tile_to_quadkey(x, y, z))
+
+
+def create_manifest(z, x, y, shard_zoom=13):
+    """Returns a manifest structured array for tiles x, y at zoom z grouped into quadkey shards at shard_zoom"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    manifest = np.empty(len(x), dtype=MANIFEST_DTYPE)
+    manifest['z'] = z
+    manifest['x'] = x
+    manifest['y'] = y
+    shift = max(int(z) - shard_zoom, 0)
+    manifest['shard'] = quadint(x >> shift, y >> shift, min(int(z), shard_zoom))
+    return manifest
+
+
+def write_manifest(manifest, out_file, shard_zoom=None):
+    """
+    Writes a manifest to .npy, .parquet or a legacy .geojson of tile boxes. GeoJSON manifests carry the shard as a
+    slippy_tile_gen style "zip_zoom" quadkey string when shard_zoom is given.
+    """
+    out_file = Path(out_file)
+    assert out_file.suffix in manifest_formats, f"Error: manifest {out_file} not a member of {manifest_formats}"
+    if out_file.suffix == ".npy":
+        np.save(out_file, manifest)
+    elif out_file.suffix == ".parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ModuleNotFoundError:
+            print("Parquet manifests require pyarrow: https://arrow.apache.org | Library not detected")
+            exit()
+        table = pa.Table.from_arrays([manifest[name] for name in MANIFEST_DTYPE.names],
+                                     names=list(MANIFEST_DTYPE.names))
+        pq.write_table(table, out_file, compression='zstd')
+    elif out_file.suffix == ".geojson":
+        _write_geojson_manifest(manifest, out_file, shard_zoom)
+    return out_file.as_posix()
+
+
+def write_manifest_from_runs(runs, z, out_file, shard_zoom=13, chunk_size=1000000):
+    """
+    Writes the tile runs of nearmap.geospatial.tilecover to a manifest. .npy manifests are filled chunk by chunk
+    through a memory map so covers larger than memory can be written.
+    """
+    from nearmap.geospatial.tilecover import iter_tile_chunks, tile_count
+
+    out_file = Path(out_file)
+    if out_file.suffix != ".npy":
+        chunks = [create_manifest(z, xs, ys, shard_zoom) for xs, ys in iter_tile_chunks(runs, chunk_size)]
+        manifest = np.concatenate(chunks) if chunks else np.empty(0, dtype=MANIFEST_DTYPE)
+        return write_manifest(manifest, out_file, shard_zoom)
+    manifest = np.lib.format.open_memmap(out_file, mode='w+', dtype=MANIFEST_DTYPE, shape=(tile_count(runs),))
+    offset = 0
+    for xs, ys in iter_tile_chunks(runs, chunk_size):
+        manifest[offset:offset + len(xs)] = create_manifest(z, xs, ys, shard_zoom)
+        offset += len(xs)
+    manifest.flush()
+    del manifest
+    return out_file.as_posix()
+
+
+def read_manifest(in_file, mmap=True):
+    """Reads a .npy, .parquet or legacy slippy_tile_gen .geojson manifest as a manifest structured array"""
+    in_file = Path(in_file)
+    assert in_file.suffix in manifest_formats, f"Error: manifest {in_file} not a member of {manifest_formats}"
+    if in_file.suffix == ".npy":
+        return np.load(in_file, mmap_mode='r' if mmap else None)
+    elif in_file.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ModuleNotFoundError:
+            print("Parquet manifests require pyarrow: https://arrow.apache.org | Library not detected")
+            exit()
+        table = pq.read_table(in_file)
+        manifest = np.empty(table.num_rows, dtype=MANIFEST_DTYPE)
+        for name in MANIFEST_DTYPE.names:
+            manifest[name] = table.column(name).to_numpy()
+        return manifest
+    return _read_geojson_manifest(in_file)
+
+
+def _read_geojson_manifest(in_file):
+    try:
+        from ujson import load
+    except ModuleNotFoundError:
+        from json import load
+    with open(in_file, 'r') as f:
+        features = load(f)['features']
+    manifest = np.empty(len(features), dtype=MANIFEST_DTYPE)
+    for i, feature in enumerate(features):
+        p = feature['properties']
+        shard = int(p['zip_zoom'] or '0', 4) if 'zip_zoom' in p else p.get('shard', 0)
+        manifest[i] = (p['zoom'], p['x'], p['y'], shard)
+    return manifest
+
+
+def _write_geojson_manifest(manifest, out_file, shard_zoom=None, chunk_size=100000):
+    # Legacy GeoJSON of one box per tile, streamed so no geometry objects are built
+    with open(out_file, 'w') as f:
+        f.write('{"type": "FeatureCollection", "crs": {"type": "name", "properties": {"name": '
+                '"urn:ogc:def:crs:OGC:1.3:CRS84"}}, "features": [\n')
+        for start in range(0, len(manifest), chunk_size):
+            m = manifest[start:start + chunk_size]
+            west, north, east, south = tile_bounds(m['x'], m['y'], m['z'])
+            if shard_zoom is None:
+                shards = [f'"shard": {shard}' for shard in m['shard']]
+            else:
+                quadkeys = {shard: quadint_to_quadkey(shard, shard_zoom) for shard in np.unique(m['shard'])}
+                shards = [f'"zip_zoom": "{quadkeys[shard]}"' for shard in m['shard']]
+            lines = []
+            for i in range(len(m)):
+                fid = start + i
+                lines.append(f'{"," if fid else ""}{{"type": "Feature", "properties": {{"id": {fid}, '
+                             f'"x": {m["x"][i]}, "y": {m["y"][i]}, "zoom": {m["z"][i]}, {shards[i]}}}, '
+                             f'"geometry": {{"type": "Polygon", "coordinates": [[[{east[i]}, {south[i]}], '
+                             f'[{east[i]}, {north[i]}], [{west[i]}, {north[i]}], [{west[i]}, {south[i]}], '
+                             f'[{east[i]}, {south[i]}]]]}}}}\n')
+            f.write(''.join(lines))
+        f.write(']}\n')
+    return out_file
+
+
+def manifest_geometries(manifest):
+    """Returns shapely tile boxes (EPSG:4326) for a manifest. Only use on the subset of tiles that needs them"""
+    import shapely
+    west, north, east, south = tile_bounds(manifest['x'], manifest['y'], manifest['z'])
+    return shapely.box(west, south, east, north)
+
+
+def iter_shards(manifest):
+    """Yields (shard, tiles) for each quadkey shard of a manifest"""
+    order = np.argsort(manifest['shard'], kind='stable')
+    shards = manifest['shard'][order]
+    splits = np.flatnonzero(np.diff(shards)) + 1
+    for index in np.split(order, splits):
+        if len(index):
+            yield int(manifest['shard'][index[0]]), manifest[index]
+
+
+def manifest_to_gdf(manifest, to_crs=None):
+    """Returns a GeoDataFrame of tile boxes for a manifest, optionally projected to to_crs"""
+    import geopandas as gpd
+    gdf = gpd.GeoDataFrame({name: manifest[name] for name in MANIFEST_DTYPE.names},
+                           geometry=manifest_geometries(manifest), crs='EPSG:4326')
+    return gdf.to_crs(to_crs) if to_crs else gdf
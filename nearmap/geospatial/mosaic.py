@@ -0,0 +1,162 @@
+####################################
+#   File name: mosaic.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+In-memory mosaicking of slippy tiles. Tiles sit on a regular grid in Web Mercator (EPSG:3857), so each tile is
+decoded straight into its offset of one preallocated (or memory mapped) RGBA array and the array is written once as a
+tiled GeoTIFF or COG. No georeferenced copy of each tile is written and no tile is read twice.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+
+from nearmap.geospatial.tiles import EARTH_CIRCUMFERENCE, tile_to_mercator as mercator_origin
+
+mosaic_drivers = ["GTiff", "COG"]
+
+
+def decode_tile(tile):
+    """Returns a (rows, cols, 4) RGBA uint8 array from a tile path, bytes, file object or array"""
+    if isinstance(tile, np.ndarray):
+        image = tile
+    else:
+        try:
+            from PIL import Image
+        except ModuleNotFoundError:
+            print("Tile mosaicking requires Pillow: https://python-pillow.org | Library not detected")
+            exit()
+        if isinstance(tile, (bytes, bytearray, memoryview)):
+            tile = BytesIO(tile)
+        with Image.open(tile) as im:
+            if im.mode not in ["L", "LA", "RGB", "RGBA"]:
+                im = im.convert("RGBA")
+            image = np.asarray(im)
+    if image.ndim == 2:
+        image = image[:, :, None]
+    bands = image.shape[2]
+    if bands in [1, 2]:
+        # Gray or gray + alpha
+        image = np.concatenate([np.repeat(image[:, :, :1], 3, axis=2), image[:, :, 1:]], axis=2)
+    if image.shape[2] == 3:
+        image = np.concatenate([image, np.full(image.shape[:2] + (1,), 255, dtype=np.uint8)], axis=2)
+    return image
+
+
+class TileMosaic(object):
+    """
+        .. _TileMosaic:
+
+        A band first (4, rows, cols) RGBA array covering the tile block x_min..x_max, y_min..y_max at zoom z.
+        Tiles that are never pasted stay transparent (alpha 0).
+
+        ================    ===============================================================
+        **Argument**        **Description**
+        ----------------    ---------------------------------------------------------------
+        z                   Required integer. The zoom level of the tiles.
+        ----------------    ---------------------------------------------------------------
+        x_min, y_min        Required integers. The top left tile.
+        ----------------    ---------------------------------------------------------------
+        x_max, y_max        Required integers. The bottom right tile (inclusive).
+        ----------------    ---------------------------------------------------------------
+        tile_size           Optional integer. Tile width and height in pixels. Default: 256
+        ----------------    ---------------------------------------------------------------
+        memmap              Optional path to a scratch .npy file. Backs the array with a memory map
+                            for mosaics larger than memory.
+        ================    ===============================================================
+
+        .. code-block:: python
+
+            # Usage Example: Mosaic a manifest's downloaded tiles into a COG
+
+            mosaic = TileMosaic.from_manifest(manifest)
+            mosaic.paste_many((x, y, f"tiles/{x}_{y}_{z}.jpg") for z, x, y in manifest[['z', 'x', 'y']].tolist())
+            mosaic.write("mosaic.tif", driver="COG")
+    """
+
+    def __init__(self, z, x_min, y_min, x_max, y_max, tile_size=256, memmap=None):
+        self.z = int(z)
+        self.x_min, self.y_min, self.x_max, self.y_max = int(x_min), int(y_min), int(x_max), int(y_max)
+        self.tile_size = tile_size
+        shape = (4, (self.y_max - self.y_min + 1) * tile_size, (self.x_max - self.x_min + 1) * tile_size)
+        if memmap:
+            self.array = np.lib.format.open_memmap(memmap, mode='w+', dtype=np.uint8, shape=shape)
+        else:
+            self.array = np.zeros(shape, dtype=np.uint8)
+
+    @classmethod
+    def from_manifest(cls, manifest, tile_size=256, memmap=None):
+        """Returns a mosaic covering the tiles of a manifest from nearmap.geospatial.manifest"""
+        zooms = np.unique(manifest['z'])
+        assert len(zooms) == 1, f"Error: a mosaic holds tiles of one zoom level, manifest has {zooms.tolist()}"
+        return cls(zooms[0], manifest['x'].min(), manifest['y'].min(), manifest['x'].max(), manifest['y'].max(),
+                   tile_size, memmap)
+
+    @property
+    def resolution(self):
+        return EARTH_CIRCUMFERENCE / (2 ** self.z * self.tile_size)
+
+    def geotransform(self):
+        west, north = mercator_origin(self.x_min, self.y_min, self.z)
+        return [west, self.resolution, 0.0, north, 0.0, -self.resolution]
+
+    def paste(self, x, y, tile):
+        """
+        Decodes a tile into its offset of the mosaic. Returns False for tiles outside the mosaic. Raises an
+        AssertionError for a tile that is not tile_size x tile_size pixels
+        """
+        if not (self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max):
+            return False
+        image = decode_tile(tile)
+        rows, cols = image.shape[:2]
+        assert rows == cols == self.tile_size, f"Error: tile {x},{y} is {cols}x{rows} pixels, the mosaic expects " \
+                                               f"{self.tile_size}x{self.tile_size}. Set tile_size to match the " \
+                                               f"tiles (e.g. 512 for @2x tiles)"
+        row = (y - self.y_min) * self.tile_size
+        col = (x - self.x_min) * self.tile_size
+        self.array[:, row:row + rows, col:col + cols] = image.transpose(2, 0, 1)
+        return True
+
+    def paste_many(self, tiles, threads=8):
+        """Pastes an iterable of (x, y, tile) on a thread pool. Tiles do not overlap, so no locking is needed"""
+        with ThreadPoolExecutor(threads) as executor:
+            return sum(executor.map(lambda t: self.paste(*t), tiles))
+
+    def write(self, out_raster, driver="GTiff", compress="DEFLATE", block_size=512, threads="ALL_CPUS"):
+        """
+        Writes the mosaic as a tiled GeoTIFF or COG in EPSG:3857. GDAL reads the array in place through a MEM
+        dataset and writes it block by block, so a memory mapped mosaic is never loaded whole.
+        """
+        assert driver in mosaic_drivers, f"Error: driver {driver} not a member of {mosaic_drivers}"
+        try:
+            from osgeo import gdal, gdal_array, osr
+        except ModuleNotFoundError:
+            print("Writing mosaics requires GDAL: https://gdal.org | Library not detected")
+            exit()
+        gdal.UseExceptions()
+        source = gdal_array.OpenArray(self.array)
+        source.SetGeoTransform(self.geotransform())
+        srs = osr.SpatialReference()
+        srs.ImportFromEPSG(3857)
+        source.SetProjection(srs.ExportToWkt())
+        for band, interpretation in enumerate([gdal.GCI_RedBand, gdal.GCI_GreenBand, gdal.GCI_BlueBand,
+                                               gdal.GCI_AlphaBand], start=1):
+            source.GetRasterBand(band).SetColorInterpretation(interpretation)
+        if driver == "COG":
+            options = [f"BLOCKSIZE={block_size}", f"COMPRESS={compress}", f"NUM_THREADS={threads}",
+                       "BIGTIFF=IF_SAFER"]
+        else:
+            options = ["TILED=YES", f"BLOCKXSIZE={block_size}", f"BLOCKYSIZE={block_size}", f"COMPRESS={compress}",
+                       f"NUM_THREADS={threads}", "BIGTIFF=IF_SAFER"]
+        out = gdal.GetDriverByName(driver).CreateCopy(str(out_raster), source, options=options)
+        out.FlushCache()
+        out = None
+        source = None
+        return out_raster
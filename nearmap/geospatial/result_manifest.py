@@ -0,0 +1,134 @@
+####################################
+#   File name: result_manifest.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Append-only manifests of pipeline results. Records ({'id', 'tile', 'geometry', ...}) are buffered and appended in
+small batches as jobs complete, so memory stays flat and everything flushed before a crash stays readable:
+GeoPackage appends to one layer, Parquet writes one GeoParquet part file per batch into a dataset directory, and
+.geojsonl writes newline delimited GeoJSON features.
+"""
+
+from pathlib import Path
+from time import time
+
+result_manifest_formats = [".gpkg", ".parquet", ".geojsonl"]
+
+
+class StreamingManifest(object):
+    """
+        .. _StreamingManifest:
+
+        ================    ===============================================================
+        **Argument**        **Description**
+        ----------------    ---------------------------------------------------------------
+        out_file            Required path ending in .gpkg, .parquet (written as a directory of
+                            part files) or .geojsonl.
+        ----------------    ---------------------------------------------------------------
+        crs                 Required string. CRS of the record geometries, e.g. "EPSG:2236".
+        ----------------    ---------------------------------------------------------------
+        batch_size          Optional integer. Records buffered before an append. Default: 500
+        ----------------    ---------------------------------------------------------------
+        flush_seconds       Optional float. Longest time a record waits in the buffer. Default: 30
+        ----------------    ---------------------------------------------------------------
+        layer               Optional string. GeoPackage layer name. Default: manifest
+        ================    ===============================================================
+
+        .. code-block:: python
+
+            # Usage Example: Record results as futures complete
+
+            with StreamingManifest("output/manifest.gpkg", crs="EPSG:2236") as manifest:
+                for job in concurrent.futures.as_completed(jobs):
+                    manifest.append(job.result())
+    """
+
+    def __init__(self, out_file, crs, batch_size=500, flush_seconds=30, layer="manifest"):
+        self.out_file = Path(out_file)
+        assert self.out_file.suffix in result_manifest_formats, \
+            f"Error: manifest {out_file} not a member of {result_manifest_formats}"
+        self.crs = crs
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.layer = layer
+        self.count = 0
+        self._records = []
+        self._parts = 0
+        self._last_flush = time()
+        self._started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, record):
+        """Buffers a result record. None results (failed jobs) are skipped"""
+        if record is None:
+            return
+        self._records.append(record)
+        if len(self._records) >= self.batch_size or time() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time()
+        if not self._records:
+            return
+        records, self._records = self._records, []
+        if not self._started:
+            self._start()
+        if self.out_file.suffix == ".geojsonl":
+            self._write_geojsonl(records)
+        else:
+            import geopandas as gpd
+            gdf = gpd.GeoDataFrame(records, geometry="geometry", crs=self.crs)
+            if self.out_file.suffix == ".gpkg":
+                gdf.to_file(self.out_file, layer=self.layer, driver="GPKG", mode="a" if self.count else "w")
+            else:
+                gdf.to_parquet(self.out_file / f"part-{self._parts:05d}.parquet")
+                self._parts += 1
+        self.count += len(records)
+
+    def _start(self):
+        # A new run replaces the manifest of an earlier run
+        self._started = True
+        if self.out_file.suffix == ".parquet":
+            self.out_file.mkdir(parents=True, exist_ok=True)
+            [part.unlink() for part in self.out_file.glob("part-*.parquet")]
+        elif self.out_file.is_file():
+            self.out_file.unlink()
+
+    def _write_geojsonl(self, records):
+        from json import dumps
+        from shapely.geometry import mapping
+        with open(self.out_file, 'a') as f:
+            for record in records:
+                properties = {k: v for k, v in record.items() if k != "geometry"}
+                f.write(dumps({"type": "Feature", "properties": properties,
+                               "geometry": mapping(record["geometry"])}, default=str) + "\n")
+
+    def close(self):
+        self.flush()
+        return self.out_file
+
+
+def read_result_manifest(in_file, layer="manifest", crs=None):
+    """Reads a StreamingManifest (including a partial one left by an interrupted run) as a GeoDataFrame"""
+    import geopandas as gpd
+    in_file = Path(in_file)
+    if in_file.suffix == ".parquet":
+        parts = sorted(in_file.glob("part-*.parquet"))
+        if not parts:
+            return gpd.GeoDataFrame()
+        import pandas as pd
+        return gpd.GeoDataFrame(pd.concat([gpd.read_parquet(p) for p in parts], ignore_index=True))
+    elif in_file.suffix == ".geojsonl":
+        gdf = gpd.read_file(in_file)
+        return gdf.set_crs(crs, allow_override=True) if crs else gdf
+    return gpd.read_file(in_file, layer=layer)
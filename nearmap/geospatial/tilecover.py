@@ -0,0 +1,173 @@
+####################################
+#   File name: tilecover.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Vectorized slippy tile cover. Polygons are scanline rasterized into runs of tiles held as NumPy int arrays of
+(y, x_start, x_end) rather than a Python object per tile, so a county at zoom 21 stays in the tens of megabytes.
+A tile is covered when any part of it intersects the polygon, matching tiletanic.tilecover.cover_geometry on a
+Web Mercator projected geometry.
+"""
+
+import numpy as np
+
+from nearmap.geospatial.tiles import lonlat_to_tile_fraction
+
+
+def _ring_edges(rings, z):
+    edges = []
+    for ring in rings:
+        ring = np.asarray(ring, dtype=np.float64)[:, :2]
+        fx, fy = lonlat_to_tile_fraction(ring[:, 0], ring[:, 1], z)
+        # Close the ring if the input did not repeat its first vertex
+        fx, fy = np.append(fx, fx[0]), np.append(fy, fy[0])
+        edges.append(np.column_stack([fx[:-1], fy[:-1], fx[1:], fy[1:]]))
+    return np.concatenate(edges)
+
+
+def _expand(starts, ends):
+    """Returns (index, value) pairs expanding each inclusive [start, end] integer range"""
+    counts = np.maximum(ends - starts + 1, 0)
+    index = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return index, starts[index] + offsets
+
+
+def _x_at(edges, y):
+    x0, y0, x1, y1 = edges.T
+    dy = y1 - y0
+    t = np.where(dy != 0, (y - y0) / np.where(dy != 0, dy, 1), 0.0)
+    return x0 + t * (x1 - x0)
+
+
+def _edge_runs(edges):
+    # Tiles crossed by the boundary: clip every edge to each tile row it passes through
+    y_min = np.minimum(edges[:, 1], edges[:, 3])
+    y_max = np.maximum(edges[:, 1], edges[:, 3])
+    row_start = np.floor(y_min).astype(np.int64)
+    row_end = np.maximum(np.ceil(y_max).astype(np.int64) - 1, row_start)
+    index, rows = _expand(row_start, row_end)
+    e = edges[index]
+    y_lo = np.maximum(y_min[index], rows)
+    y_hi = np.minimum(y_max[index], rows + 1)
+    xa, xb = _x_at(e, y_lo), _x_at(e, y_hi)
+    horizontal = e[:, 1] == e[:, 3]
+    xa = np.where(horizontal, e[:, 0], xa)
+    xb = np.where(horizontal, e[:, 2], xb)
+    x_start = np.floor(np.minimum(xa, xb)).astype(np.int64)
+    x_end = np.maximum(np.ceil(np.maximum(xa, xb)).astype(np.int64) - 1, x_start)
+    return np.column_stack([rows, x_start, x_end])
+
+
+def _interior_runs(edges):
+    # Tiles inside the polygon: even-odd spans along the centre line of every tile row
+    y_min = np.minimum(edges[:, 1], edges[:, 3])
+    y_max = np.maximum(edges[:, 1], edges[:, 3])
+    row_start = np.ceil(y_min - 0.5).astype(np.int64)
+    row_end = np.ceil(y_max - 0.5).astype(np.int64) - 1
+    index, rows = _expand(row_start, row_end)
+    if len(rows) == 0:
+        return np.empty((0, 3), dtype=np.int64)
+    xs = _x_at(edges[index], rows + 0.5)
+    order = np.lexsort([xs, rows])
+    rows, xs = rows[order], xs[order]
+    x_start = np.floor(xs[0::2]).astype(np.int64)
+    x_end = np.maximum(np.ceil(xs[1::2]).astype(np.int64) - 1, x_start)
+    return np.column_stack([rows[0::2], x_start, x_end])
+
+
+def merge_runs(runs):
+    """Sorts runs by row and x and merges overlapping or adjacent runs, removing duplicate tiles"""
+    runs = np.asarray(runs, dtype=np.int64).reshape(-1, 3)
+    if len(runs) == 0:
+        return runs
+    # Rows and columns are packed into one int64 key so runs can be swept in a single vectorized pass
+    start = (runs[:, 0] << 32) | runs[:, 1]
+    end = (runs[:, 0] << 32) | runs[:, 2]
+    order = np.argsort(start, kind="stable")
+    start, end = start[order], end[order]
+    reach = np.maximum.accumulate(end)
+    new_run = np.ones(len(start), dtype=bool)
+    new_run[1:] = start[1:] > reach[:-1] + 1
+    group = np.cumsum(new_run) - 1
+    merged_start = start[new_run]
+    merged_end = np.zeros(len(merged_start), dtype=np.int64)
+    np.maximum.at(merged_end, group, end)
+    mask = np.int64(0xFFFFFFFF)
+    return np.column_stack([merged_start >> 32, merged_start & mask, merged_end & mask])
+
+
+def cover_polygon(rings, z):
+    """
+    Returns the tile runs (y, x_start, x_end) covering a polygon.
+    rings: list of (N, 2) lon/lat coordinate arrays. The first is the exterior, the rest are holes.
+    """
+    edges = _ring_edges(rings, z)
+    n = 2 ** z
+    runs = np.concatenate([_edge_runs(edges), _interior_runs(edges)])
+    runs[:, 0] = np.clip(runs[:, 0], 0, n - 1)
+    runs[:, 1:] = np.clip(runs[:, 1:], 0, n - 1)
+    return merge_runs(runs)
+
+
+def _polygons(geometry, remove_holes=False):
+    if hasattr(geometry, "__geo_interface__"):
+        geometry = geometry.__geo_interface__
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    elif geometry["type"] == "GeometryCollection":
+        return [p for g in geometry["geometries"] for p in _polygons(g, remove_holes)]
+    else:
+        raise Exception(f"error: tile cover supports Polygon and MultiPolygon geometries, not {geometry['type']}")
+    return [p[:1] if remove_holes else p for p in polygons]
+
+
+def cover_geometry(geometry, z, remove_holes=False):
+    """Returns the merged tile runs covering a GeoJSON-like or shapely Polygon/MultiPolygon in EPSG:4326"""
+    runs = [cover_polygon(polygon, z) for polygon in _polygons(geometry, remove_holes)]
+    return merge_runs(np.concatenate(runs)) if runs else np.empty((0, 3), dtype=np.int64)
+
+
+def cover_geometries(geometries, z, remove_holes=False):
+    """Returns the merged tile runs covering every geometry. Tiles shared by overlapping geometries appear once"""
+    runs = [cover_geometry(g, z, remove_holes) for g in geometries]
+    return merge_runs(np.concatenate(runs)) if runs else np.empty((0, 3), dtype=np.int64)
+
+
+def cover_geojson(in_geojson, z, remove_holes=False):
+    """Returns the merged tile runs covering every feature of a GeoJSON file in EPSG:4326"""
+    try:
+        from ujson import load
+    except ModuleNotFoundError:
+        from json import load
+    with open(in_geojson, 'r') as f:
+        features = load(f)["features"]
+    return cover_geometries([f["geometry"] for f in features if f.get("geometry")], z, remove_holes)
+
+
+def tile_count(runs):
+    return int((runs[:, 2] - runs[:, 1] + 1).sum())
+
+
+def runs_to_tiles(runs):
+    """Expands tile runs into (x, y) int64 arrays"""
+    index, xs = _expand(runs[:, 1], runs[:, 2])
+    return xs, runs[index, 0]
+
+
+def iter_tile_chunks(runs, chunk_size=1000000):
+    """Yields (x, y) arrays of at most about chunk_size tiles so huge covers never materialize at once"""
+    lengths = runs[:, 2] - runs[:, 1] + 1
+    bounds = np.searchsorted(np.cumsum(lengths), np.arange(chunk_size, lengths.sum() + chunk_size, chunk_size))
+    start = 0
+    for end in np.unique(np.minimum(bounds + 1, len(runs))):
+        if end > start:
+            yield runs_to_tiles(runs[start:end])
+            start = end
@@ -0,0 +1,163 @@
+####################################
+#   File name: tiles.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Vectorized slippy tile math. Every function takes scalars or NumPy arrays (broadcast against each other) and
+returns arrays, so millions of coordinates or tiles convert in one call: lat/lon <-> tile, tile <-> lat/lon bounds,
+tile <-> quadkey and tile <-> Web Mercator (EPSG:3857).
+"""
+
+import numpy as np
+
+EARTH_CIRCUMFERENCE = 2 * np.pi * 6378137.0
+MAX_LATITUDE = 85.0511287798066
+
+
+################
+# Lat/Lon
+##############
+
+def lonlat_to_tile_fraction(lon, lat, z):
+    """Returns fractional slippy tile x and y (tile space is linear in Web Mercator) for arrays of lon/lat"""
+    n = 2.0 ** np.asarray(z, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    fx = (lon + 180.0) / 360.0 * n
+    fy = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * n
+    return fx, fy
+
+
+def latlon_to_tile(lat, lon, z):
+    """
+    Returns int64 arrays of the x and y of the tiles containing lat/lon at zoom z. Latitudes beyond the Web Mercator
+    limit and lon 180 fall in the edge tiles.
+    """
+    fx, fy = lonlat_to_tile_fraction(lon, lat, z)
+    last = (2 ** np.asarray(z, dtype=np.int64)) - 1
+    return np.clip(np.floor(fx), 0, last).astype(np.int64), np.clip(np.floor(fy), 0, last).astype(np.int64)
+
+
+def tile_to_latlon(x, y, z):
+    """Returns arrays of the lat and lon of the north west corner of tiles. Fractional x/y give points inside tiles"""
+    n = 2.0 ** np.asarray(z, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n))))
+    return lat, x / n * 360.0 - 180.0
+
+
+def tile_bounds(x, y, z):
+    """Returns arrays of west, north, east, south edges (EPSG:4326) of tiles. Vectorized tile_edges"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    north, west = tile_to_latlon(x, y, z)
+    south, east = tile_to_latlon(x + 1, y + 1, z)
+    return west, north, east, south
+
+
+################
+# Web Mercator
+##############
+
+def lonlat_to_mercator(lon, lat):
+    """Returns arrays of EPSG:3857 x and y for lon/lat. Latitudes are clipped to the Web Mercator limit"""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    radius = EARTH_CIRCUMFERENCE / (2 * np.pi)
+    return np.radians(lon) * radius, np.log(np.tan(np.pi / 4 + lat / 2)) * radius
+
+
+def mercator_to_lonlat(mx, my):
+    """Returns arrays of lon and lat for EPSG:3857 x and y"""
+    radius = EARTH_CIRCUMFERENCE / (2 * np.pi)
+    mx = np.asarray(mx, dtype=np.float64)
+    my = np.asarray(my, dtype=np.float64)
+    return np.degrees(mx / radius), np.degrees(np.arctan(np.sinh(my / radius)))
+
+
+def tile_to_mercator(x, y, z):
+    """Returns the EPSG:3857 west and north edges of tiles x, y at zoom z"""
+    n = 2.0 ** np.asarray(z, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return x / n * EARTH_CIRCUMFERENCE - EARTH_CIRCUMFERENCE / 2, EARTH_CIRCUMFERENCE / 2 - y / n * EARTH_CIRCUMFERENCE
+
+
+def tile_mercator_bounds(x, y, z):
+    """Returns arrays of west, north, east, south edges (EPSG:3857) of tiles"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    west, north = tile_to_mercator(x, y, z)
+    east, south = tile_to_mercator(x + 1, y + 1, z)
+    return west, north, east, south
+
+
+def mercator_to_tile(mx, my, z):
+    """Returns int64 arrays of the x and y of the tiles containing EPSG:3857 points at zoom z"""
+    n = 2 ** np.asarray(z, dtype=np.int64)
+    fx = (np.asarray(mx, dtype=np.float64) + EARTH_CIRCUMFERENCE / 2) / EARTH_CIRCUMFERENCE * n
+    fy = (EARTH_CIRCUMFERENCE / 2 - np.asarray(my, dtype=np.float64)) / EARTH_CIRCUMFERENCE * n
+    return np.clip(np.floor(fx), 0, n - 1).astype(np.int64), np.clip(np.floor(fy), 0, n - 1).astype(np.int64)
+
+
+################
+# Quadkeys
+##############
+
+def quadint(x, y, z):
+    """Returns the quadkey of tiles as integers (base 4 digits of the quadkey) for arrays of x/y at zoom z"""
+    x = np.asarray(x, dtype=np.uint64)
+    y = np.asarray(y, dtype=np.uint64)
+    q = np.zeros(np.broadcast(x, y).shape, dtype=np.uint64)
+    for i in range(int(z)):
+        bit = np.uint64(i)
+        q |= ((x >> bit) & np.uint64(1)) << np.uint64(2 * i)
+        q |= ((y >> bit) & np.uint64(1)) << np.uint64(2 * i + 1)
+    return q
+
+
+def quadint_to_tile(q, z):
+    """Returns uint64 arrays of the x and y of quadints at zoom z. Inverse of quadint"""
+    q = np.asarray(q, dtype=np.uint64)
+    x = np.zeros(q.shape, dtype=np.uint64)
+    y = np.zeros(q.shape, dtype=np.uint64)
+    for i in range(int(z)):
+        x |= ((q >> np.uint64(2 * i)) & np.uint64(1)) << np.uint64(i)
+        y |= ((q >> np.uint64(2 * i + 1)) & np.uint64(1)) << np.uint64(i)
+    return x, y
+
+
+def tile_to_quadkey(x, y, z):
+    """Returns an array of the quadkey strings of tiles x, y at zoom z"""
+    z = int(z)
+    q = quadint(x, y, z)
+    if z == 0:
+        return np.full(q.shape, '')
+    # One ASCII digit per zoom level, most significant first, viewed as fixed width strings
+    shifts = np.arange(2 * (z - 1), -1, -2, dtype=np.uint64)
+    digits = ((q.reshape(-1, 1) >> shifts) & np.uint64(3)).astype(np.uint8) + ord('0')
+    return digits.view(f'S{z}').ravel().astype(str).reshape(q.shape)
+
+
+def quadkey_to_tile(quadkeys):
+    """Returns int64 arrays of the x, y and z of quadkey strings (or an array of them)"""
+    quadkeys = np.atleast_1d(np.asarray(quadkeys, dtype=str))
+    z = np.char.str_len(quadkeys).astype(np.int64)
+    x = np.zeros(quadkeys.shape, dtype=np.int64)
+    y = np.zeros(quadkeys.shape, dtype=np.int64)
+    for zoom in np.unique(z):
+        at_zoom = z == zoom
+        if zoom == 0:
+            continue
+        digits = quadkeys[at_zoom].astype(f'S{zoom}').view(np.uint8).reshape(-1, zoom) - ord('0')
+        assert digits.max() <= 3, "Error: quadkeys must only hold the digits 0-3"
+        weights = 1 << np.arange(zoom - 1, -1, -1, dtype=np.int64)
+        x[at_zoom] = (digits & 1).astype(np.int64) @ weights
+        y[at_zoom] = (digits >> 1).astype(np.int64) @ weights
+    return x, y, z
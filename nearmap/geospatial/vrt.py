@@ -0,0 +1,168 @@
+####################################
+#   File name: vrt.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+GDAL VRTs over a directory of downloaded slippy tiles. The VRT XML is written directly: every tile is a source placed
+at its z/x/y offset of one Web Mercator (EPSG:3857) grid, so the original JPEG/PNG tiles are read in place and no
+georeferenced copy of any tile is made. Large jobs are split into one VRT per quadkey shard plus a parent VRT of the
+shard VRTs.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from nearmap.geospatial.tiles import EARTH_CIRCUMFERENCE, tile_to_mercator
+
+tile_formats = [".jpg", ".png"]
+_color_interps = ["Red", "Green", "Blue", "Alpha"]
+
+# Red, green, blue and alpha sources of a tile as (band, color table component), by PNG IHDR color type. JPEG tiles
+# and unreadable PNGs take their alpha from the GDAL mask. Palette PNGs are expanded through their color table
+_mask_alpha = [(1, None), (2, None), (3, None), ("mask,1", None)]
+_png_bands = {0: [(1, None), (1, None), (1, None), ("mask,1", None)],  # gray
+              2: _mask_alpha,  # RGB
+              3: [(1, 1), (1, 2), (1, 3), (1, 4)],  # palette
+              4: [(1, None), (1, None), (1, None), (2, None)],  # gray + alpha
+              6: [(1, None), (2, None), (3, None), (4, None)]}  # RGBA
+
+
+def tile_file(tile_dir, x, y, z, pattern="{x}_{y}_{z}"):
+    """Returns the path of a downloaded tile (.jpg or .png, as the Tile API chose) or None if it is missing"""
+    name = pattern.format(x=x, y=y, z=z)
+    for suffix in tile_formats:
+        path = Path(tile_dir) / f"{name}{suffix}"
+        if path.is_file():
+            return path
+    return None
+
+
+def tile_bands(path):
+    """Returns the red, green, blue and alpha sources of a tile file from its PNG header (the first 26 bytes)"""
+    path = Path(path)
+    if path.suffix != ".png":
+        return _mask_alpha
+    with open(path, 'rb') as f:
+        header = f.read(26)
+    if len(header) < 26 or header[:8] != b"\x89PNG\r\n\x1a\n":
+        return _mask_alpha
+    return _png_bands.get(header[25], _mask_alpha)
+
+
+def _source_xml(filename, band, x_off, y_off, width, height, block, color_table_component=None):
+    # SourceProperties lets GDAL place a source without opening the file until its pixels are read
+    source = "ComplexSource" if color_table_component else "SimpleSource"
+    return (f'    <{source}>\n'
+            f'      <SourceFilename relativeToVRT="1">{filename}</SourceFilename>\n'
+            f'      <SourceBand>{band}</SourceBand>\n'
+            f'      <SourceProperties RasterXSize="{width}" RasterYSize="{height}" DataType="Byte" '
+            f'BlockXSize="{block[0]}" BlockYSize="{block[1]}"/>\n'
+            f'      <SrcRect xOff="0" yOff="0" xSize="{width}" ySize="{height}"/>\n'
+            f'      <DstRect xOff="{x_off}" yOff="{y_off}" xSize="{width}" ySize="{height}"/>\n'
+            + (f'      <ColorTableComponent>{color_table_component}</ColorTableComponent>\n'
+               if color_table_component else '') +
+            f'    </{source}>\n')
+
+
+def _write_vrt(out_vrt, width, height, geotransform, band_sources):
+    with open(out_vrt, 'w') as f:
+        f.write(f'<VRTDataset rasterXSize="{width}" rasterYSize="{height}">\n'
+                f'  <SRS dataAxisToSRSAxisMapping="1,2">EPSG:3857</SRS>\n'
+                f'  <GeoTransform>{", ".join(repr(float(v)) for v in geotransform)}</GeoTransform>\n')
+        for band, sources in enumerate(band_sources, start=1):
+            f.write(f'  <VRTRasterBand dataType="Byte" band="{band}">\n'
+                    f'    <ColorInterp>{_color_interps[band - 1]}</ColorInterp>\n')
+            f.writelines(sources)
+            f.write('  </VRTRasterBand>\n')
+        f.write('</VRTDataset>\n')
+    return out_vrt
+
+
+def _geotransform(x_min, y_min, z, tile_size):
+    west, north = tile_to_mercator(x_min, y_min, z)
+    resolution = EARTH_CIRCUMFERENCE / (2 ** z * tile_size)
+    return [west, resolution, 0.0, north, 0.0, -resolution]
+
+
+def build_tile_vrt(tiles, z, out_vrt, tile_size=256, extent=None):
+    """
+    Writes a VRT over tiles, an iterable of (x, y, path), at zoom z. JPEG tiles take their alpha from the file mask
+    (opaque). PNG tiles are mapped by the color type in their header (see tile_bands). extent (x_min, y_min, x_max,
+    y_max) fixes the tile block the VRT covers, otherwise it is the extent of tiles. Returns out_vrt or None when
+    there are no tiles.
+    """
+    tiles = [(int(x), int(y), Path(path)) for x, y, path in tiles]
+    if not tiles:
+        return None
+    out_vrt = Path(out_vrt)
+    if extent is None:
+        xs = np.array([t[0] for t in tiles])
+        ys = np.array([t[1] for t in tiles])
+        extent = (xs.min(), ys.min(), xs.max(), ys.max())
+    x_min, y_min, x_max, y_max = (int(v) for v in extent)
+    width = (x_max - x_min + 1) * tile_size
+    height = (y_max - y_min + 1) * tile_size
+    band_sources = [[], [], [], []]
+    for x, y, path in tiles:
+        filename = Path(os.path.relpath(path, out_vrt.parent)).as_posix()
+        x_off, y_off = (x - x_min) * tile_size, (y - y_min) * tile_size
+        for (band, component), sources in zip(tile_bands(path), band_sources):
+            sources.append(_source_xml(filename, band, x_off, y_off, tile_size, tile_size, (tile_size, 1), component))
+    return _write_vrt(out_vrt, width, height, _geotransform(x_min, y_min, z, tile_size), band_sources)
+
+
+def build_manifest_vrt(manifest, tile_dir, out_vrt, tile_size=256, pattern="{x}_{y}_{z}"):
+    """Writes a VRT over the downloaded tiles of a manifest found in tile_dir. Missing tiles are left transparent"""
+    zooms = np.unique(manifest['z'])
+    assert len(zooms) == 1, f"Error: a VRT holds tiles of one zoom level, manifest has {zooms.tolist()}"
+    z = int(zooms[0])
+    tiles = ((x, y, tile_file(tile_dir, x, y, z, pattern)) for x, y in zip(manifest['x'].tolist(),
+                                                                           manifest['y'].tolist()))
+    extent = (manifest['x'].min(), manifest['y'].min(), manifest['x'].max(), manifest['y'].max())
+    return build_tile_vrt(((x, y, path) for x, y, path in tiles if path is not None), z, out_vrt, tile_size, extent)
+
+
+def build_shard_vrts(manifest, tile_dir, out_dir, shard_zoom=13, tile_size=256, pattern="{x}_{y}_{z}",
+                     shard_dirs=False):
+    """
+    Writes one VRT per quadkey shard of a manifest to out_dir/{quadkey}.vrt and a parent out_dir/tiles.vrt that
+    references the shard VRTs. shard_dirs reads tiles from tile_dir/{quadkey}/, the layout of dev/shard_runner.py.
+    Returns the parent VRT.
+    """
+    from nearmap.geospatial.manifest import iter_shards, quadint_to_quadkey
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    zooms = np.unique(manifest['z'])
+    assert len(zooms) == 1, f"Error: a VRT holds tiles of one zoom level, manifest has {zooms.tolist()}"
+    z = int(zooms[0])
+    shard_level = min(z, shard_zoom)
+    shard_vrts = []
+    for shard, tiles in iter_shards(manifest):
+        quadkey = quadint_to_quadkey(shard, shard_level)
+        folder = Path(tile_dir) / quadkey if shard_dirs else tile_dir
+        vrt = build_manifest_vrt(tiles, folder, out_dir / f"{quadkey}.vrt", tile_size, pattern)
+        if vrt is not None:
+            shard_vrts.append((int(tiles['x'].min()), int(tiles['y'].min()), int(tiles['x'].max()),
+                               int(tiles['y'].max()), vrt))
+    if not shard_vrts:
+        return None
+    x_min = min(s[0] for s in shard_vrts)
+    y_min = min(s[1] for s in shard_vrts)
+    width = (max(s[2] for s in shard_vrts) - x_min + 1) * tile_size
+    height = (max(s[3] for s in shard_vrts) - y_min + 1) * tile_size
+    band_sources = [[], [], [], []]
+    for sx_min, sy_min, sx_max, sy_max, vrt in shard_vrts:
+        filename = Path(os.path.relpath(vrt, out_dir)).as_posix()
+        shard_width, shard_height = (sx_max - sx_min + 1) * tile_size, (sy_max - sy_min + 1) * tile_size
+        x_off, y_off = (sx_min - x_min) * tile_size, (sy_min - y_min) * tile_size
+        for band, sources in enumerate(band_sources, start=1):
+            sources.append(_source_xml(filename, band, x_off, y_off, shard_width, shard_height, (128, 128)))
+    return _write_vrt(out_dir / "tiles.vrt", width, height, _geotransform(x_min, y_min, z, tile_size), band_sources)
@@ -0,0 +1,105 @@
+####################################
+#   File name: warp.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Tuned gdal.Warp profiles for reprojecting imagery across a process pool. A profile sizes the per process GDAL block
+cache and warp working memory so processes x (cache + warp memory) stays within a fraction of RAM, spreads the
+remaining cores over multithreaded warping and writes tiled, compressed GeoTIFFs.
+"""
+
+from contextlib import contextmanager
+from os import cpu_count
+
+warp_profiles = ["tuned", None]
+
+
+def system_memory():
+    """Returns physical memory in bytes (psutil, then sysconf, 8 GB when it cannot be detected)"""
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        pass
+    try:
+        # os.sysconf does not exist on Windows
+        from os import sysconf
+        return sysconf('SC_PAGE_SIZE') * sysconf('SC_PHYS_PAGES')
+    except (ImportError, ValueError, OSError, AttributeError):
+        return 8 * 1024 ** 3
+
+
+def warp_profile(processes=None, memory_fraction=0.5, compress="DEFLATE", block_size=512):
+    """
+    Returns a tuned warp profile for a pool of processes.
+    memory_fraction: share of RAM the pool may use, split evenly between processes. Half of each process' share is
+    GDAL_CACHEMAX (source block cache) and a quarter is warp working memory.
+    """
+    cores = cpu_count() or 1
+    processes = processes or cores
+    budget_mb = system_memory() * memory_fraction / processes / 1024 ** 2
+    threads = max(1, cores // processes)
+    return {'multithread': True,
+            'warp_threads': threads,
+            'warp_memory_mb': max(64, int(budget_mb * 0.25)),
+            'cache_max_mb': max(64, int(budget_mb * 0.5)),
+            'creation_options': {'GTiff': ["TILED=YES", f"BLOCKXSIZE={block_size}", f"BLOCKYSIZE={block_size}",
+                                           f"COMPRESS={compress}", f"NUM_THREADS={threads}", "BIGTIFF=IF_SAFER"]}}
+
+
+def resolve_warp_profile(profile, processes=None):
+    """Returns a profile dict for "tuned", None (GDAL defaults) or a profile dict"""
+    if isinstance(profile, dict) or profile is None:
+        return profile
+    assert profile in warp_profiles, f"Error: warp_profile {profile} not a member of {warp_profiles}"
+    return warp_profile(processes)
+
+
+def configure_gdal(profile):
+    """
+    Applies a profile's process wide GDAL configuration. Call once per process before opening datasets. Returns the
+    previous values of the options it set, for restore_gdal
+    """
+    from osgeo import gdal
+    if not profile:
+        return dict()
+    options = {"GDAL_CACHEMAX": str(profile['cache_max_mb']),
+               "GDAL_NUM_THREADS": str(profile['warp_threads']),
+               # Tile directories hold many files, skip listing them every time a source is opened
+               "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR"}
+    previous = {name: gdal.GetConfigOption(name) for name in options}
+    for name, value in options.items():
+        gdal.SetConfigOption(name, value)
+    return previous
+
+
+def restore_gdal(previous):
+    """Restores GDAL configuration options returned by configure_gdal (None unsets an option)"""
+    from osgeo import gdal
+    for name, value in previous.items():
+        gdal.SetConfigOption(name, value)
+
+
+@contextmanager
+def gdal_config(profile):
+    """Applies a profile's GDAL configuration for the duration of a with block and restores the previous values"""
+    previous = configure_gdal(profile)
+    try:
+        yield profile
+    finally:
+        restore_gdal(previous)
+
+
+def warp_kwargs(profile, gdal_format="GTiff"):
+    """Returns the gdal.WarpOptions keyword arguments of a profile"""
+    if not profile:
+        return dict()
+    return {'multithread': profile['multithread'],
+            'warpMemoryLimit': profile['warp_memory_mb'],
+            'warpOptions': [f"NUM_THREADS={profile['warp_threads']}"],
+            'creationOptions': profile['creation_options'].get(gdal_format)}
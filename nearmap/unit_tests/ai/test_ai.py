@@ -32,4 +32,10 @@ def test_aiPacks():
     assert nearmap.aiPacksV4("pandas").empty is False, "Error: empty pandas dataframe object returned"
     assert nearmap.aiPacksV4("text") is not None, "Error: empty text object returned"
 
+
+def test_aiFeaturesByPack():
+    available_packs = [i['code'] for i in nearmap.aiPacksV4("json")["packs"]]
+    ai_features = nearmap.aiFeaturesByPackV4(polygon, since, until, available_packs)
+    assert set(ai_features.keys()) == set(available_packs), "Error: AI Pack partitions missing from response"
+
 # TODO: Implement test for all other output formats
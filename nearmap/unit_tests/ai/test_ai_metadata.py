@@ -0,0 +1,84 @@
+from os import utime
+from tempfile import TemporaryDirectory
+from time import time
+
+import pytest
+
+import nearmap._api
+from nearmap._ai_metadata import AIMetadata
+
+#####################
+# AI Metadata Inputs
+##################
+
+packs = {"packs": [{"code": "building", "featureClasses": [{"id": "b1", "description": "Building"}]},
+                   {"code": "roof", "featureClasses": [{"id": "b1", "description": "Building"},
+                                                       {"id": "r1", "description": "Roof"}]}]}
+classes = {"classes": [{"id": "r1", "description": "Roof"}, {"id": "t1", "description": "Tree"}]}
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+    responses = {"packs": [packs], "classes": [classes]}
+
+    def stub(name):
+        def fetch(base_url, api_key, out_format="json"):
+            calls.append(name)
+            return responses[name].pop(0) if len(responses[name]) > 1 else responses[name][0]
+        return fetch
+
+    monkeypatch.setattr(nearmap._api, "aiPacksV4", stub("packs"))
+    monkeypatch.setattr(nearmap._api, "aiClassesV4", stub("classes"))
+    return calls, responses
+
+
+def test_lookups(fetches):
+    metadata = AIMetadata("https://api.nearmap.com/", "key", cache_dir=False)
+    assert metadata.pack_codes == ["building", "roof"]
+    assert metadata.class_ids == ["r1", "t1", "b1"]
+    assert metadata.packs_for_class("b1") == ["building", "roof"]
+    assert metadata.packs_for_class("t1") == []
+    assert metadata.class_to_packs(["roof"]) == {"b1": ["roof"], "r1": ["roof"]}
+    assert metadata.class_description("b1") == "Building" and metadata.class_id("Tree") == "t1"
+    assert metadata.class_code("t1") == 1 and metadata.class_code("missing") == -1
+    assert metadata.class_id_from_code(2) == "b1"
+    # Callers may mutate what they are given without corrupting the index
+    metadata.class_to_packs()["b1"].append("other")
+    metadata.packs_for_class("b1").append("other")
+    assert metadata.packs_for_class("b1") == ["building", "roof"]
+    pd = pytest.importorskip("pandas")
+    assert list(metadata.as_categorical(pd.Series(["b1", "r1", "missing"])).codes) == [2, 0, -1]
+    assert fetches[0] == ["packs", "classes"]
+
+
+def test_cache_and_ttl(fetches):
+    calls = fetches[0]
+    with TemporaryDirectory() as tmp:
+        AIMetadata("https://api.nearmap.com/", "key", cache_dir=tmp).refresh()
+        metadata = AIMetadata("https://api.nearmap.com/", "key", cache_dir=tmp, ttl=60).refresh()
+        assert calls == ["packs", "classes"]
+        assert metadata.packs == packs
+        # Expired catalogs are downloaded again
+        cache_file = metadata._cache_file("packs")
+        utime(cache_file, (time() - 120, time() - 120))
+        metadata.refresh()
+        assert calls == ["packs", "classes", "packs"]
+        metadata.refresh(force=True)
+        assert calls == ["packs", "classes", "packs", "packs", "classes"]
+        # Another API Key has its own cache
+        AIMetadata("https://api.nearmap.com/", "other", cache_dir=tmp).refresh()
+        assert len(calls) == 7
+
+
+def test_error_response_not_cached(fetches):
+    calls, responses = fetches
+    responses["packs"].insert(0, {"error": "rate limited"})
+    with TemporaryDirectory() as tmp:
+        metadata = AIMetadata("https://api.nearmap.com/", "key", cache_dir=tmp)
+        metadata.refresh()
+        assert not metadata._cache_file("packs").is_file()
+        # The next lookup fetches again rather than serving the error
+        assert metadata.pack_codes == ["building", "roof"]
+        assert calls.count("packs") == 2
+        assert metadata._cache_file("packs").is_file()
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("ijson")
+
+from requests import HTTPError
+
+from nearmap._api import aiFeaturesV4
+from nearmap.unit_tests.mock_api import MockNearmapServer
+
+#####################
+# AI Stream Inputs
+##################
+
+polygon = [-87.731, 41.7908, -87.7305, 41.7908, -87.7305, 41.7905, -87.731, 41.7905, -87.731, 41.7908]
+
+
+def test_stream_matches_json():
+    with MockNearmapServer(features_per_request=7) as server:
+        features = aiFeaturesV4(server.base_url, "key", polygon, out_format="stream")
+        assert not isinstance(features, list)
+        streamed = list(features)
+        payload = aiFeaturesV4(server.base_url, "key", polygon, out_format="json")
+    assert len(streamed) == 7
+    assert streamed == payload["features"]
+
+
+def test_stream_error_response():
+    with MockNearmapServer(error_rate_5xx=1.0) as server:
+        with pytest.raises(HTTPError):
+            list(aiFeaturesV4(server.base_url, "key", polygon, out_format="stream"))
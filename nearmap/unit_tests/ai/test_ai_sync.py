@@ -0,0 +1,117 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+import nearmap._api
+from nearmap._ai_sync import AISyncIndex, get_cells, sync_ai, _cell_id
+
+#####################
+# AI Sync Inputs
+##################
+
+base_url = "https://api.nearmap.com/"
+cells = {"parcel_1": [-90.2, 38.6, -90.19, 38.6, -90.19, 38.61, -90.2, 38.6],
+         "parcel_2": [-90.1, 38.6, -90.09, 38.6, -90.09, 38.61, -90.1, 38.6]}
+
+
+def _survey(capture_date, ai=True, system_version=None):
+    resources = {"tiles": [{"id": "tiles", "type": "Vert"}]}
+    if ai:
+        resources["aifeatures"] = [{"id": f"ai-{capture_date}", "type": "AI"}]
+        if system_version:
+            resources["aifeatures"][0]["properties"] = {"systemVersion": system_version}
+    return {"id": capture_date, "captureDate": capture_date, "resources": resources}
+
+
+class StubAPI(object):
+    """Serves pointV2 pages from a newest first survey list and counts the aiFeaturesV4 downloads"""
+
+    def __init__(self, monkeypatch, surveys):
+        self.surveys = surveys
+        self.point_requests = []
+        self.downloads = []
+        monkeypatch.setattr(nearmap._api, "pointV2", self.pointV2)
+        monkeypatch.setattr(nearmap._api, "aiFeaturesV4", self.aiFeaturesV4)
+
+    def pointV2(self, base_url, api_key, point, since=None, until=None, limit=20, offset=None, fields=None,
+                sort=None, lat_lon_direction="yx", **kwargs):
+        assert sort == "-captureDate"
+        self.point_requests.append((offset or 0, lat_lon_direction))
+        offset = offset or 0
+        return {"surveys": self.surveys[offset:offset + limit]}
+
+    def aiFeaturesV4(self, base_url, api_key, polygon, since=None, until=None, packs=None, out_format="json",
+                     lat_lon_direction="yx", **kwargs):
+        self.downloads.append(polygon)
+        latest = [s for s in self.surveys if "aifeatures" in s["resources"]][0]
+        system_version = _survey_version(latest) or "gen5"
+        return {"systemVersion": system_version, "features": [{"surveyDate": latest["captureDate"]}]}
+
+
+def _survey_version(survey):
+    return (survey["resources"]["aifeatures"][0].get("properties") or {}).get("systemVersion")
+
+
+def test_index_round_trip():
+    with TemporaryDirectory() as tmp:
+        index = AISyncIndex(Path(tmp) / "state" / "index.sqlite")
+        assert index.get("a") is None
+        index.mark_checked("a")
+        assert index.get("a") == {'survey_date': None, 'system_version': None}
+        index.upsert("a", "2022-01-01", "gen5", "a.json")
+        index.close()
+        assert AISyncIndex(Path(tmp) / "state" / "index.sqlite").get("a") == {'survey_date': "2022-01-01",
+                                                                             'system_version': "gen5"}
+
+
+def test_get_cells():
+    assert get_cells(cells) is cells
+    pytest.importorskip("shapely")
+    pytest.importorskip("pandas")
+    ring = [(-90.2, 38.6), (-90.194, 38.6), (-90.194, 38.606), (-90.2, 38.606), (-90.2, 38.6)]
+    grid_cells = get_cells(ring)
+    assert len(grid_cells) > 1
+    assert all(_cell_id(cell) == cell_id for cell_id, cell in grid_cells.items())
+
+
+def test_new_and_same_survey(monkeypatch):
+    api = StubAPI(monkeypatch, [_survey("2022-01-01")])
+    with TemporaryDirectory() as tmp:
+        results = sync_ai(base_url, "key", cells, tmp, lat_lon_direction="xy")
+        assert results['updated'] == ["parcel_1", "parcel_2"] and len(api.downloads) == 2
+        assert (Path(tmp) / "cells" / "parcel_1.json").is_file()
+        assert all(direction == "xy" for offset, direction in api.point_requests)
+        # Nothing flown since the last sync
+        results = sync_ai(base_url, "key", cells, tmp)
+        assert results['unchanged'] == ["parcel_1", "parcel_2"] and len(api.downloads) == 2
+        # A newer survey is flown
+        api.surveys.insert(0, _survey("2023-06-01"))
+        results = sync_ai(base_url, "key", cells, tmp)
+        assert results['updated'] == ["parcel_1", "parcel_2"] and len(api.downloads) == 4
+
+
+def test_reprocessed_survey(monkeypatch):
+    api = StubAPI(monkeypatch, [_survey("2022-01-01", system_version="gen5")])
+    with TemporaryDirectory() as tmp:
+        sync_ai(base_url, "key", cells, tmp)
+        assert sync_ai(base_url, "key", cells, tmp)['unchanged'] == ["parcel_1", "parcel_2"]
+        api.surveys[0] = _survey("2022-01-01", system_version="gen6")
+        assert sync_ai(base_url, "key", cells, tmp)['updated'] == ["parcel_1", "parcel_2"]
+        assert len(api.downloads) == 4
+
+
+def test_more_than_one_page_of_surveys(monkeypatch):
+    # The only AI enabled survey is older than the first page of 20 surveys
+    surveys = [_survey(f"2023-01-{day:02d}", ai=False) for day in range(25, 0, -1)] + [_survey("2022-01-01")]
+    api = StubAPI(monkeypatch, surveys)
+    with TemporaryDirectory() as tmp:
+        results = sync_ai(base_url, "key", {"parcel_1": cells["parcel_1"]}, tmp)
+        assert results['updated'] == ["parcel_1"]
+        assert [offset for offset, direction in api.point_requests] == [0, 20]
+        # No AI enabled survey at all
+        api.surveys = surveys[:25]
+        api.point_requests.clear()
+        results = sync_ai(base_url, "key", {"parcel_3": cells["parcel_2"]}, tmp)
+        assert results['unchanged'] == ["parcel_3"]
+        assert [offset for offset, direction in api.point_requests] == [0, 20]
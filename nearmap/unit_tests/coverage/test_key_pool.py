@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from nearmap import NEARMAP
+from nearmap.unit_tests.mock_api import MockNearmapServer
+
+########################
+# Key Pool Inputs
+#####################
+
+api_keys = ["mock_key_1", "mock_key_2", "mock_key_3"]
+rate_limit = 5  # requests per key per window
+point = "-90.1,38.6"
+
+
+def test_key_pool_scales_with_keys():
+    with MockNearmapServer(rate_limit=rate_limit, rate_limit_window=60) as server:
+        nearmap = NEARMAP(api_keys)
+        nearmap.base_url = server.base_url
+        results = [nearmap.pointV2(point) for i in range(rate_limit * len(api_keys))]
+    assert all(r.get("surveys") for r in results), "Error: pooled requests were throttled before quota was spent"
+    assert all(s['requests'] == rate_limit for s in nearmap.key_pool.stats().values())
+
+
+def test_key_pool_fails_over_throttled_key():
+    with MockNearmapServer(rate_limit=rate_limit, rate_limit_window=60) as server:
+        single = NEARMAP(api_keys[0])
+        single.base_url = server.base_url
+        [single.pointV2(point) for i in range(rate_limit)]  # spend the first key's quota outside the pool
+        nearmap = NEARMAP(api_keys)
+        nearmap.base_url = server.base_url
+        results = [nearmap.pointV2(point) for i in range(rate_limit * 2)]
+    assert all(r.get("surveys") for r in results), "Error: throttled key did not fail over"
+
+
+def test_key_pool_registry():
+    from gc import collect
+    from nearmap._key_pool import APIKeyPool, pool_for_url, resolve_api_key
+
+    nearmap = NEARMAP(APIKeyPool(api_keys))
+    token = nearmap.api_key
+    url = f"https://api.nearmap.com/coverage/v2/point/{point}?apikey={token}&limit=20"
+    assert pool_for_url(url) is nearmap.key_pool
+    assert resolve_api_key(token) in api_keys
+    # Pools are released with their NEARMAP instance, or explicitly with close()
+    del nearmap
+    collect()
+    assert pool_for_url(url) is None and resolve_api_key(token) == token
+    with APIKeyPool(api_keys) as pool:
+        assert pool_for_url(url.replace(token, pool.token)) is pool
+    assert pool_for_url(url.replace(token, pool.token)) is None
+
+
+def test_key_pools_over_the_same_keys():
+    from nearmap._key_pool import APIKeyPool, pool_for_url
+
+    first, second = APIKeyPool(api_keys), APIKeyPool(api_keys)
+    assert first.token != second.token
+    url = "https://api.nearmap.com/coverage/v2/point/{point}?apikey={token}&limit=20"
+    second.close()
+    # Closing one pool leaves the other routed
+    assert pool_for_url(url.format(point=point, token=first.token)) is first
+    assert pool_for_url(url.format(point=point, token=second.token)) is None
+    # Tile cache keys follow the key set, not the pool
+    from nearmap._tile_store import _TileKeys
+    tile = "https://api.nearmap.com/tiles/v3/Vert/21/1/2.jpg?apikey={token}"
+    with APIKeyPool(list(reversed(api_keys))) as third:
+        assert _TileKeys().key_for_url(tile.format(token=first.token)) == \
+               _TileKeys().key_for_url(tile.format(token=third.token))
+    first.close()
+
+
+def test_api_key_types():
+    assert NEARMAP("mock_key").key_pool is None
+    assert len(NEARMAP(tuple(api_keys)).key_pool) == len(api_keys)
+    with pytest.raises(Exception):
+        NEARMAP(42)
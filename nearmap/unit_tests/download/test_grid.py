@@ -0,0 +1,124 @@
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+shapely = pytest.importorskip("shapely")
+pytest.importorskip("pandas")
+
+from shapely.geometry import Polygon
+from shapely.ops import unary_union
+
+from nearmap._download_lib import get_coords, iter_coords, create_grid, grid_to_slippy_grid, create_slippy_grid, \
+    grid_features
+
+#####################
+# Grid Inputs
+##################
+
+
+def _square(lon, lat, size=0.006):
+    return [(lon, lat), (lon + size, lat), (lon + size, lat + size), (lon, lat + size), (lon, lat)]
+
+
+squares = [_square(-90.2, 38.6), _square(-90.197, 38.603), _square(-90.18, 38.59, 0.002)]
+
+
+def test_single_polygon_grid_unchanged():
+    grid = create_slippy_grid(squares[0])
+    expected = grid_to_slippy_grid(squares[0], create_grid(squares[0]))
+    assert grid['tile'].tolist() == expected['tile'].tolist()
+    assert grid['slippy_grid'].tolist() == expected['slippy_grid'].tolist()
+
+
+def test_multi_polygon_grid_dedups_shared_cells():
+    grid = grid_features(squares, max_workers=2)
+    assert grid['tile_id'].is_unique
+    assert grid['tile_number'].tolist() == list(range(len(grid)))
+    separate = sum(len(grid_features([square], max_workers=1)) for square in squares)
+    assert len(grid) < separate
+    # Cells cover every polygon exactly once
+    area = unary_union([Polygon(square) for square in squares]).area
+    assert sum(geometry.area for geometry in grid['geometry']) == pytest.approx(area)
+    assert not any(geometry.is_empty for geometry in grid['geometry'])
+    for tile, geometry in zip(grid['tile'], grid['geometry']):
+        assert tile.buffer(1e-9).contains(geometry)
+
+
+def test_multi_feature_geojson():
+    features = [{"type": "Feature", "properties": {}, "geometry": {"type": "Polygon", "coordinates": [square]}}
+                for square in squares[:2]]
+    features.append({"type": "Feature", "properties": {},
+                     "geometry": {"type": "MultiPolygon", "coordinates": [[squares[2]]]}})
+    with TemporaryDirectory() as tmp:
+        in_json = Path(tmp) / "aoi.geojson"
+        with open(in_json, 'w') as f:
+            dump({"type": "FeatureCollection", "features": features}, f)
+        coords = get_coords(str(in_json))
+        assert coords == squares
+        assert len(create_slippy_grid(coords, max_workers=2)) == len(grid_features(squares, max_workers=1))
+        with open(in_json, 'w') as f:
+            dump({"type": "FeatureCollection", "features": features[:1]}, f)
+        assert get_coords(str(in_json)) == squares[0]
+
+
+def test_iterable_polygons_are_gridded():
+    read = []
+
+    def polygons():
+        for square in squares:
+            read.append(square)
+            yield square
+
+    grid = create_slippy_grid(polygons())
+    assert read == squares and grid['tile_id'].is_unique
+    area = unary_union([Polygon(square) for square in squares]).area
+    assert sum(geometry.area for geometry in grid['geometry']) == pytest.approx(area)
+    # A single polygon read from an iterator keeps the single polygon grid
+    single = create_slippy_grid(iter_coords([squares[0]]))
+    assert single['tile'].tolist() == create_slippy_grid(squares[0])['tile'].tolist()
+
+
+def test_inline_grid_matches_pool():
+    inline = grid_features(squares)
+    pooled = grid_features(squares, max_workers=2)
+    assert inline['tile_id'].tolist() == pooled['tile_id'].tolist()
+    assert [g.area for g in inline['geometry']] == pytest.approx([g.area for g in pooled['geometry']])
+
+
+def test_single_feature_esri_json():
+    esri = {"spatialReference": {"wkid": 4326},
+            "features": [{"attributes": {}, "geometry": {"rings": [[list(coord) for coord in squares[0]]]}}]}
+    with TemporaryDirectory() as tmp:
+        in_json = Path(tmp) / "aoi.json"
+        with open(in_json, 'w') as f:
+            dump(esri, f)
+        coords = get_coords(str(in_json))
+    # One feature comes back as a list holding its ring and is gridded as a single polygon
+    assert coords == [squares[0]]
+    grid = create_slippy_grid(coords)
+    expected = create_slippy_grid(squares[0])
+    assert grid['tile'].tolist() == expected['tile'].tolist()
+    assert grid['slippy_grid'].tolist() == expected['slippy_grid'].tolist()
+    assert create_slippy_grid(iter_coords(coords))['tile'].tolist() == expected['tile'].tolist()
+
+
+def test_multi_feature_gpkg_and_shp():
+    gpd = pytest.importorskip("geopandas")
+    pytest.importorskip("pyogrio")
+    from shapely.geometry import MultiPolygon
+    geometries = [Polygon(squares[0]), Polygon(squares[1]), MultiPolygon([Polygon(squares[2])])]
+    gdf = gpd.GeoDataFrame({'name': ["a", "b", "c"]}, geometry=geometries, crs="EPSG:4326")
+    with TemporaryDirectory() as tmp:
+        gpkg = Path(tmp) / "aoi.gpkg"
+        gdf.to_file(gpkg, layer="aoi", driver="GPKG")
+        gdf.iloc[:1].to_file(gpkg, layer="first", driver="GPKG")
+        gdf.to_file(Path(tmp) / "aoi.shp")
+        coords = get_coords(str(gpkg))
+        assert get_coords(f"{gpkg}/first") == [squares[0]]
+        shp = get_coords(str(Path(tmp) / "aoi.shp"))
+    assert coords == squares
+    assert create_slippy_grid(coords)['tile_id'].tolist() == grid_features(squares)['tile_id'].tolist()
+    # Shapefiles store exterior rings clockwise
+    assert [set(ring) for ring in shp] == [set(square) for square in squares]
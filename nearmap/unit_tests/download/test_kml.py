@@ -0,0 +1,67 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from zipfile import ZipFile
+
+import pytest
+
+from nearmap._download_lib import get_kml_coords, iter_kml_coords, get_coords, iter_coords, create_slippy_grid
+
+root = str(Path(__file__).parents[2]).replace('\\', '/')  # Get root of project
+
+#####################
+# KML Inputs
+##################
+
+kml = """<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>
+  <Placemark><Polygon>
+    <outerBoundaryIs><LinearRing><coordinates>
+      -90.2,38.6,10 -90.19,38.6,0 -90.19,38.61,100.5
+      -90.2,38.61,0 -90.2,38.6,10
+    </coordinates></LinearRing></outerBoundaryIs>
+    <innerBoundaryIs><LinearRing><coordinates>-90.199,38.601 -90.198,38.601 -90.198,38.602 -90.199,38.601</coordinates></LinearRing></innerBoundaryIs>
+  </Polygon></Placemark>
+  <Placemark><Polygon><outerBoundaryIs><LinearRing><coordinates>10.5,20,0 10.6,20,0 10.6,20.1,0 10.5,20,0</coordinates></LinearRing></outerBoundaryIs></Polygon></Placemark>
+  <Placemark><Point><coordinates>-90.195,38.605,0</coordinates></Point></Placemark>
+  <Placemark><LineString><coordinates>-90.2,38.6 -90.19,38.61</coordinates></LineString></Placemark>
+</Folder></Document></kml>
+"""
+
+
+def test_kml_coordinates_altitude_and_holes():
+    with TemporaryDirectory() as tmp:
+        kml_file = Path(tmp) / "aoi.kml"
+        kml_file.write_text(kml)
+        coords = get_kml_coords(str(kml_file))
+        # Altitudes such as "10 " no longer corrupt the coordinates, holes, pins and lines are not returned as polygons
+        assert coords == [[(-90.2, 38.6), (-90.19, 38.6), (-90.19, 38.61), (-90.2, 38.61), (-90.2, 38.6)],
+                          [(10.5, 20.0), (10.6, 20.0), (10.6, 20.1), (10.5, 20.0)]]
+        kmz_file = Path(tmp) / "aoi.kmz"
+        with ZipFile(kmz_file, 'w') as kmz:
+            kmz.writestr("doc.kml", kml)
+        polygons = iter_kml_coords(str(kmz_file))
+        assert next(polygons) == coords[0]
+        assert list(polygons) == coords[1:]
+        assert get_coords(str(kmz_file)) == coords
+        assert list(iter_coords(str(kmz_file))) == coords
+
+
+def test_kml_streams_into_grid():
+    shapely = pytest.importorskip("shapely")
+    pytest.importorskip("pandas")
+    with TemporaryDirectory() as tmp:
+        kml_file = Path(tmp) / "aoi.kml"
+        kml_file.write_text(kml)
+        polygons = iter_coords(str(kml_file))
+        assert not isinstance(polygons, list)
+        grid = create_slippy_grid(polygons)
+        area = sum(shapely.geometry.Polygon(ring).area for ring in get_kml_coords(str(kml_file)))
+    assert grid['tile_id'].is_unique
+    assert sum(geometry.area for geometry in grid['geometry']) == pytest.approx(area)
+
+
+def test_kml_test_data():
+    kml_coords = get_kml_coords(f"{root}/unit_tests/TestData/Vector/KML/doc.kml")
+    assert kml_coords == get_kml_coords(f"{root}/unit_tests/TestData/Vector/KMZ/AOI.kmz")
+    assert len(kml_coords) == 1 and len(kml_coords[0]) == 13
+    assert kml_coords[0][0] == (-81.80179239899996, 26.10974785200005)
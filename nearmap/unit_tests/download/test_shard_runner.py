@@ -0,0 +1,110 @@
+import time
+from pathlib import Path
+from socket import gethostname
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from nearmap.dev.shard_runner import ShardQueue, shard_keys, resume_queue, RATE_LIMIT_BACKOFF
+from nearmap.geospatial.tiles import tile_to_quadkey
+
+#####################
+# Shard Queue Inputs
+##################
+
+shard_zoom = 3
+tiles = [(5, x, y) for x in range(0, 32, 3) for y in range(0, 32, 5)] + [(2, 1, 3), (2, 2, 0)]
+
+
+def _queue(tmp):
+    queue = ShardQueue(Path(tmp) / "queue" / "shard_queue.sqlite")
+    queue.load(iter(tiles), shard_zoom, chunk_size=7)
+    return queue
+
+
+def test_shard_keys():
+    zs, xs, ys = zip(*tiles)
+    keys = shard_keys(zs, xs, ys, shard_zoom)
+    assert keys.tolist() == [str(tile_to_quadkey(x, y, z))[:shard_zoom] for z, x, y in tiles]
+    assert keys[-2:].tolist() == ["23", "10"]  # tiles above the shard zoom keep their full quadkey
+
+
+def test_load_and_claim():
+    with TemporaryDirectory() as tmp:
+        queue = _queue(tmp)
+        zs, xs, ys = zip(*tiles)
+        keys = shard_keys(zs, xs, ys, shard_zoom).tolist()
+        progress = queue.progress()
+        assert progress['tiles'] == len(tiles) and progress['shards'] == len(set(keys))
+        assert progress['shards_pending'] == len(set(keys))
+        claimed = []
+        shard = queue.claim("worker_1")
+        while shard is not None:
+            claimed.append(shard)
+            assert sorted(queue.tiles(shard)) == sorted(t for t, k in zip(tiles, keys) if k == shard)
+            shard = queue.claim("worker_2")
+        # Every shard is handed out once, in quadkey order
+        assert claimed == sorted(set(keys))
+        assert queue.progress()['shards_running'] == len(claimed)
+        queue.close()
+
+
+def test_resume_requeues_dead_stale_and_failed_shards():
+    with TemporaryDirectory() as tmp:
+        queue = _queue(tmp)
+        dead = queue.claim(f"{gethostname()}:999999999")  # exited process on this host
+        alive = queue.claim("other_host:1")
+        stale = queue.claim("silent_host:2")
+        failed = queue.claim("other_host:1")
+        done = queue.claim("other_host:1")
+        queue.report(failed, "other_host:1", 1, 2, status="failed")
+        queue.report(done, "other_host:1", 3, 0, status="done")
+        queue.conn.execute("UPDATE shards SET updated_at = ? WHERE shard = ?", (time.time() - 7200, stale))
+
+        assert queue.requeue_dead() == 1
+        assert queue.requeue_stale(timeout=3600) == 1
+        assert queue.requeue_failed() == 1
+        status = dict(queue.conn.execute("SELECT shard, status FROM shards").fetchall())
+        assert [status[s] for s in [dead, stale, failed, alive, done]] == ["pending"] * 3 + ["running", "done"]
+        # The requeued shards are claimed again
+        reclaimed = set()
+        shard = queue.claim("worker")
+        while shard is not None:
+            reclaimed.add(shard)
+            shard = queue.claim("worker")
+        assert {dead, stale, failed} <= reclaimed and alive not in reclaimed
+        queue.close()
+
+
+def test_resume_queue_retry_failed():
+    with TemporaryDirectory() as tmp:
+        queue = _queue(tmp)
+        failed = queue.claim("other_host:1")
+        queue.report(failed, "other_host:1", 0, 4, status="failed")
+        dead = queue.claim(f"{gethostname()}:999999999")
+        assert resume_queue(queue, retry_failed=False) == 1
+        assert queue.conn.execute("SELECT status FROM shards WHERE shard = ?", (failed,)).fetchone()[0] == "failed"
+        assert resume_queue(queue) == 1
+        assert queue.conn.execute("SELECT status, failed FROM shards WHERE shard = ?",
+                                  (failed,)).fetchone() == ("pending", 0)
+        assert dead is not None
+        queue.close()
+
+
+def test_requeued_shard_rejects_the_old_worker():
+    with TemporaryDirectory() as tmp:
+        queue = _queue(tmp)
+        shard = queue.claim("slow_host:1")
+        assert queue.report(shard, "slow_host:1", 1, 0)
+        # The slow worker sleeps on a rate limit past the stale timeout, its shard is claimed again
+        queue.conn.execute("UPDATE shards SET updated_at = ? WHERE shard = ?", (time.time() - 7200, shard))
+        assert queue.requeue_stale(timeout=3600) == 1
+        assert queue.claim("new_host:2") == shard
+        # The old worker lost its lease and can no longer overwrite the new claimant's progress
+        assert not queue.report(shard, "slow_host:1", 5, 0, status="done")
+        assert queue.report(shard, "new_host:2", 2, 0)
+        row = queue.conn.execute("SELECT status, worker, done FROM shards WHERE shard = ?", (shard,)).fetchone()
+        assert row == ("running", "new_host:2", 2)
+        with pytest.raises(AssertionError):
+            resume_queue(queue, stale_timeout=RATE_LIMIT_BACKOFF)
+        queue.close()
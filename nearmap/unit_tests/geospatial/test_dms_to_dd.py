@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from nearmap.geospatial.dms_to_dd import convert_dms_array_to_dd, convert_coord_list_dms_to_dd, process_coord
+
+#####################
+# DMS Inputs
+##################
+
+in_dms_coords = [
+    ["34-28-40.9000N", "093-05-46.4000W"],
+    ["34-43-45.9862N", "092-13-29.1968W"],
+    ["14-12-58.0040S", "169-25-24.7780W"],
+    ["35-09-16.6120N", "114-33-33.5960E"]]
+
+
+def test_matches_scalar_conversion():
+    expected = np.array(convert_coord_list_dms_to_dd(in_dms_coords))
+    column = pd.Series([coord for pair in in_dms_coords for coord in pair])
+    assert np.allclose(convert_dms_array_to_dd(column), expected.ravel())
+    assert np.allclose(convert_dms_array_to_dd(np.array(in_dms_coords)[:, 0]), expected[:, 0])
+
+
+def test_random_column_matches_scalar():
+    rng = np.random.default_rng(0)
+    n = 1000
+    d, m, s = rng.integers(0, 180, n), rng.integers(0, 60, n), rng.uniform(0, 60, n).round(4)
+    hemisphere = rng.choice(list("NSEW"), n)
+    column = np.array([f"{a:03d}-{b:02d}-{c:07.4f}{h}" for a, b, c, h in zip(d, m, s, hemisphere)])
+    assert np.allclose(convert_dms_array_to_dd(column), [process_coord(c) for c in column])
+
+
+def test_delimeters_and_hemispheres():
+    expected = -(93 + 5 / 60 + 46.4 / 3600)
+    assert np.allclose(convert_dms_array_to_dd(["093:05:46.4W", "W093:05:46.4", "-093:05:46.4", " 093 : 05 : 46.4 w "],
+                                               delimeter=":"), expected)
+    assert np.allclose(convert_dms_array_to_dd(["93 5 46.4 W", "93  05 46.4W"], delimeter=" "), expected)
+    assert np.allclose(convert_dms_array_to_dd(['93°05\'46.4"W', "93°05'46.4W"], delimeter=["°", "'", '"']), expected)
+    # Minutes and seconds are optional, the hemisphere letter decides the sign over a leading minus
+    assert convert_dms_array_to_dd(["34N", "34-30S", "-34-30S", "-34-30N"]).tolist() == [34, -34.5, -34.5, 34.5]
+    result = convert_dms_array_to_dd(["34-28-40.9N", "not a coordinate", None, "34-28-40.9X"])
+    assert result[0] == pytest.approx(34.47802777) and np.isnan(result[1:]).all()
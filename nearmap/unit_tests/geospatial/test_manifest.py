@@ -0,0 +1,69 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from nearmap.geospatial.manifest import create_manifest, write_manifest, read_manifest, write_manifest_from_runs, \
+    quadint, quadint_to_quadkey, iter_shards, tile_bounds, hilbert_index, sort_manifest
+from nearmap.geospatial.tilecover import cover_geometry
+
+#####################
+# Manifest Inputs
+##################
+
+z = 21
+shard_zoom = 13
+aoi = {"type": "Polygon", "coordinates": [[[-90.2, 38.6], [-90.19, 38.6], [-90.19, 38.61], [-90.2, 38.61],
+                                           [-90.2, 38.6]]]}
+
+
+def _quadkey(x, y, z):
+    return ''.join(str(((x >> i) & 1) + 2 * ((y >> i) & 1)) for i in range(z - 1, -1, -1))
+
+
+def test_quadint_matches_quadkey():
+    rng = np.random.default_rng(0)
+    xs, ys = rng.integers(0, 2 ** z, 100), rng.integers(0, 2 ** z, 100)
+    for x, y, q in zip(xs, ys, quadint(xs, ys, z)):
+        assert quadint_to_quadkey(q, z) == _quadkey(int(x), int(y), z)
+
+
+def test_tile_bounds():
+    west, north, east, south = tile_bounds(0, 0, 0)
+    assert (west, east) == (-180.0, 180.0)
+    assert round(float(north), 6) == 85.051129 and round(float(south), 6) == -85.051129
+
+
+def test_manifest_round_trip():
+    runs = cover_geometry(aoi, z)
+    with TemporaryDirectory() as folder:
+        npy = write_manifest_from_runs(runs, z, Path(folder) / "manifest.npy", shard_zoom)
+        geojson = write_manifest(read_manifest(npy), Path(folder) / "manifest.geojson", shard_zoom)
+        manifest = read_manifest(npy)
+        assert np.array_equal(manifest, read_manifest(geojson))
+    xs, ys = manifest['x'].astype(np.int64), manifest['y'].astype(np.int64)
+    assert np.array_equal(manifest, create_manifest(z, xs, ys, shard_zoom))
+    assert sum(len(tiles) for shard, tiles in iter_shards(manifest)) == len(manifest)
+    for shard, tiles in iter_shards(manifest):
+        assert {_quadkey(int(x), int(y), z)[:shard_zoom] for x, y in zip(tiles['x'], tiles['y'])} == \
+               {quadint_to_quadkey(shard, shard_zoom)}
+
+
+def test_hilbert_order_is_a_continuous_curve():
+    ys, xs = np.mgrid[0:2 ** 5, 0:2 ** 5]
+    d = hilbert_index(xs.ravel(), ys.ravel(), 5)
+    assert np.array_equal(np.sort(d), np.arange(4 ** 5))
+    order = np.argsort(d)
+    steps = np.abs(np.diff(xs.ravel()[order])) + np.abs(np.diff(ys.ravel()[order]))
+    assert np.all(steps == 1)
+
+
+def test_sort_manifest():
+    xs, ys = np.meshgrid(np.arange(100, 116), np.arange(200, 216))
+    manifest = create_manifest(z, xs.ravel(), ys.ravel(), shard_zoom)
+    for order in ["hilbert", "zorder", "row"]:
+        ordered = sort_manifest(manifest, order)
+        assert sorted(ordered.tolist()) == sorted(manifest.tolist())
+    zorder = sort_manifest(manifest, "zorder")
+    assert np.all(np.diff(quadint(zorder['x'], zorder['y'], z).astype(np.int64)) > 0)
+    assert sort_manifest(manifest, None) is manifest
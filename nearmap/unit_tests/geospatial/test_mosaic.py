@@ -0,0 +1,88 @@
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pytest
+
+from nearmap.geospatial.manifest import create_manifest
+from nearmap.geospatial.mosaic import TileMosaic, mercator_origin, decode_tile, EARTH_CIRCUMFERENCE
+
+#####################
+# Mosaic Inputs
+##################
+
+z = 19
+xs, ys = np.meshgrid(np.arange(119799, 119802), np.arange(215845, 215847))
+manifest = create_manifest(z, xs.ravel(), ys.ravel())
+
+
+def _tile(value, size=256):
+    return np.full((size, size, 3), value, dtype=np.uint8)
+
+
+def test_geotransform_is_web_mercator_grid():
+    assert mercator_origin(0, 0, 0) == (-EARTH_CIRCUMFERENCE / 2, EARTH_CIRCUMFERENCE / 2)
+    mosaic = TileMosaic.from_manifest(manifest)
+    west, res, _, north, _, neg_res = mosaic.geotransform()
+    assert res == -neg_res == pytest.approx(EARTH_CIRCUMFERENCE / 2 ** z / 256)
+    # The east edge of the mosaic is the west edge of the tile after the last column
+    assert west + res * mosaic.array.shape[2] == pytest.approx(mercator_origin(119802, 215845, z)[0])
+    assert north - res * mosaic.array.shape[1] == pytest.approx(mercator_origin(119799, 215847, z)[1])
+
+
+def test_tiles_are_pasted_at_their_offset():
+    with TemporaryDirectory() as folder:
+        mosaic = TileMosaic.from_manifest(manifest, memmap=Path(folder) / "mosaic.npy")
+        assert mosaic.array.shape == (4, 512, 768)
+        tiles = [(x, y, _tile(i + 1)) for i, (x, y) in enumerate(zip(manifest['x'].tolist(),
+                                                                      manifest['y'].tolist()))][:-1]
+        assert mosaic.paste_many(tiles, threads=4) == 5
+        assert not mosaic.paste(0, 0, _tile(9))
+        for i, (x, y, tile) in enumerate(tiles):
+            row, col = (y - 215845) * 256, (x - 119799) * 256
+            assert np.all(mosaic.array[:3, row:row + 256, col:col + 256] == i + 1)
+            assert np.all(mosaic.array[3, row:row + 256, col:col + 256] == 255)
+        # The tile that was never pasted stays transparent
+        assert np.all(mosaic.array[3, 256:, 512:] == 0)
+        del mosaic
+
+
+def test_decode_tile():
+    Image = pytest.importorskip("PIL.Image")
+    buffer = BytesIO()
+    Image.fromarray(_tile(7)).save(buffer, format="PNG")
+    rgba = decode_tile(buffer.getvalue())
+    assert rgba.shape == (256, 256, 4) and np.all(rgba[:, :, :3] == 7) and np.all(rgba[:, :, 3] == 255)
+
+
+def test_tile_size_is_validated():
+    mosaic = TileMosaic.from_manifest(manifest)
+    # @2x tiles are 512 pixels and need a mosaic with tile_size=512
+    with pytest.raises(AssertionError, match="tile_size"):
+        mosaic.paste(119799, 215845, _tile(1, size=512))
+    with pytest.raises(AssertionError, match="tile_size"):
+        mosaic.paste_many([(119799, 215845, _tile(1)), (119800, 215845, _tile(1, size=128))])
+    retina = TileMosaic.from_manifest(manifest, tile_size=512)
+    assert retina.paste(119799, 215845, _tile(1, size=512))
+
+
+@pytest.mark.parametrize("driver", ["GTiff", "COG"])
+def test_write(driver):
+    gdal = pytest.importorskip("osgeo.gdal")
+    osr = pytest.importorskip("osgeo.osr")
+    mosaic = TileMosaic.from_manifest(manifest)
+    mosaic.paste(119800, 215846, _tile(42))
+    with TemporaryDirectory() as folder:
+        out_raster = mosaic.write(Path(folder) / "mosaic.tif", driver=driver, block_size=256)
+        raster = gdal.Open(str(out_raster))
+        assert (raster.RasterXSize, raster.RasterYSize, raster.RasterCount) == (768, 512, 4)
+        assert raster.GetGeoTransform() == pytest.approx(tuple(mosaic.geotransform()))
+        srs = osr.SpatialReference(wkt=raster.GetProjection())
+        srs.AutoIdentifyEPSG()
+        assert srs.GetAuthorityCode(None) == "3857"
+        assert raster.GetRasterBand(4).GetColorInterpretation() == gdal.GCI_AlphaBand
+        array = raster.ReadAsArray()
+        assert np.array_equal(array, mosaic.array)
+        assert np.all(array[:3, 256:, 256:512] == 42) and np.all(array[3, :256] == 0)
+        raster = None
@@ -0,0 +1,42 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+from shapely.geometry import box
+
+from nearmap.geospatial.result_manifest import StreamingManifest, read_result_manifest
+
+#####################
+# Manifest Inputs
+##################
+
+crs = "EPSG:3857"
+
+
+def _records(n):
+    return [{'id': i, 'tile': f"tile_{i}.tif", 'geometry': box(i, 0, i + 1, 1)} for i in range(n)]
+
+
+@pytest.mark.parametrize("suffix", [".gpkg", ".geojsonl", ".parquet"])
+def test_streaming_manifest_appends_in_batches(suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    if suffix == ".gpkg":
+        pytest.importorskip("pyogrio")
+    with TemporaryDirectory() as folder:
+        out_file = Path(folder) / f"manifest{suffix}"
+        manifest = StreamingManifest(out_file, crs, batch_size=4)
+        for record in _records(10) + [None]:
+            manifest.append(record)
+        # Two full batches are on disk before close, as they would be after a crash
+        partial = read_result_manifest(out_file, crs=crs)
+        assert len(partial) == 8
+        manifest.close()
+        gdf = read_result_manifest(out_file, crs=crs)
+        assert manifest.count == len(gdf) == 10
+        assert sorted(gdf['id'].tolist()) == list(range(10))
+        assert gdf.geometry.iloc[0].bounds == (0.0, 0.0, 1.0, 1.0)
+        # A new run replaces the previous manifest
+        with StreamingManifest(out_file, crs, batch_size=4) as manifest:
+            manifest.append(_records(1)[0])
+        assert len(read_result_manifest(out_file, crs=crs)) == 1
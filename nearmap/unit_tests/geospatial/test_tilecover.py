@@ -0,0 +1,69 @@
+from math import floor
+
+import numpy as np
+import pytest
+
+from nearmap.geospatial.tilecover import cover_geometry, cover_geometries, runs_to_tiles, tile_count, \
+    lonlat_to_tile_fraction, iter_tile_chunks
+
+shapely = pytest.importorskip("shapely")
+from shapely.geometry import Polygon, box
+from shapely.ops import unary_union
+
+#####################
+# Tile Cover Inputs
+##################
+
+z = 16
+samples = 40
+seed = 1
+
+
+def _random_polygon(rng):
+    cx, cy = -90 + rng.uniform(-1, 1), 38 + rng.uniform(-1, 1)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, rng.integers(3, 12)))
+    radii = rng.uniform(0.001, 0.03, len(angles))
+    return Polygon([(cx + r * np.cos(a), cy + r * np.sin(a)) for r, a in zip(radii, angles)])
+
+
+def _brute_force_cover(polygon):
+    # Every tile whose box shares area with the polygon in tile space
+    def _ring(coords):
+        coords = np.asarray(coords)
+        return np.column_stack(lonlat_to_tile_fraction(coords[:, 0], coords[:, 1], z))
+    parts = getattr(polygon, "geoms", [polygon])
+    tile_polygon = unary_union([Polygon(_ring(p.exterior.coords), [_ring(r.coords) for r in p.interiors])
+                                for p in parts])
+    min_x, min_y, max_x, max_y = tile_polygon.bounds
+    return {(x, y) for x in range(floor(min_x), floor(max_x) + 1) for y in range(floor(min_y), floor(max_y) + 1)
+            if box(x, y, x + 1, y + 1).intersection(tile_polygon).area > 0}
+
+
+def _tiles(runs):
+    xs, ys = runs_to_tiles(runs)
+    return set(zip(xs.tolist(), ys.tolist()))
+
+
+def test_cover_matches_brute_force():
+    rng = np.random.default_rng(seed)
+    for i in range(samples):
+        polygon = _random_polygon(rng)
+        if not polygon.is_valid:
+            continue
+        if i % 3 == 0:
+            polygon = polygon.difference(polygon.centroid.buffer(0.003))  # polygon with a hole
+        assert _tiles(cover_geometry(polygon, z)) == _brute_force_cover(polygon)
+
+
+def test_overlapping_geometries_are_deduplicated():
+    a = box(-90.01, 38.0, -90.0, 38.01)
+    b = box(-90.005, 38.0, -89.995, 38.01)
+    runs = cover_geometries([a, b], z)
+    assert _tiles(runs) == _tiles(cover_geometry(a, z)) | _tiles(cover_geometry(b, z))
+    assert tile_count(runs) == len(_tiles(runs))
+
+
+def test_iter_tile_chunks():
+    runs = cover_geometry(box(-90.05, 38.0, -90.0, 38.05), z)
+    xs = np.concatenate([chunk[0] for chunk in iter_tile_chunks(runs, chunk_size=10)])
+    assert len(xs) == tile_count(runs)
@@ -0,0 +1,101 @@
+from math import radians, degrees, asinh, atan, sinh, tan, pi
+
+import numpy as np
+import pytest
+
+from nearmap.geospatial.tiles import latlon_to_tile, tile_to_latlon, tile_bounds, lonlat_to_mercator, \
+    mercator_to_lonlat, tile_to_mercator, tile_mercator_bounds, mercator_to_tile, quadint, quadint_to_tile, \
+    tile_to_quadkey, quadkey_to_tile, MAX_LATITUDE
+from nearmap.geospatial.fileio import lat_lon_to_slippy_coords
+
+#####################
+# Tile Math Inputs
+##################
+
+rng = np.random.default_rng(0)
+n_points = 500
+lats = rng.uniform(-85, 85, n_points)
+lons = rng.uniform(-180, 179.999, n_points)
+zooms = rng.integers(0, 23, n_points)
+
+
+# Scalar reference formulas from https://wiki.openstreetmap.org/wiki/Slippy_map_tilenames
+def _latlon_to_xy(lat, lon, z):
+    n = 2.0 ** z
+    return int((lon + 180.0) / 360.0 * n), int((1.0 - asinh(tan(radians(lat))) / pi) / 2.0 * n)
+
+
+def _xy_to_latlon(x, y, z):
+    n = 2.0 ** z
+    return degrees(atan(sinh(pi * (1 - 2 * y / n)))), x / n * 360.0 - 180.0
+
+
+def _tile_edges(x, y, z):
+    north, west = _xy_to_latlon(x, y, z)
+    south, east = _xy_to_latlon(x + 1, y + 1, z)
+    return [west, north, east, south]
+
+
+def _quadkey(x, y, z):
+    return ''.join(str(((x >> i) & 1) + 2 * ((y >> i) & 1)) for i in range(z - 1, -1, -1))
+
+
+def test_latlon_to_tile_matches_scalar():
+    for z in [0, 5, 14, 21]:
+        xs, ys = latlon_to_tile(lats, lons, z)
+        assert xs.dtype == np.int64
+        for lat, lon, x, y in zip(lats, lons, xs, ys):
+            assert [x, y] == lat_lon_to_slippy_coords(lat, lon, z) == list(_latlon_to_xy(lat, lon, z))
+    # Zoom broadcasts per point
+    xs, ys = latlon_to_tile(lats, lons, zooms)
+    assert [[x, y] for x, y in zip(xs, ys)] == [lat_lon_to_slippy_coords(*p) for p in zip(lats, lons, zooms)]
+
+
+def test_latlon_to_tile_edges():
+    x, y = latlon_to_tile([90, -90, 0], [180, -180, 0], 3)
+    assert x.tolist() == [7, 0, 4] and y.tolist() == [0, 7, 4]
+
+
+def test_tile_to_latlon_and_bounds_match_scalar():
+    for z in [1, 12, 21]:
+        xs, ys = latlon_to_tile(lats, lons, z)
+        lat, lon = tile_to_latlon(xs, ys, z)
+        west, north, east, south = tile_bounds(xs, ys, z)
+        for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+            assert (lat[i], lon[i]) == pytest.approx(_xy_to_latlon(x, y, z))
+            assert [west[i], north[i], east[i], south[i]] == pytest.approx(_tile_edges(x, y, z))
+        # Every point falls inside its tile
+        assert np.all((west <= lons) & (lons < east) & (south <= lats) & (lats <= north))
+
+
+def test_mercator_round_trip():
+    mx, my = lonlat_to_mercator(lons, lats)
+    lon, lat = mercator_to_lonlat(mx, my)
+    assert np.allclose(lon, lons) and np.allclose(lat, lats)
+    assert np.abs(lonlat_to_mercator(0, MAX_LATITUDE)[1] - tile_to_mercator(0, 0, 0)[1]) < 1e-6
+    for z in [3, 17]:
+        xs, ys = mercator_to_tile(mx, my, z)
+        assert np.array_equal(np.stack([xs, ys]), np.stack(latlon_to_tile(lats, lons, z)))
+        west, north, east, south = tile_mercator_bounds(xs, ys, z)
+        assert np.all((west <= mx) & (mx < east) & (south < my) & (my <= north))
+
+
+def test_mercator_matches_pyproj():
+    pyproj = pytest.importorskip("pyproj")
+    transformer = pyproj.Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+    mx, my = transformer.transform(lons, lats)
+    assert np.allclose(np.stack(lonlat_to_mercator(lons, lats)), np.stack([mx, my]), atol=1e-3)
+
+
+def test_quadkeys_match_scalar():
+    for z in [1, 13, 21]:
+        xs, ys = latlon_to_tile(lats, lons, z)
+        keys = tile_to_quadkey(xs, ys, z)
+        assert keys.tolist() == [_quadkey(x, y, z) for x, y in zip(xs.tolist(), ys.tolist())]
+        kx, ky, kz = quadkey_to_tile(keys)
+        assert np.array_equal(kx, xs) and np.array_equal(ky, ys) and np.all(kz == z)
+        qx, qy = quadint_to_tile(quadint(xs, ys, z), z)
+        assert np.array_equal(qx.astype(np.int64), xs) and np.array_equal(qy.astype(np.int64), ys)
+    assert tile_to_quadkey(3, 5, 3) == "213"
+    x, y, z = quadkey_to_tile(["213", "0", ""])
+    assert x.tolist() == [3, 0, 0] and y.tolist() == [5, 0, 0] and z.tolist() == [3, 1, 0]
@@ -0,0 +1,92 @@
+from pathlib import Path
+from struct import pack
+from tempfile import TemporaryDirectory
+from xml.etree import ElementTree
+from zlib import crc32
+
+import numpy as np
+import pytest
+
+from nearmap.geospatial.manifest import create_manifest
+from nearmap.geospatial.mosaic import mercator_origin
+from nearmap.geospatial.vrt import build_manifest_vrt, build_shard_vrts, tile_bands
+
+#####################
+# VRT Inputs
+##################
+
+z = 15
+xs, ys = np.meshgrid(np.arange(8190, 8194), np.arange(12286, 12289))
+manifest = create_manifest(z, xs.ravel(), ys.ravel(), shard_zoom=13)
+
+
+def _png(color_type):
+    # Signature and IHDR chunk of a 256 x 256 8 bit PNG
+    ihdr = b"IHDR" + pack(">IIBBBBB", 256, 256, 8, color_type, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + pack(">I", 13) + ihdr + pack(">I", crc32(ihdr))
+
+
+def _download(folder, skip=()):
+    for i, (x, y) in enumerate(zip(manifest['x'].tolist(), manifest['y'].tolist())):
+        if (x, y) not in skip:
+            (Path(folder) / f"{x}_{y}_{z}.{'png' if i % 2 else 'jpg'}").write_bytes(_png(6) if i % 2 else b"")
+
+
+def _sources(vrt, band=1):
+    root = ElementTree.parse(vrt).getroot()
+    for source in root.find(f"VRTRasterBand[@band='{band}']"):
+        if source.tag not in ["SimpleSource", "ComplexSource"]:
+            continue
+        dst = source.find("DstRect")
+        yield source.find("SourceFilename").text, source.find("SourceBand").text, \
+            int(dst.get("xOff")), int(dst.get("yOff"))
+
+
+def test_manifest_vrt_places_tiles_on_the_grid():
+    with TemporaryDirectory() as folder:
+        _download(folder, skip=[(8190, 12286)])
+        vrt = build_manifest_vrt(manifest, folder, Path(folder) / "tiles.vrt")
+        root = ElementTree.parse(vrt).getroot()
+        assert (root.get("rasterXSize"), root.get("rasterYSize")) == ("1024", "768")
+        geotransform = [float(v) for v in root.find("GeoTransform").text.split(",")]
+        assert geotransform[0] == pytest.approx(mercator_origin(8190, 12286, z)[0])
+        assert geotransform[3] == pytest.approx(mercator_origin(8190, 12286, z)[1])
+        sources = {name: (x_off, y_off) for name, band, x_off, y_off in _sources(vrt)}
+        # The missing tile is left out but does not shift the grid
+        assert len(sources) == 11 and sources[f"8193_12288_{z}.png"] == (768, 512)
+        alpha = {name: band for name, band, x_off, y_off in _sources(vrt, 4)}
+        assert alpha[f"8193_12288_{z}.png"] == "4" and alpha[f"8192_12288_{z}.jpg"] == "mask,1"
+
+
+def test_png_bands_follow_the_header():
+    with TemporaryDirectory() as folder:
+        paths = dict()
+        for name, data in [("rgba", _png(6)), ("rgb", _png(2)), ("gray", _png(0)), ("gray_alpha", _png(4)),
+                           ("palette", _png(3)), ("empty", b"")]:
+            paths[name] = Path(folder) / f"{name}.png"
+            paths[name].write_bytes(data)
+        assert [band for band, component in tile_bands(paths["rgba"])] == [1, 2, 3, 4]
+        assert [band for band, component in tile_bands(paths["rgb"])] == [1, 2, 3, "mask,1"]
+        assert [band for band, component in tile_bands(paths["gray"])] == [1, 1, 1, "mask,1"]
+        assert [band for band, component in tile_bands(paths["gray_alpha"])] == [1, 1, 1, 2]
+        assert tile_bands(paths["palette"]) == [(1, 1), (1, 2), (1, 3), (1, 4)]
+        assert [band for band, component in tile_bands(paths["empty"])] == [1, 2, 3, "mask,1"]
+        # Palette tiles are expanded through their color table
+        vrt = build_manifest_vrt(create_manifest(z, [0], [0]), folder, Path(folder) / "palette.vrt",
+                                 pattern="palette")
+        source = ElementTree.parse(vrt).getroot().find("VRTRasterBand[@band='3']/ComplexSource")
+        assert source.find("SourceBand").text == "1" and source.find("ColorTableComponent").text == "3"
+
+
+def test_shard_vrts():
+    with TemporaryDirectory() as folder:
+        _download(folder)
+        parent = build_shard_vrts(manifest, folder, Path(folder) / "vrt", shard_zoom=13)
+        root = ElementTree.parse(parent).getroot()
+        assert (root.get("rasterXSize"), root.get("rasterYSize")) == ("1024", "768")
+        # x 8190..8193 and y 12286..12288 straddle 4 level 13 quadkeys
+        shards = list(_sources(parent))
+        assert len(shards) == 4
+        for name, band, x_off, y_off in shards:
+            assert (Path(folder) / "vrt" / name).is_file()
+        assert sum(len(list(_sources(Path(folder) / "vrt" / name))) for name, *_ in shards) == len(manifest)
@@ -0,0 +1,46 @@
+from os import cpu_count
+
+import pytest
+
+from nearmap.geospatial.warp import warp_profile, resolve_warp_profile, system_memory, warp_kwargs
+
+
+def test_pool_fits_in_memory():
+    for processes in [1, 2, cpu_count(), 64]:
+        profile = warp_profile(processes, memory_fraction=0.5)
+        per_process = (profile['cache_max_mb'] + profile['warp_memory_mb']) * 1024 ** 2
+        assert per_process * processes <= system_memory() * 0.5 or profile['cache_max_mb'] == 64
+        assert 1 <= profile['warp_threads'] and profile['warp_threads'] * processes <= max(cpu_count(), processes)
+
+
+def test_resolve_warp_profile():
+    assert resolve_warp_profile(None) is None and warp_kwargs(None) == {}
+    custom = warp_profile(2, compress="JPEG")
+    assert resolve_warp_profile(custom) is custom
+    assert "COMPRESS=JPEG" in warp_kwargs(custom)['creationOptions']
+    assert warp_kwargs(custom, "PNG")['creationOptions'] is None
+    with pytest.raises(AssertionError):
+        resolve_warp_profile("fastest")
+
+
+def test_gdal_config_restores_options():
+    gdal = pytest.importorskip("osgeo.gdal")
+    from nearmap.geospatial.warp import gdal_config
+    gdal.SetConfigOption("GDAL_CACHEMAX", "128")
+    names = ["GDAL_CACHEMAX", "GDAL_NUM_THREADS", "GDAL_DISABLE_READDIR_ON_OPEN"]
+    before = [gdal.GetConfigOption(name) for name in names]
+    profile = warp_profile(1)
+    with gdal_config(profile):
+        assert gdal.GetConfigOption("GDAL_CACHEMAX") == str(profile['cache_max_mb'])
+        assert gdal.GetConfigOption("GDAL_DISABLE_READDIR_ON_OPEN") == "EMPTY_DIR"
+    assert [gdal.GetConfigOption(name) for name in names] == before
+    gdal.SetConfigOption("GDAL_CACHEMAX", None)
+
+
+def test_system_memory_without_sysconf(monkeypatch):
+    import os
+    import sys
+    # Windows has no os.sysconf, without psutil the default is used
+    monkeypatch.delattr(os, "sysconf")
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    assert system_memory() == 8 * 1024 ** 3
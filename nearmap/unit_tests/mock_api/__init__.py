@@ -0,0 +1 @@
+from nearmap.unit_tests.mock_api.server import MockNearmapServer
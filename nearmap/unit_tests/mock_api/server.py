@@ -0,0 +1,304 @@
+####################################
+#   File name: server.py
+#   About: The Nearmap API for Python
+#   Authors: Geoff Taylor | Sr Solution Architect | Nearmap
+#            Connor Tluck | Solutions Engineer | Nearmap
+#   Date created: 10/19/2026
+#   Python Version: 3.8+
+####################################
+
+"""
+Local stand-in for the Nearmap API used to load test pipelines without network access or quota. Emulates tiles/v3,
+coverage/v2, ai/features/v4 and staticmap/v2 with configurable latency, 429/5xx injection and x-ratelimit-* headers.
+
+    from nearmap import NEARMAP
+    from nearmap.unit_tests.mock_api import MockNearmapServer
+
+    with MockNearmapServer(latency=0.02, error_rate_429=0.05) as server:
+        nearmap = NEARMAP("mock_key")
+        nearmap.base_url = server.base_url
+        nearmap.tileV3("Vert", 19, 119799, 215845, "jpg", "bytes", rate_limit_mode="fast")
+
+Run standalone with: python -m nearmap.unit_tests.mock_api.server --port 8080
+"""
+
+import asyncio
+from random import Random
+from threading import Event, Lock, Thread
+from time import time
+
+# Smallest valid image bodies. Tiles are padded to tile_bytes so throughput figures reflect real payload sizes.
+_JPEG = bytes.fromhex("ffd8ffe000104a46494600010100000100010000ffd9")
+_PNG = bytes.fromhex("89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+                     "1f15c4890000000d49444154789c6360000000020001e221bc330000000049454e44ae426082")
+
+_SURVEY = {"id": "00000000-0000-0000-0000-000000000001",
+           "captureDate": "2022-01-01",
+           "firstPhotoTime": "2022-01-01T00:00:00Z",
+           "lastPhotoTime": "2022-01-01T01:00:00Z",
+           "onlineTime": "2022-01-10T00:00:00Z",
+           "pixelSize": 0.075,
+           "location": {"country": "US", "state": "MO", "region": "St Louis"},
+           "resources": {"tiles": [{"id": "00000000-0000-0000-0000-000000000002", "type": "Vert", "scale": 21}],
+                         "aifeatures": [{"id": "00000000-0000-0000-0000-000000000003", "type": "AI"}]}}
+
+_PACKS = {"packs": [{"code": "building", "description": "Building Footprints",
+                     "featureClasses": [{"id": "a2e4ae39-8a61-5515-9d18-8900aa6e6072", "description": "Building"}]},
+                    {"code": "vegetation", "description": "Vegetation",
+                     "featureClasses": [{"id": "a7d921b7-393c-4121-b317-e9cda3e4c19b", "description": "Tree"}]}]}
+
+_CLASSES = {"classes": [{"id": "a2e4ae39-8a61-5515-9d18-8900aa6e6072", "description": "Building"},
+                        {"id": "a7d921b7-393c-4121-b317-e9cda3e4c19b", "description": "Tree"}]}
+
+
+class MockNearmapServer(object):
+    """
+    ===================     ====================================================================
+    **Argument**            **Description**
+    -------------------     --------------------------------------------------------------------
+    host                    Optional string. Interface to bind. Default "127.0.0.1".
+    -------------------     --------------------------------------------------------------------
+    port                    Optional integer. Port to bind. Default 0 picks a free port.
+    -------------------     --------------------------------------------------------------------
+    latency                 Optional float. Seconds added to every response. Default 0.
+    -------------------     --------------------------------------------------------------------
+    jitter                  Optional float. Random extra latency of up to jitter seconds.
+    -------------------     --------------------------------------------------------------------
+    error_rate_429          Optional float. Fraction of requests answered with 429 Too Many Requests.
+    -------------------     --------------------------------------------------------------------
+    error_rate_5xx          Optional float. Fraction of requests answered with 503 Service Unavailable.
+    -------------------     --------------------------------------------------------------------
+    rate_limit              Optional integer. Requests allowed per rate_limit_window before every
+                            request is answered with 429. Default None (unlimited).
+    -------------------     --------------------------------------------------------------------
+    rate_limit_window       Optional float. Seconds in a rate limit window. Default 1.
+    -------------------     --------------------------------------------------------------------
+    tile_bytes              Optional integer. Size of tile and static map bodies. Default 20000.
+    -------------------     --------------------------------------------------------------------
+    features_per_request    Optional integer. AI features returned per features.json request.
+    -------------------     --------------------------------------------------------------------
+    seed                    Optional integer. Seed for error injection and jitter.
+    ===================     ====================================================================
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate_429=0.0, error_rate_5xx=0.0,
+                 rate_limit=None, rate_limit_window=1.0, tile_bytes=20000, features_per_request=50, seed=0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.tile_bytes = tile_bytes
+        self.features_per_request = features_per_request
+        self.requests = dict()
+        self._random = Random(seed)
+        self._lock = Lock()
+        self._windows = dict()
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    ###############
+    # Behaviour
+    #############
+
+    def _rate_limit_headers(self, api_key):
+        # Rate limits are tracked per API Key, as they are by the Nearmap API
+        with self._lock:
+            now = time()
+            window_start, window_count = self._windows.get(api_key, (now, 0))
+            if now - window_start >= self.rate_limit_window:
+                window_start, window_count = now, 0
+            window_count += 1
+            self._windows[api_key] = (window_start, window_count)
+            limit = self.rate_limit or 1000000
+            remaining = max(limit - window_count, 0)
+            throttled = self.rate_limit is not None and window_count > self.rate_limit
+            headers = {"x-ratelimit-limit": str(limit),
+                       "x-ratelimit-remaining": str(remaining),
+                       "x-ratelimit-reset": str(window_start + self.rate_limit_window)}
+        return headers, throttled
+
+    async def _middleware(self, request, handler):
+        from aiohttp import web
+
+        endpoint = "/".join(request.path.strip("/").split("/")[:3])
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            roll = self._random.random()
+            delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        headers, throttled = self._rate_limit_headers(request.query.get("apikey", request.query.get("transactionToken")))
+        if request.query.get("apikey") is None and "transactionToken" not in request.query:
+            return web.json_response({"error": "Unauthorized"}, status=401, headers=headers)
+        if throttled or roll < self.error_rate_429:
+            return web.json_response({"error": "Too Many Requests"}, status=429, headers=headers)
+        if roll < self.error_rate_429 + self.error_rate_5xx:
+            return web.json_response({"error": "Service Unavailable"}, status=503, headers=headers)
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def _image(self, file_format, tag=""):
+        from aiohttp import web
+
+        # The tag (the request path and survey date) follows the image so tests can tell the tiles apart
+        body = (_PNG if file_format == "png" else _JPEG) + tag.encode("utf-8")
+        body += bytes(max(self.tile_bytes - len(body), 0))
+        content_type = "image/png" if file_format == "png" else "image/jpeg"
+        return web.Response(body=body, content_type=content_type)
+
+    ##########
+    # Routes
+    ########
+
+    async def _tile(self, request):
+        tag = f"{request.path}|{request.query.get('since', '')}"
+        return self._image(request.match_info["format"], tag)
+
+    async def _coverage(self, request):
+        from aiohttp import web
+        return web.json_response({"surveys": [_SURVEY], "limit": 20, "offset": 0, "total": 1,
+                                  "transactionToken": "mock_token"})
+
+    async def _boundaries(self, request):
+        from aiohttp import web
+        return web.json_response({"type": "FeatureCollection", "features": []})
+
+    async def _ai_features(self, request):
+        from aiohttp import web
+
+        coords = [float(c) for c in request.query.get("polygon", "0,0,0,0").split(",")]
+        lons, lats = coords[::2], coords[1::2]
+        min_x, min_y, max_x, max_y = min(lons), min(lats), max(lons), max(lats)
+        step_x = (max_x - min_x) / max(self.features_per_request, 1)
+        features = []
+        for i in range(self.features_per_request):
+            x0 = min_x + step_x * i
+            x1 = x0 + step_x * 0.8
+            geometry = {"type": "Polygon", "coordinates": [[[x0, min_y], [x1, min_y], [x1, max_y], [x0, max_y],
+                                                             [x0, min_y]]]}
+            class_id = _CLASSES["classes"][i % len(_CLASSES["classes"])]
+            features.append({"id": f"{i:08d}-0000-0000-0000-000000000000",
+                             "classId": class_id["id"],
+                             "description": class_id["description"],
+                             "confidence": 0.95,
+                             "parentId": None,
+                             "geometry": geometry,
+                             "areaSqm": 100.0,
+                             "areaSqft": 1076.4,
+                             "attributes": [],
+                             "surveyDate": _SURVEY["captureDate"],
+                             "meshDate": _SURVEY["captureDate"],
+                             "fidelity": None})
+        return web.json_response({"systemVersion": "gen5-mock", "link": "https://apps.nearmap.com/maps",
+                                  "features": features})
+
+    async def _ai_packs(self, request):
+        from aiohttp import web
+        return web.json_response(_PACKS)
+
+    async def _ai_classes(self, request):
+        from aiohttp import web
+        return web.json_response(_CLASSES)
+
+    async def _static_coverage(self, request):
+        from aiohttp import web
+        return web.json_response({"surveys": [_SURVEY], "transactionToken": "mock_token"})
+
+    async def _static_image(self, request):
+        return self._image(request.match_info["format"])
+
+    def app(self):
+        from aiohttp import web
+
+        @web.middleware
+        async def middleware(request, handler):
+            return await self._middleware(request, handler)
+
+        app = web.Application(middlewares=[middleware])
+        app.add_routes([
+            web.get("/tiles/v3/surveys/{survey}/{content}/{z}/{x}/{y}.{format}", self._tile),
+            web.get("/tiles/v3/{content}/{z}/{x}/{y}.{format}", self._tile),
+            web.get("/coverage/v2/surveyresources/boundaries.{format}", self._boundaries),
+            web.get("/coverage/v2/aggregate/boundaries.{format}", self._boundaries),
+            web.get("/coverage/v2/coord/{z}/{x}/{y}", self._coverage),
+            web.get("/coverage/v2/point/{point}", self._coverage),
+            web.get("/coverage/v2/poly/{polygon}", self._coverage),
+            web.get("/ai/features/v4/features.json", self._ai_features),
+            web.get("/ai/features/v4/packs.json", self._ai_packs),
+            web.get("/ai/features/v4/classes.json", self._ai_classes),
+            web.get("/staticmap/v2/coverage.json", self._static_coverage),
+            web.get("/staticmap/v2/surveys/{survey}/{image_type}.{format}", self._static_image),
+        ])
+        return app
+
+    ##############
+    # Lifecycle
+    ############
+
+    def start(self):
+        """Starts the server on a background thread and returns once it is accepting connections"""
+        from aiohttp import web
+
+        started = Event()
+
+        def _serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._runner = web.AppRunner(self.app(), access_log=None)
+                self._loop.run_until_complete(self._runner.setup())
+                site = web.TCPSite(self._runner, self.host, self.port)
+                self._loop.run_until_complete(site.start())
+                self.port = site._server.sockets[0].getsockname()[1]
+            finally:
+                started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = Thread(target=_serve, daemon=True)
+        self._thread.start()
+        started.wait()
+        assert self._thread.is_alive(), "Error: Mock Nearmap API server failed to start"
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Local mock of the Nearmap API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    args = parser.parse_args()
+
+    from aiohttp import web
+    server = MockNearmapServer(args.host, args.port, args.latency, args.jitter, args.error_rate_429,
+                               args.error_rate_5xx, args.rate_limit)
+    web.run_app(server.app(), host=args.host, port=args.port)
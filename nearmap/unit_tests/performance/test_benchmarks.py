@@ -0,0 +1,80 @@
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("pytest_benchmark")
+
+from nearmap import NEARMAP
+from nearmap.unit_tests.mock_api import MockNearmapServer
+
+#####################
+# Benchmark Inputs
+##################
+
+# Run with: pytest nearmap/unit_tests/performance/test_benchmarks.py --benchmark-autosave
+# Compare runs with: pytest-benchmark compare
+latency = 0.005  # seconds of simulated server latency per request
+bulk_tiles = 200
+bulk_threads = 16
+coverage_points = 50
+z, x, y = [19, 119799, 215845]
+ai_polygon = [(-90.2, 38.6), (-90.195, 38.6), (-90.195, 38.605), (-90.2, 38.605), (-90.2, 38.6)]
+
+
+@pytest.fixture(scope="module")
+def nearmap():
+    with MockNearmapServer(latency=latency) as server:
+        nearmap = NEARMAP("mock_key")
+        nearmap.base_url = server.base_url
+        yield nearmap
+
+
+def _measure(benchmark, func, *args, rounds=None):
+    """
+    Records the peak traced memory of one untimed call of func in the benchmark report, then benchmarks func with
+    tracemalloc off so tracing overhead does not skew the timings
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        benchmark.extra_info['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return benchmark.pedantic(func, args=args, rounds=rounds) if rounds else benchmark(func, *args)
+
+
+def test_benchmark_tileV3(benchmark, nearmap):
+    tile = _measure(benchmark, nearmap.tileV3, "Vert", z, x, y, "jpg", "bytes")
+    assert tile.getbuffer().nbytes > 0
+
+
+def test_benchmark_bulk_tiles(benchmark, nearmap):
+    def _bulk_tiles():
+        with ThreadPoolExecutor(bulk_threads) as executor:
+            return list(executor.map(lambda i: nearmap.tileV3("Vert", z, x + i, y, "jpg", "bytes",
+                                                              rate_limit_mode="fast"), range(bulk_tiles)))
+    tiles = _measure(benchmark, _bulk_tiles)
+    benchmark.extra_info['tiles_per_round'] = bulk_tiles
+    assert len(tiles) == bulk_tiles
+
+
+def test_benchmark_multi_view_tiles(benchmark, nearmap):
+    tiles = _measure(benchmark, nearmap.tileMultiViewV3, z, x, y, "jpg", "bytes")
+    assert set(tiles) == {"Vert", "North", "South", "East", "West"}
+    assert all(tile.getbuffer().nbytes > 0 for tile in tiles.values())
+
+
+def test_benchmark_coverage_batch(benchmark, nearmap):
+    def _coverage_batch():
+        return [nearmap.pointV2(f"{-90.2 + i * 0.001},38.6") for i in range(coverage_points)]
+    coverage = _measure(benchmark, _coverage_batch)
+    assert all(c['surveys'] for c in coverage)
+
+
+def test_benchmark_download_ai(benchmark, nearmap):
+    with TemporaryDirectory() as out_folder:
+        grid, ai = _measure(benchmark, nearmap.download_ai, ai_polygon, out_folder, rounds=3)
+    assert len(ai) > 0
@@ -0,0 +1,101 @@
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+from requests.exceptions import ChunkedEncodingError
+
+from nearmap._api import BufferPool, _read_into_buffer, _write_response, _read_with_retry
+
+#####################
+# Buffer Pool Inputs
+##################
+
+body = bytes(range(256)) * 40
+
+
+class FakeResponse(object):
+    """Streamed response whose body can drop after fail_after bytes"""
+
+    def __init__(self, data, headers=None, fail_after=None, status_code=200):
+        self.raw = BytesIO(data if fail_after is None else data[:fail_after])
+        self.headers = headers or dict()
+        self.fail_after = fail_after
+        self.status_code = status_code
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        while True:
+            chunk = self.raw.read(chunk_size)
+            if not chunk:
+                if self.fail_after is not None:
+                    raise ChunkedEncodingError("Connection broken")
+                return
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def test_growth_without_content_length():
+    pool = BufferPool(buffer_size=1000)
+    response = FakeResponse(body)
+    view = _read_into_buffer(response, pool)
+    assert bytes(view) == body and len(view.obj) >= len(body)
+    assert response.closed
+    pool.release(view)
+
+
+def test_reuse():
+    pool = BufferPool(buffer_size=1000)
+    view = _read_into_buffer(FakeResponse(body, {'Content-Length': str(len(body))}), pool)
+    buf = view.obj
+    pool.release(view)
+    # A pooled buffer large enough is handed out again, smaller requests reuse it too
+    assert pool.acquire(len(body)) is buf
+    pool.release(buf)
+    view = _read_into_buffer(FakeResponse(body[:10]), pool)
+    assert view.obj is buf and bytes(view) == body[:10]
+
+
+def test_double_release():
+    pool = BufferPool(buffer_size=100)
+    view = _read_into_buffer(FakeResponse(body[:50]), pool)
+    buf = view.obj
+    pool.release(view)
+    pool.release(view)
+    pool.release(buf)
+    assert len(pool._buffers) == 1
+    # The buffer is handed out once, not to two callers
+    assert pool.acquire() is buf
+    assert pool.acquire() is not buf
+
+
+def test_read_error_returns_buffer():
+    pool = BufferPool(buffer_size=100)
+
+    class Broken(FakeResponse):
+        def __init__(self):
+            super().__init__(body)
+            self.raw.readinto = self._readinto
+
+        def _readinto(self, b):
+            raise ChunkedEncodingError("Connection broken")
+
+    with pytest.raises(ChunkedEncodingError):
+        _read_into_buffer(Broken(), pool)
+    assert len(pool._buffers) == 1
+
+
+def test_file_written_only_when_complete():
+    with TemporaryDirectory() as tmp:
+        out_file = (Path(tmp) / "tile.jpg").as_posix()
+        with pytest.raises(ChunkedEncodingError):
+            _write_response(FakeResponse(body, fail_after=100), out_file)
+        assert list(Path(tmp).iterdir()) == []
+        # A body dropped mid-read is requested again
+        responses = [FakeResponse(body, fail_after=100), FakeResponse(body)]
+        path = _read_with_retry("url", responses.pop(0), lambda r: _write_response(r, out_file),
+                                lambda: responses.pop(0))
+        assert path == out_file and Path(out_file).read_bytes() == body
+        assert [p.name for p in Path(tmp).iterdir()] == ["tile.jpg"]
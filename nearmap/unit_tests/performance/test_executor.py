@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from nearmap._executor import BoundedExecutor, shared
+
+#####################
+# Executor Inputs
+##################
+
+in_flight = 0
+most_in_flight = 0
+lock = threading.Lock()
+
+
+def _track(i):
+    global in_flight, most_in_flight
+    with lock:
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+    time.sleep(0.005)
+    with lock:
+        in_flight -= 1
+    return i
+
+
+def _offset(i, scale=1):
+    return (i + shared('offset')) * scale
+
+
+def test_bounded_in_flight_and_lazy_jobs():
+    global most_in_flight
+    most_in_flight = 0
+    read = []
+
+    def jobs():
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    with BoundedExecutor(4, max_in_flight=6) as executor:
+        results = []
+        for job, future in executor.as_completed(_track, jobs()):
+            results.append(future.result())
+            # Jobs are only pulled from the iterable as capacity frees up
+            assert len(read) - len(results) < 6
+    assert sorted(results) == list(range(100))
+    assert most_in_flight <= 4
+
+
+def test_job_arguments_and_errors():
+    with BoundedExecutor(2, shared={'offset': 10}) as executor:
+        assert sorted(executor.map(_offset, [1, (2, 3), {'i': 3, 'scale': 2}])) == [11, 26, 36]
+        failed = [job for job, future in executor.as_completed(_offset, [1, None]) if future.exception()]
+    assert failed == [None]
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_shared_inputs(processes):
+    with BoundedExecutor(2, processes=processes, shared={'offset': 100}) as executor:
+        assert sorted(executor.map(_offset, range(10))) == list(range(100, 110))
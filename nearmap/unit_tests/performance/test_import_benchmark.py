@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+#####################
+# Benchmark Inputs
+##################
+
+# Run with: pytest nearmap/unit_tests/performance/test_import_benchmark.py --benchmark-autosave
+# Compare runs with: pytest-benchmark compare. No time budget is asserted, the lazy imports themselves are checked
+# in test_import_time.py
+rounds = 5
+
+
+def _python(code):
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.parametrize("code", ["pass", "import nearmap"], ids=["interpreter", "import_nearmap"])
+def test_benchmark_import(benchmark, code):
+    # "pass" is the interpreter start up baseline, 'import nearmap' is measured relative to it across runs
+    benchmark.pedantic(_python, args=(code,), rounds=rounds)
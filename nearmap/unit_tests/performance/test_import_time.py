@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+####################
+# Import Time Inputs
+#################
+
+heavy_modules = ["pandas", "geopandas", "shapely", "pyproj", "fiona", "osgeo", "numpy", "requests"]
+
+
+def _run(code):
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+
+
+def _loaded_heavy_modules(import_statement):
+    return _run(f"import sys; {import_statement}; "
+                f"print(','.join(m for m in {heavy_modules} if m in sys.modules))")
+
+
+def test_import_nearmap_is_lazy():
+    loaded = _loaded_heavy_modules("import nearmap")
+    assert loaded == "", f"Error: 'import nearmap' eagerly imported {loaded}"
+
+
+def test_import_fileio_is_lazy():
+    loaded = _loaded_heavy_modules("import nearmap.geospatial.fileio")
+    assert loaded == "", f"Error: 'import nearmap.geospatial.fileio' eagerly imported {loaded}"
+
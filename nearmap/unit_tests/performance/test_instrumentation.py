@@ -0,0 +1,75 @@
+from nearmap._instrumentation import Instrumentation, endpoint_name
+
+############################
+# Instrumentation Inputs
+#########################
+
+base_url = "https://api.nearmap.com/"
+tile_url = f"{base_url}tiles/v3/Vert/19/120000/160000.jpg?apikey=secret"
+ai_url = f"{base_url}ai/features/v4/features.json?polygon=1,2,3,4&apikey=secret"
+
+
+class _Response(object):
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = b""
+
+
+def test_endpoint_name():
+    assert endpoint_name(tile_url) == "tiles/v3/Vert"
+    assert endpoint_name(ai_url) == "ai/features/v4/features"
+    assert endpoint_name(f"{base_url}coverage/v2/point/1,2?apikey=secret") == "coverage/v2/point"
+
+
+def test_metrics_and_hooks():
+    instrumentation = Instrumentation()
+    seen = []
+    instrumentation.add_post_request_hook(lambda endpoint, url, response, elapsed: seen.append(url))
+    for status in [200, 429]:
+        endpoint, start = instrumentation.before_request(tile_url)
+        instrumentation.after_request(endpoint, tile_url, _Response(status, {"Content-Length": "100",
+                                                                             "x-ratelimit-remaining": "7"}), start)
+    instrumentation.record_retry(tile_url)
+    m = instrumentation.metrics()["tiles/v3/Vert"]
+    assert m['requests'] == 2
+    assert m['errors'] == 1
+    assert m['retries'] == 1
+    assert m['bytes'] == 200
+    assert m['status_codes'] == {200: 1, 429: 1}
+    assert m['rate_limit_remaining'] == "7"
+    assert all("secret" not in url for url in seen), "Error: API Key leaked to instrumentation hook"
+    assert 'nearmap_requests_total{endpoint="tiles/v3/Vert"} 2' in instrumentation.to_prometheus()
+
+
+def test_prometheus_server_is_local_by_default():
+    from urllib.request import urlopen
+
+    instrumentation = Instrumentation()
+    server = instrumentation.serve_prometheus(port=0)
+    try:
+        host, port = server.server_address[:2]
+        assert host == "127.0.0.1"
+        body = urlopen(f"http://{host}:{port}/metrics").read().decode("utf-8")
+        assert "# HELP nearmap_request_duration_seconds" in body
+        assert "not to the end of the body" in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_prometheus_families_are_grouped():
+    instrumentation = Instrumentation()
+    for url in [tile_url, ai_url]:
+        endpoint, start = instrumentation.before_request(url)
+        instrumentation.after_request(endpoint, url, _Response(200, {"x-ratelimit-remaining": "7"}), start)
+    families = []
+    for line in instrumentation.to_prometheus().splitlines():
+        if line.startswith("# TYPE"):
+            families.append(line.split()[2])
+        elif not line.startswith("#"):
+            name = line.split("{")[0]
+            assert name == families[-1] or name.rsplit("_", 1)[0] == families[-1], f"{name} outside its family"
+    # Every family is written once, followed by the samples of both endpoints
+    assert len(families) == len(set(families))
+    assert instrumentation.to_prometheus().count('nearmap_requests_total{') == 2
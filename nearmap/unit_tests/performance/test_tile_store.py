@@ -0,0 +1,133 @@
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from nearmap import NEARMAP
+from nearmap._tile_store import RedisTileStore, AsyncRedisTileStore
+
+#####################
+# Tile Store Inputs
+##################
+
+z, x, y = [19, 119799, 215845]
+jpg = b"\xff\xd8\xff\xe0" + b"\x00" * 100
+
+
+def test_key_for_url():
+    store = RedisTileStore(fakeredis.FakeRedis(), namespace="test")
+    base = "https://api.nearmap.com/tiles/v3"
+    key = store.key_for_url(f"{base}/Vert/{z}/{x}/{y}.jpg?apikey=a")
+    assert key == store.key("latest", "Vert", z, x, y, "jpg", api_key="a")
+    assert key.startswith("test:") and key.endswith(f":latest:{z}:{x}:{y}:Vert.jpg") and ":a:" not in key
+    # API Keys can be entitled to different content, so each has its own keys. Filters select other surveys
+    assert store.key_for_url(f"{base}/Vert/{z}/{x}/{y}.jpg?apikey=b") != key
+    dated = store.key_for_url(f"{base}/Vert/{z}/{x}/{y}.jpg?apikey=a&until=2021-01-01")
+    assert ":latest-" in dated and dated != key
+    assert store.key_for_url(f"{base}/surveys/abc/North/{z}/{x}/{y}.png?apikey=a") == \
+        store.key("abc", "North", z, x, y, "png", api_key="a")
+    assert store.key_for_url("https://api.nearmap.com/coverage/v2/point/1,2?apikey=a") is None
+
+
+def test_latest_tiles_expire():
+    store = RedisTileStore(fakeredis.FakeRedis(), namespace="test")
+    latest = store.key("latest", "Vert", z, x, y, "jpg", api_key="a")
+    dated = store.key_for_url(f"https://api.nearmap.com/tiles/v3/Vert/{z}/{x}/{y}.jpg?apikey=a&until=2021-01-01")
+    survey = store.key("abc", "Vert", z, x, y, "jpg", api_key="a")
+    store.set_many({latest: jpg, dated: jpg, survey: jpg})
+    assert 0 < store.client.ttl(latest) <= 86400 and 0 < store.client.ttl(dated) <= 86400
+    assert store.client.ttl(survey) == -1  # survey tiles never change
+    store = RedisTileStore(fakeredis.FakeRedis(), namespace="test", ttl=60)
+    store.set(latest, jpg)
+    assert 0 < store.client.ttl(latest) <= 60
+    store = RedisTileStore(fakeredis.FakeRedis(), namespace="test", latest_ttl=30)
+    store.set(latest, jpg)
+    store.set(survey, jpg)
+    assert 0 < store.client.ttl(latest) <= 30 and store.client.ttl(survey) == -1
+
+
+def test_redis_not_installed(monkeypatch):
+    import sys
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(ImportError):
+        RedisTileStore()
+
+
+def test_pipelined_batches_and_ttl():
+    store = RedisTileStore(fakeredis.FakeRedis(), namespace="test", batch_size=7)
+    tiles = {store.key("latest", "Vert", z, x + i, y, "jpg"): jpg + bytes([i]) for i in range(20)}
+    store.set_many(tiles)
+    assert store.get_many(list(tiles) + ["test:missing"]) == list(tiles.values()) + [None]
+    assert store.stats()['hits'] == 20 and store.stats()['misses'] == 1
+    store.set_many({"test:expiring": jpg}, ttl=60)
+    assert 0 < store.client.ttl("test:expiring") <= 60
+    assert store.clear() == 21
+
+
+def test_async_store():
+    async def _round_trip():
+        store = AsyncRedisTileStore(fakeredis.FakeAsyncRedis(), namespace="test", ttl=60)
+        await store.set_many({"test:a": jpg, "test:b": jpg})
+        tiles = await store.get_many(["test:a", "test:b", "test:c"])
+        assert await store.client.ttl("test:a") > 0
+        await store.clear()
+        return tiles
+    assert asyncio.run(_round_trip()) == [jpg, jpg, None]
+
+
+def _mock_nearmap(server, store):
+    nearmap = NEARMAP("mock_key")
+    nearmap.base_url = server.base_url
+    nearmap.tile_store = store
+    return nearmap
+
+
+def _request_count(nearmap):
+    return sum(m['requests'] for m in nearmap.instrumentation.metrics().values())
+
+
+def test_tileV3_cache_tier():
+    pytest.importorskip("aiohttp")
+    from nearmap.unit_tests.mock_api import MockNearmapServer
+
+    with MockNearmapServer() as server:
+        nearmap = _mock_nearmap(server, RedisTileStore(fakeredis.FakeRedis(), namespace="test"))
+        try:
+            first = nearmap.tileV3("Vert", z, x, y, "jpg", "bytes").getvalue()
+            requests = _request_count(nearmap)
+            second = nearmap.tileV3("Vert", z, x, y, "jpg", "bytes").getvalue()
+            assert first == second
+            assert _request_count(nearmap) == requests
+            assert nearmap.tile_store.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+            # A miss written to a file is streamed to disk, then cached from the file
+            with TemporaryDirectory() as tmp:
+                path = nearmap.tileV3("North", z, x, y, "jpg", f"{tmp}/north.jpg")
+                requests = _request_count(nearmap)
+                cached = nearmap.tileV3("North", z, x, y, "jpg", "buffer")
+                assert _request_count(nearmap) == requests
+                assert bytes(cached) == Path(path).read_bytes()
+                nearmap.release_buffer(cached)
+        finally:
+            nearmap.tile_store = None
+
+
+class _BrokenRedis(object):
+    def __getattr__(self, name):
+        def _fail(*args, **kwargs):
+            raise ConnectionError("Redis is down")
+        return _fail
+
+
+def test_unavailable_store_falls_through():
+    pytest.importorskip("aiohttp")
+    from nearmap.unit_tests.mock_api import MockNearmapServer
+
+    with MockNearmapServer() as server:
+        nearmap = _mock_nearmap(server, RedisTileStore(_BrokenRedis(), namespace="test"))
+        try:
+            assert nearmap.tileV3("Vert", z, x, y, "jpg", "bytes").getbuffer().nbytes > 0
+        finally:
+            nearmap.tile_store = None
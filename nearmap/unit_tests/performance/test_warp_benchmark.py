@@ -0,0 +1,59 @@
+from os import cpu_count
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pytest
+
+gdal = pytest.importorskip("osgeo.gdal")
+pytest.importorskip("pytest_benchmark")
+
+from nearmap.geospatial.warp import warp_profile, gdal_config, warp_kwargs
+
+#####################
+# Benchmark Inputs
+##################
+
+# Run with: pytest nearmap/unit_tests/performance/test_warp_benchmark.py --benchmark-autosave
+source_size = 4096  # pixels of the synthetic Web Mercator source raster
+tiles_per_side = 4  # output tiles warped per round = tiles_per_side ** 2
+output_crs = "EPSG:2236"  # NAD83 Florida East (ftUS)
+origin = (-8960000.0, 2980000.0)  # Web Mercator top left near Miami
+resolution = 0.3
+
+
+@pytest.fixture(scope="module")
+def source():
+    ds = gdal.GetDriverByName("MEM").Create("", source_size, source_size, 3, gdal.GDT_Byte)
+    ds.SetGeoTransform([origin[0], resolution, 0.0, origin[1], 0.0, -resolution])
+    ds.SetProjection("EPSG:3857")
+    rng = np.random.default_rng(0)
+    for band in range(1, 4):
+        ds.GetRasterBand(band).WriteArray(rng.integers(0, 255, (source_size, source_size), dtype=np.uint8))
+    yield ds
+    ds = None
+
+
+def _tile_bounds():
+    step = source_size * resolution / tiles_per_side
+    for row in range(tiles_per_side):
+        for col in range(tiles_per_side):
+            west, north = origin[0] + col * step, origin[1] - row * step
+            yield west, north - step, west + step, north
+
+
+@pytest.mark.parametrize("profile_name", [None, "tuned"])
+def test_benchmark_warp_profile(benchmark, source, profile_name):
+    profile = warp_profile(processes=1) if profile_name else None
+
+    def _warp_tiles(folder):
+        for i, bounds in enumerate(_tile_bounds()):
+            options = gdal.WarpOptions(format="GTiff", dstSRS=output_crs, outputBounds=bounds,
+                                       outputBoundsSRS="EPSG:3857", resampleAlg="bilinear", dstAlpha=True,
+                                       **warp_kwargs(profile, "GTiff"))
+            gdal.Warp(f"{folder}/tile_{i}.tif", source, options=options)
+
+    with gdal_config(profile), TemporaryDirectory() as folder:
+        benchmark.pedantic(_warp_tiles, args=(folder,), rounds=3)
+    if benchmark.stats:  # None when run with --benchmark-disable
+        tiles = tiles_per_side ** 2
+        benchmark.extra_info['tiles_per_second_per_core'] = tiles / benchmark.stats.stats.mean / (cpu_count() or 1)
@@ -28,3 +28,9 @@ def test_tile_file():
     image_tile = nearmap.tileV3(tileResourceType, z, x, y, format, out_image)
     assert isfile(image_tile), f"Error: File not detected {image_tile}"
     remove(image_tile)
+
+
+def test_tile_buffer():
+    image_tile = nearmap.tileV3(tileResourceType, z, x, y, format, "buffer")
+    assert image_tile.nbytes > 0, "Error: No Buffer Detected"
+    nearmap.release_buffer(image_tile)
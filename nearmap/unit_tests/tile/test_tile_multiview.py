@@ -0,0 +1,65 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from nearmap import NEARMAP
+from nearmap.unit_tests.mock_api import MockNearmapServer
+
+#####################
+# Multi View Inputs
+##################
+
+z = 19
+xs = [119799, 119800]
+ys = [215845, 215846]
+views = ["Vert", "North", "South", "East", "West"]
+dates = ["2022-01-01", "2023-06-01"]
+
+
+@pytest.fixture(scope="module")
+def nearmap():
+    with MockNearmapServer(tile_bytes=0) as server:
+        nearmap = NEARMAP("mock_key")
+        nearmap.base_url = server.base_url
+        yield nearmap
+
+
+def _tag(view, x, y, date=None):
+    return f"/tiles/v3/{view}/{z}/{x}/{y}.jpg|{date or ''}".encode("utf-8")
+
+
+def test_single_tile_views(nearmap):
+    tiles = nearmap.tileMultiViewV3(z, xs[0], ys[0], "jpg", "bytes")
+    assert list(tiles) == views
+    for view, tile in tiles.items():
+        assert tile.getvalue().endswith(_tag(view, xs[0], ys[0]))
+
+
+def test_key_layout_tiles_dates_views(nearmap):
+    tiles = nearmap.tileMultiViewV3(z, xs, ys, "jpg", "bytes", views=views[:2], dates=dates)
+    assert list(tiles) == list(zip(xs, ys))
+    for (x, y), by_date in tiles.items():
+        assert list(by_date) == dates
+        for date, by_view in by_date.items():
+            assert list(by_view) == views[:2]
+            for view, tile in by_view.items():
+                assert tile.getvalue().endswith(_tag(view, x, y, date))
+
+
+def test_file_names(nearmap):
+    with TemporaryDirectory() as tmp:
+        tiles = nearmap.tileMultiViewV3(z, xs[0], ys[0], "jpg", tmp, dates=dates[:1])
+        for view, path in tiles[dates[0]].items():
+            assert Path(path).name == f"{dates[0]}_{view}_{xs[0]}_{ys[0]}_{z}.jpg"
+            assert Path(path).read_bytes().endswith(_tag(view, xs[0], ys[0], dates[0]))
+        tiles = nearmap.tileMultiViewV3(z, xs[0], ys[0], "jpg", tmp, name_pattern="{view}.{format}")
+        assert [Path(path).name for path in tiles.values()] == [f"{view}.jpg" for view in views]
+        with pytest.raises(AssertionError):
+            nearmap.tileMultiViewV3(z, xs, ys, "jpg", tmp, name_pattern="{view}.{format}")
+
+
+def test_no_tiles(nearmap):
+    assert nearmap.tileMultiViewV3(z, [], [], "jpg", "bytes") == {}